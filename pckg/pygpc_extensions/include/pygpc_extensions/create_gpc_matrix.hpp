@@ -1,6 +1,8 @@
 #ifndef PYGPC_EXTENSIONS_CREATE_GPC_MATRIX_H
 #define PYGPC_EXTENSIONS_CREATE_GPC_MATRIX_H
 
+#include <vector>
+
 
 template<typename T, typename U>
 int create_gpc_matrix_omp_t(T* ptr_arguments, T* ptr_coeffs, T* ptr_result,
@@ -90,4 +92,87 @@ int create_gpc_matrix_cpu_t(T* ptr_arguments, T* ptr_coeffs, T* ptr_result,
 }
 
 
+
+template<typename T, typename U>
+void create_gpc_matrix_grad_row_t(T* ptr_argument, T* ptr_coeffs,
+    T* ptr_result, T* values, T* suffix, U n_dim, U n_basis)
+{
+    T* local_ptr_coeffs = ptr_coeffs;
+    for(U i_basis = 0; i_basis < n_basis; ++i_basis) {
+        T* local_ptr_result = ptr_result + i_basis * n_dim;
+        for(U i_dim = 0; i_dim < n_dim; ++i_dim) {
+            // get argument
+            T argument = ptr_argument[i_dim];
+            // get order of polynomial
+            // then to to first (highest) coefficient
+            U n_order = static_cast<U>
+                (*local_ptr_coeffs++);
+            // use horners method to evaluate the polynomial and its
+            // derivative simultaneously
+            T evaluation_result = *local_ptr_coeffs++;
+            T evaluation_result_der = 0;
+            for(U i_coeff = 0; i_coeff < n_order; ++i_coeff) {
+                evaluation_result_der = evaluation_result_der*argument +
+                    evaluation_result;
+                evaluation_result = evaluation_result*argument +
+                    *local_ptr_coeffs++;
+            }
+            values[i_dim] = evaluation_result;
+            // the derivatives are stored in the result and multiplied
+            // with the prefix and suffix products afterwards
+            local_ptr_result[i_dim] = evaluation_result_der;
+        }
+        // suffix products of the polynomial values (dimensions > i_dim)
+        suffix[n_dim - 1] = 1;
+        for(U i_dim = n_dim - 1; i_dim > 0; --i_dim) {
+            suffix[i_dim - 1] = suffix[i_dim] * values[i_dim];
+        }
+        // multiply derivative with prefix (dimensions < i_dim) and suffix
+        T prefix = 1;
+        for(U i_dim = 0; i_dim < n_dim; ++i_dim) {
+            local_ptr_result[i_dim] *= prefix * suffix[i_dim];
+            prefix *= values[i_dim];
+        }
+    }
+}
+
+template<typename T, typename U>
+int create_gpc_matrix_grad_omp_t(T* ptr_arguments, T* ptr_coeffs,
+    T* ptr_result, U n_arguments, U n_dim, U n_basis)
+{
+
+    #pragma omp parallel
+    {
+        std::vector<T> values(n_dim);
+        std::vector<T> suffix(n_dim);
+
+        #pragma omp for schedule(static)
+        for(U i_arguments = 0; i_arguments < n_arguments; ++i_arguments) {
+            create_gpc_matrix_grad_row_t<T, U>(
+                ptr_arguments + i_arguments * n_dim, ptr_coeffs,
+                ptr_result + i_arguments * n_basis * n_dim,
+                values.data(), suffix.data(), n_dim, n_basis);
+        }
+    }
+    return 0;
+}
+
+template<typename T, typename U>
+int create_gpc_matrix_grad_cpu_t(T* ptr_arguments, T* ptr_coeffs,
+    T* ptr_result, U n_arguments, U n_dim, U n_basis)
+{
+
+    std::vector<T> values(n_dim);
+    std::vector<T> suffix(n_dim);
+
+    for(U i_arguments = 0; i_arguments < n_arguments; ++i_arguments) {
+        create_gpc_matrix_grad_row_t<T, U>(
+            ptr_arguments + i_arguments * n_dim, ptr_coeffs,
+            ptr_result + i_arguments * n_basis * n_dim,
+            values.data(), suffix.data(), n_dim, n_basis);
+    }
+    return 0;
+}
+
+
 #endif
@@ -1,98 +1,91 @@
 #ifndef PYGPC_EXTENSIONS_GET_APPROXIMATION_H
 #define PYGPC_EXTENSIONS_GET_APPROXIMATION_H
 
-#include <cstdio>
+#include <vector>
 
-template<typename T>
-int get_approximation_cpu_t(T* ptr_arguments, T* ptr_poly_coeffs,
-    T* ptr_gpc_coeffs, T* ptr_result, long int n_arguments, long int n_dim,
-    long int n_basis, long int n_gpc_coeffs) {
-    
-    for(long int i_arguments = 0; i_arguments < n_arguments; ++i_arguments) {
-        long int i_basis = 0;
-        T* local_ptr_poly_coeffs = ptr_poly_coeffs;
-        while(i_basis != n_basis) {
-            long int i_dim = 0;
-            T accumulated_result = 1;
-            while(i_dim != n_dim) {
-                // get argument
-                T argument = ptr_arguments[i_arguments * n_dim + i_dim];
-                // get order of polynomial
-                // then to to first (highest) coefficient 
-                long int n_order = static_cast<long int>
-                    (*local_ptr_poly_coeffs++);
-                // initialize result variable with highest coefficient
-                // then go to next coefficient
-                T evaluation_result = *local_ptr_poly_coeffs++;
-                // use horners method to evaluate the polynomial
-                for(long int i_coeff = 0; i_coeff < n_order; ++i_coeff) {
-                    evaluation_result = evaluation_result*argument +
-                        *local_ptr_poly_coeffs++; 
-                }
-                // accumulate to overall result
-                accumulated_result *= evaluation_result;
-                // increment dimension counter
-                i_dim++;
-            }
-            // multiply accumulated_result with row of gpc coefficient matrix
-            for (long int i_gpc_coeffs = 0; i_gpc_coeffs < n_gpc_coeffs;
-                ++i_gpc_coeffs) {
-                ptr_result[i_arguments * n_gpc_coeffs + i_gpc_coeffs] += 
-                    ptr_gpc_coeffs[i_basis * n_gpc_coeffs + i_gpc_coeffs] *
-                    accumulated_result;
+
+// T: type of the arguments, polynomials and results (float or double)
+// C: type of the gpc coefficients and the accumulated sum over the basis
+//    functions (double)
+template<typename T, typename C, typename U>
+void get_approximation_row_t(T* ptr_argument, T* ptr_poly_coeffs,
+    C* ptr_gpc_coeffs, T* ptr_result, C* accumulator, U n_dim, U n_basis,
+    U n_gpc_coeffs)
+{
+    T* local_ptr_poly_coeffs = ptr_poly_coeffs;
+    for(U i_gpc_coeffs = 0; i_gpc_coeffs < n_gpc_coeffs; ++i_gpc_coeffs) {
+        accumulator[i_gpc_coeffs] = 0;
+    }
+    for(U i_basis = 0; i_basis < n_basis; ++i_basis) {
+        T accumulated_result = 1;
+        for(U i_dim = 0; i_dim < n_dim; ++i_dim) {
+            // get argument
+            T argument = ptr_argument[i_dim];
+            // get order of polynomial
+            // then to to first (highest) coefficient
+            U n_order = static_cast<U>
+                (*local_ptr_poly_coeffs++);
+            // initialize result variable with highest coefficient
+            // then go to next coefficient
+            T evaluation_result = *local_ptr_poly_coeffs++;
+            // use horners method to evaluate the polynomial
+            for(U i_coeff = 0; i_coeff < n_order; ++i_coeff) {
+                evaluation_result = evaluation_result*argument +
+                    *local_ptr_poly_coeffs++;
             }
-            // increment basis counter
-            i_basis++;
+            // accumulate to overall result
+            accumulated_result *= evaluation_result;
+        }
+        // multiply accumulated_result with row of gpc coefficient matrix
+        C* local_ptr_gpc_coeffs = ptr_gpc_coeffs + i_basis * n_gpc_coeffs;
+        for(U i_gpc_coeffs = 0; i_gpc_coeffs < n_gpc_coeffs; ++i_gpc_coeffs) {
+            accumulator[i_gpc_coeffs] += local_ptr_gpc_coeffs[i_gpc_coeffs] *
+                static_cast<C>(accumulated_result);
         }
     }
-    return 0;
+    // write result
+    for(U i_gpc_coeffs = 0; i_gpc_coeffs < n_gpc_coeffs; ++i_gpc_coeffs) {
+        ptr_result[i_gpc_coeffs] = static_cast<T>(accumulator[i_gpc_coeffs]);
+    }
 }
 
-template<typename T>
+template<typename T, typename C, typename U>
 int get_approximation_omp_t(T* ptr_arguments, T* ptr_poly_coeffs,
-    T* ptr_gpc_coeffs, T* ptr_result, long int n_arguments, long int n_dim,
-    long int n_basis, long int n_gpc_coeffs) {
-    
-    #pragma omp parallel for schedule(static)
-    for(long int i_arguments = 0; i_arguments < n_arguments; ++i_arguments) {
-        long int i_basis = 0;
-        T* local_ptr_poly_coeffs = ptr_poly_coeffs;
-        while(i_basis != n_basis) {
-            long int i_dim = 0;
-            T accumulated_result = 1;
-            while(i_dim != n_dim) {
-                // get argument
-                T argument = ptr_arguments[i_arguments * n_dim + i_dim];
-                // get order of polynomial
-                // then to to first (highest) coefficient 
-                long int n_order = static_cast<long int>
-                    (*local_ptr_poly_coeffs++);
-                // initialize result variable with highest coefficient
-                // then go to next coefficient
-                T evaluation_result = *local_ptr_poly_coeffs++;
-                // use horners method to evaluate the polynomial
-                for(long int i_coeff = 0; i_coeff < n_order; ++i_coeff) {
-                    evaluation_result = evaluation_result*argument +
-                        *local_ptr_poly_coeffs++; 
-                }
-                // accumulate to overall result
-                accumulated_result *= evaluation_result;
-                // increment dimension counter
-                i_dim++;
-            }
-            // multiply accumulated_result with row of gpc coefficient matrix
-            for (long int i_gpc_coeffs = 0; i_gpc_coeffs < n_gpc_coeffs;
-                ++i_gpc_coeffs) {
-                ptr_result[i_arguments * n_gpc_coeffs + i_gpc_coeffs] += 
-                    ptr_gpc_coeffs[i_basis * n_gpc_coeffs + i_gpc_coeffs] *
-                    accumulated_result;
-            }
-            // increment basis counter
-            i_basis++;
+    C* ptr_gpc_coeffs, T* ptr_result, U n_arguments, U n_dim, U n_basis,
+    U n_gpc_coeffs)
+{
+
+    #pragma omp parallel
+    {
+        std::vector<C> accumulator(n_gpc_coeffs);
+
+        #pragma omp for schedule(static)
+        for(U i_arguments = 0; i_arguments < n_arguments; ++i_arguments) {
+            get_approximation_row_t<T, C, U>(ptr_arguments + i_arguments * n_dim,
+                ptr_poly_coeffs, ptr_gpc_coeffs,
+                ptr_result + i_arguments * n_gpc_coeffs, accumulator.data(),
+                n_dim, n_basis, n_gpc_coeffs);
         }
     }
     return 0;
 }
 
+template<typename T, typename C, typename U>
+int get_approximation_cpu_t(T* ptr_arguments, T* ptr_poly_coeffs,
+    C* ptr_gpc_coeffs, T* ptr_result, U n_arguments, U n_dim, U n_basis,
+    U n_gpc_coeffs)
+{
+
+    std::vector<C> accumulator(n_gpc_coeffs);
+
+    for(U i_arguments = 0; i_arguments < n_arguments; ++i_arguments) {
+        get_approximation_row_t<T, C, U>(ptr_arguments + i_arguments * n_dim,
+            ptr_poly_coeffs, ptr_gpc_coeffs,
+            ptr_result + i_arguments * n_gpc_coeffs, accumulator.data(),
+            n_dim, n_basis, n_gpc_coeffs);
+    }
+    return 0;
+}
+
 
 #endif
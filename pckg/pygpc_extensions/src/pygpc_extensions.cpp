@@ -3,7 +3,7 @@
 
 
 #include "pygpc_extensions/create_gpc_matrix.hpp"
-//#include "pygpc_extensions/get_approximation.hpp"
+#include "pygpc_extensions/get_approximation.hpp"
 
 
 extern "C" {
@@ -20,34 +20,45 @@ static PyObject* create_gpc_matrix_cpu(PyObject* self, PyObject* args)
     if (!PyArg_ParseTuple(args, "O!O!O!", &PyArray_Type, &py_arguments,
         &PyArray_Type, &py_coeffs, &PyArray_Type, &py_result))
         return NULL;
-    
-    arguments = PyArray_FROM_OTF(py_arguments, NPY_DOUBLE,
-        NPY_ARRAY_IN_ARRAY);
-    coeffs = PyArray_FROM_OTF(py_coeffs, NPY_DOUBLE,
-        NPY_ARRAY_IN_ARRAY);
-    result = PyArray_FROM_OTF(py_result, NPY_DOUBLE,
+
+    // the type of the result array determines the precision (float/double),
+    // the input arrays are cast to it
+    int typenum = NPY_DOUBLE;
+    if (PyArray_TYPE((PyArrayObject*)py_result) == NPY_FLOAT)
+        typenum = NPY_FLOAT;
+
+    arguments = PyArray_FROM_OTF(py_arguments, typenum,
+        NPY_ARRAY_IN_ARRAY | NPY_ARRAY_FORCECAST);
+    coeffs = PyArray_FROM_OTF(py_coeffs, typenum,
+        NPY_ARRAY_IN_ARRAY | NPY_ARRAY_FORCECAST);
+    result = PyArray_FROM_OTF(py_result, typenum,
         NPY_ARRAY_OUT_ARRAY);
 
     npy_intp* ptr_dim_arguments = PyArray_DIMS(arguments);
     npy_intp n_arguments = ptr_dim_arguments[0];
     npy_intp n_dim = ptr_dim_arguments[1];
-    double* ptr_arguments = (double*)PyArray_DATA(arguments);
 
     npy_intp* ptr_dim_result = PyArray_DIMS(result);
     npy_intp n_basis = ptr_dim_result[1];
     npy_intp n_grad = ptr_dim_result[2];
-    double* ptr_result = (double*)PyArray_DATA(result);
 
-    double* ptr_coeffs = (double*)PyArray_DATA(coeffs);
-
-    create_gpc_matrix_cpu_t<double, npy_intp>(ptr_arguments,
-        ptr_coeffs, ptr_result, n_arguments, n_dim, n_basis, n_grad);
+    if (typenum == NPY_FLOAT) {
+        create_gpc_matrix_cpu_t<float, npy_intp>(
+            (float*)PyArray_DATA(arguments), (float*)PyArray_DATA(coeffs),
+            (float*)PyArray_DATA(result), n_arguments, n_dim, n_basis, n_grad);
+    }
+    else {
+        create_gpc_matrix_cpu_t<double, npy_intp>(
+            (double*)PyArray_DATA(arguments), (double*)PyArray_DATA(coeffs),
+            (double*)PyArray_DATA(result), n_arguments, n_dim, n_basis,
+            n_grad);
+    }
 
     Py_DECREF(arguments);
     Py_DECREF(coeffs);
     Py_DECREF(result);
 
-    return Py_None;
+    Py_RETURN_NONE;
 }
 
 static PyObject* create_gpc_matrix_omp(PyObject* self, PyObject* args)
@@ -62,34 +73,271 @@ static PyObject* create_gpc_matrix_omp(PyObject* self, PyObject* args)
     if (!PyArg_ParseTuple(args, "O!O!O!", &PyArray_Type, &py_arguments,
         &PyArray_Type, &py_coeffs, &PyArray_Type, &py_result))
         return NULL;
-    
-    arguments = PyArray_FROM_OTF(py_arguments, NPY_DOUBLE,
-        NPY_ARRAY_IN_ARRAY);
-    coeffs = PyArray_FROM_OTF(py_coeffs, NPY_DOUBLE,
-        NPY_ARRAY_IN_ARRAY);
-    result = PyArray_FROM_OTF(py_result, NPY_DOUBLE,
+
+    // the type of the result array determines the precision (float/double),
+    // the input arrays are cast to it
+    int typenum = NPY_DOUBLE;
+    if (PyArray_TYPE((PyArrayObject*)py_result) == NPY_FLOAT)
+        typenum = NPY_FLOAT;
+
+    arguments = PyArray_FROM_OTF(py_arguments, typenum,
+        NPY_ARRAY_IN_ARRAY | NPY_ARRAY_FORCECAST);
+    coeffs = PyArray_FROM_OTF(py_coeffs, typenum,
+        NPY_ARRAY_IN_ARRAY | NPY_ARRAY_FORCECAST);
+    result = PyArray_FROM_OTF(py_result, typenum,
         NPY_ARRAY_OUT_ARRAY);
 
     npy_intp* ptr_dim_arguments = PyArray_DIMS(arguments);
     npy_intp n_arguments = ptr_dim_arguments[0];
     npy_intp n_dim = ptr_dim_arguments[1];
-    double* ptr_arguments = (double*)PyArray_DATA(arguments);
 
     npy_intp* ptr_dim_result = PyArray_DIMS(result);
     npy_intp n_basis = ptr_dim_result[1];
     npy_intp n_grad = ptr_dim_result[2];
-    double* ptr_result = (double*)PyArray_DATA(result);
 
-    double* ptr_coeffs = (double*)PyArray_DATA(coeffs);
+    if (typenum == NPY_FLOAT) {
+        create_gpc_matrix_omp_t<float, npy_intp>(
+            (float*)PyArray_DATA(arguments), (float*)PyArray_DATA(coeffs),
+            (float*)PyArray_DATA(result), n_arguments, n_dim, n_basis, n_grad);
+    }
+    else {
+        create_gpc_matrix_omp_t<double, npy_intp>(
+            (double*)PyArray_DATA(arguments), (double*)PyArray_DATA(coeffs),
+            (double*)PyArray_DATA(result), n_arguments, n_dim, n_basis,
+            n_grad);
+    }
+
+    Py_DECREF(arguments);
+    Py_DECREF(coeffs);
+    Py_DECREF(result);
+
+    Py_RETURN_NONE;
+}
+
+static PyObject* create_gpc_matrix_grad_cpu(PyObject* self, PyObject* args)
+{
+    PyObject* py_arguments = NULL;
+    PyObject* py_result = NULL;
+    PyObject* py_coeffs = NULL;
+    PyObject* arguments = NULL;
+    PyObject* result = NULL;
+    PyObject* coeffs = NULL;
+
+    if (!PyArg_ParseTuple(args, "O!O!O!", &PyArray_Type, &py_arguments,
+        &PyArray_Type, &py_coeffs, &PyArray_Type, &py_result))
+        return NULL;
+
+    // the type of the result array determines the precision (float/double),
+    // the input arrays are cast to it
+    int typenum = NPY_DOUBLE;
+    if (PyArray_TYPE((PyArrayObject*)py_result) == NPY_FLOAT)
+        typenum = NPY_FLOAT;
+
+    arguments = PyArray_FROM_OTF(py_arguments, typenum,
+        NPY_ARRAY_IN_ARRAY | NPY_ARRAY_FORCECAST);
+    coeffs = PyArray_FROM_OTF(py_coeffs, typenum,
+        NPY_ARRAY_IN_ARRAY | NPY_ARRAY_FORCECAST);
+    result = PyArray_FROM_OTF(py_result, typenum,
+        NPY_ARRAY_OUT_ARRAY);
+
+    npy_intp* ptr_dim_arguments = PyArray_DIMS(arguments);
+    npy_intp n_arguments = ptr_dim_arguments[0];
+    npy_intp n_dim = ptr_dim_arguments[1];
+
+    npy_intp* ptr_dim_result = PyArray_DIMS(result);
+    npy_intp n_basis = ptr_dim_result[1];
+
+    if (typenum == NPY_FLOAT) {
+        create_gpc_matrix_grad_cpu_t<float, npy_intp>(
+            (float*)PyArray_DATA(arguments), (float*)PyArray_DATA(coeffs),
+            (float*)PyArray_DATA(result), n_arguments, n_dim, n_basis);
+    }
+    else {
+        create_gpc_matrix_grad_cpu_t<double, npy_intp>(
+            (double*)PyArray_DATA(arguments), (double*)PyArray_DATA(coeffs),
+            (double*)PyArray_DATA(result), n_arguments, n_dim, n_basis);
+    }
+
+    Py_DECREF(arguments);
+    Py_DECREF(coeffs);
+    Py_DECREF(result);
+
+    Py_RETURN_NONE;
+}
+
+static PyObject* create_gpc_matrix_grad_omp(PyObject* self, PyObject* args)
+{
+    PyObject* py_arguments = NULL;
+    PyObject* py_result = NULL;
+    PyObject* py_coeffs = NULL;
+    PyObject* arguments = NULL;
+    PyObject* result = NULL;
+    PyObject* coeffs = NULL;
+
+    if (!PyArg_ParseTuple(args, "O!O!O!", &PyArray_Type, &py_arguments,
+        &PyArray_Type, &py_coeffs, &PyArray_Type, &py_result))
+        return NULL;
+
+    // the type of the result array determines the precision (float/double),
+    // the input arrays are cast to it
+    int typenum = NPY_DOUBLE;
+    if (PyArray_TYPE((PyArrayObject*)py_result) == NPY_FLOAT)
+        typenum = NPY_FLOAT;
 
-    create_gpc_matrix_omp_t<double, npy_intp>(ptr_arguments,
-        ptr_coeffs, ptr_result, n_arguments, n_dim, n_basis, n_grad);
+    arguments = PyArray_FROM_OTF(py_arguments, typenum,
+        NPY_ARRAY_IN_ARRAY | NPY_ARRAY_FORCECAST);
+    coeffs = PyArray_FROM_OTF(py_coeffs, typenum,
+        NPY_ARRAY_IN_ARRAY | NPY_ARRAY_FORCECAST);
+    result = PyArray_FROM_OTF(py_result, typenum,
+        NPY_ARRAY_OUT_ARRAY);
+
+    npy_intp* ptr_dim_arguments = PyArray_DIMS(arguments);
+    npy_intp n_arguments = ptr_dim_arguments[0];
+    npy_intp n_dim = ptr_dim_arguments[1];
+
+    npy_intp* ptr_dim_result = PyArray_DIMS(result);
+    npy_intp n_basis = ptr_dim_result[1];
+
+    if (typenum == NPY_FLOAT) {
+        create_gpc_matrix_grad_omp_t<float, npy_intp>(
+            (float*)PyArray_DATA(arguments), (float*)PyArray_DATA(coeffs),
+            (float*)PyArray_DATA(result), n_arguments, n_dim, n_basis);
+    }
+    else {
+        create_gpc_matrix_grad_omp_t<double, npy_intp>(
+            (double*)PyArray_DATA(arguments), (double*)PyArray_DATA(coeffs),
+            (double*)PyArray_DATA(result), n_arguments, n_dim, n_basis);
+    }
 
     Py_DECREF(arguments);
     Py_DECREF(coeffs);
     Py_DECREF(result);
 
-    return Py_None;
+    Py_RETURN_NONE;
+}
+
+static PyObject* get_approximation_cpu(PyObject* self, PyObject* args)
+{
+    PyObject* py_arguments = NULL;
+    PyObject* py_poly_coeffs = NULL;
+    PyObject* py_gpc_coeffs = NULL;
+    PyObject* py_result = NULL;
+    PyObject* arguments = NULL;
+    PyObject* poly_coeffs = NULL;
+    PyObject* gpc_coeffs = NULL;
+    PyObject* result = NULL;
+
+    if (!PyArg_ParseTuple(args, "O!O!O!O!", &PyArray_Type, &py_arguments,
+        &PyArray_Type, &py_poly_coeffs, &PyArray_Type, &py_gpc_coeffs,
+        &PyArray_Type, &py_result))
+        return NULL;
+
+    // the type of the result array determines the precision (float/double)
+    // of the polynomials, the arguments are cast to it; the gpc coefficients
+    // and the sum over the basis functions are kept in double precision
+    int typenum = NPY_DOUBLE;
+    if (PyArray_TYPE((PyArrayObject*)py_result) == NPY_FLOAT)
+        typenum = NPY_FLOAT;
+
+    arguments = PyArray_FROM_OTF(py_arguments, typenum,
+        NPY_ARRAY_IN_ARRAY | NPY_ARRAY_FORCECAST);
+    poly_coeffs = PyArray_FROM_OTF(py_poly_coeffs, typenum,
+        NPY_ARRAY_IN_ARRAY | NPY_ARRAY_FORCECAST);
+    gpc_coeffs = PyArray_FROM_OTF(py_gpc_coeffs, NPY_DOUBLE,
+        NPY_ARRAY_IN_ARRAY | NPY_ARRAY_FORCECAST);
+    result = PyArray_FROM_OTF(py_result, typenum,
+        NPY_ARRAY_OUT_ARRAY);
+
+    npy_intp* ptr_dim_arguments = PyArray_DIMS(arguments);
+    npy_intp n_arguments = ptr_dim_arguments[0];
+    npy_intp n_dim = ptr_dim_arguments[1];
+
+    npy_intp* ptr_dim_gpc_coeffs = PyArray_DIMS(gpc_coeffs);
+    npy_intp n_basis = ptr_dim_gpc_coeffs[0];
+    npy_intp n_gpc_coeffs = ptr_dim_gpc_coeffs[1];
+
+    if (typenum == NPY_FLOAT) {
+        get_approximation_cpu_t<float, double, npy_intp>(
+            (float*)PyArray_DATA(arguments), (float*)PyArray_DATA(poly_coeffs),
+            (double*)PyArray_DATA(gpc_coeffs), (float*)PyArray_DATA(result),
+            n_arguments, n_dim, n_basis, n_gpc_coeffs);
+    }
+    else {
+        get_approximation_cpu_t<double, double, npy_intp>(
+            (double*)PyArray_DATA(arguments),
+            (double*)PyArray_DATA(poly_coeffs),
+            (double*)PyArray_DATA(gpc_coeffs), (double*)PyArray_DATA(result),
+            n_arguments, n_dim, n_basis, n_gpc_coeffs);
+    }
+
+    Py_DECREF(arguments);
+    Py_DECREF(poly_coeffs);
+    Py_DECREF(gpc_coeffs);
+    Py_DECREF(result);
+
+    Py_RETURN_NONE;
+}
+
+static PyObject* get_approximation_omp(PyObject* self, PyObject* args)
+{
+    PyObject* py_arguments = NULL;
+    PyObject* py_poly_coeffs = NULL;
+    PyObject* py_gpc_coeffs = NULL;
+    PyObject* py_result = NULL;
+    PyObject* arguments = NULL;
+    PyObject* poly_coeffs = NULL;
+    PyObject* gpc_coeffs = NULL;
+    PyObject* result = NULL;
+
+    if (!PyArg_ParseTuple(args, "O!O!O!O!", &PyArray_Type, &py_arguments,
+        &PyArray_Type, &py_poly_coeffs, &PyArray_Type, &py_gpc_coeffs,
+        &PyArray_Type, &py_result))
+        return NULL;
+
+    // the type of the result array determines the precision (float/double)
+    // of the polynomials, the arguments are cast to it; the gpc coefficients
+    // and the sum over the basis functions are kept in double precision
+    int typenum = NPY_DOUBLE;
+    if (PyArray_TYPE((PyArrayObject*)py_result) == NPY_FLOAT)
+        typenum = NPY_FLOAT;
+
+    arguments = PyArray_FROM_OTF(py_arguments, typenum,
+        NPY_ARRAY_IN_ARRAY | NPY_ARRAY_FORCECAST);
+    poly_coeffs = PyArray_FROM_OTF(py_poly_coeffs, typenum,
+        NPY_ARRAY_IN_ARRAY | NPY_ARRAY_FORCECAST);
+    gpc_coeffs = PyArray_FROM_OTF(py_gpc_coeffs, NPY_DOUBLE,
+        NPY_ARRAY_IN_ARRAY | NPY_ARRAY_FORCECAST);
+    result = PyArray_FROM_OTF(py_result, typenum,
+        NPY_ARRAY_OUT_ARRAY);
+
+    npy_intp* ptr_dim_arguments = PyArray_DIMS(arguments);
+    npy_intp n_arguments = ptr_dim_arguments[0];
+    npy_intp n_dim = ptr_dim_arguments[1];
+
+    npy_intp* ptr_dim_gpc_coeffs = PyArray_DIMS(gpc_coeffs);
+    npy_intp n_basis = ptr_dim_gpc_coeffs[0];
+    npy_intp n_gpc_coeffs = ptr_dim_gpc_coeffs[1];
+
+    if (typenum == NPY_FLOAT) {
+        get_approximation_omp_t<float, double, npy_intp>(
+            (float*)PyArray_DATA(arguments), (float*)PyArray_DATA(poly_coeffs),
+            (double*)PyArray_DATA(gpc_coeffs), (float*)PyArray_DATA(result),
+            n_arguments, n_dim, n_basis, n_gpc_coeffs);
+    }
+    else {
+        get_approximation_omp_t<double, double, npy_intp>(
+            (double*)PyArray_DATA(arguments),
+            (double*)PyArray_DATA(poly_coeffs),
+            (double*)PyArray_DATA(gpc_coeffs), (double*)PyArray_DATA(result),
+            n_arguments, n_dim, n_basis, n_gpc_coeffs);
+    }
+
+    Py_DECREF(arguments);
+    Py_DECREF(poly_coeffs);
+    Py_DECREF(gpc_coeffs);
+    Py_DECREF(result);
+
+    Py_RETURN_NONE;
 }
 
 
@@ -97,6 +345,10 @@ static PyMethodDef methods[] =
 {
     {"create_gpc_matrix_cpu", create_gpc_matrix_cpu, METH_VARARGS, ""},
     {"create_gpc_matrix_omp", create_gpc_matrix_omp, METH_VARARGS, ""},
+    {"create_gpc_matrix_grad_cpu", create_gpc_matrix_grad_cpu, METH_VARARGS, ""},
+    {"create_gpc_matrix_grad_omp", create_gpc_matrix_grad_omp, METH_VARARGS, ""},
+    {"get_approximation_cpu", get_approximation_cpu, METH_VARARGS, ""},
+    {"get_approximation_omp", get_approximation_omp, METH_VARARGS, ""},
     {NULL, NULL, 0, NULL}
 };
 
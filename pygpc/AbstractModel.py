@@ -52,6 +52,8 @@ class AbstractModel:
                 - i_subiter   : current sub-iteration
                 - coords      : parameters of particular simulation in original parameter space
                 - coords_norm : parameters of particular simulation in normalized parameter space
+                - evaluation_cache : EvaluationCache to look up and store the results (or None)
+                - cache_model_id : identifier of the model in the EvaluationCache (or None)
         """
 
         self.p = p
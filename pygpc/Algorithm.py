@@ -15,6 +15,8 @@ from .misc import get_coords_discontinuity
 from .misc import increment_basis
 from .misc import get_num_coeffs_sparse
 from .Grid import *
+from .GrowableArray import GrowableArray
+from .HDF5Array import HDF5Array
 from .MEGPC import *
 from .Problem import *
 from .SGPC import *
@@ -68,8 +70,31 @@ class Algorithm(object):
             Choose type of error to validate gpc approximation. Use "loocv" (Leave-one-Out cross validation)
             to omit any additional calculations and "nrmsd" (normalized root mean square deviation) to compare
             against a Problem.ValidationSet.
+        options["cv_mode"] : str, optional, default: "loo"
+            Cross validation mode of sparse solvers (OMP, LarsLasso) if "error_type" is "loocv" (least squares
+            solvers use the exact leave-one-out error)
+            - "loo" ... leave-one-out of "cv_n_folds" randomly selected grid points
+            - "kfold" ... "cv_n_folds" disjoint folds (every grid point is tested once)
+            - "subsample" ... "cv_n_folds" random subsets of "cv_test_ratio" * n_grid grid points
+        options["cv_n_folds"] : int, optional, default: 25
+            Number of folds of the cross validation
+        options["cv_test_ratio"] : float, optional, default: 0.1
+            Ratio of test points of every fold in case of "cv_mode" = "subsample"
+        options["cv_n_threads"] : int, optional, default: None
+            Number of threads processing the folds of the cross validation (None: number of CPUs)
+        options["cv_seed"] : int, optional, default: None
+            Seed of the random number generator determining the folds of the cross validation
         options["fn_results"] : string, optional, default=None
             If provided, model evaluations are saved in fn_results.hdf5 file and gpc object in fn_results.pkl file
+        options["out_of_core"] : boolean, optional, default: False
+            Store the results and the gPC matrices out-of-core in the datasets "model_evaluations/results",
+            "gpc_matrix" and "gpc_matrix_gradient" of fn_results.hdf5 (RegAdaptive, requires fn_results). New grid
+            points and basis functions are appended to the datasets instead of rewriting them in every iteration.
+            The least squares solvers and the leave-one-out cross validation process the data in row blocks
+            fitting into options["memory_limit"]. 'Moore-Penrose' accumulates the QR decomposition of the row blocks
+            (accurate for ill-conditioned gPC matrices), 'incremental-lstsq' accumulates the normal equations, which
+            is cheaper, but squares the condition number (falls back to the QR decomposition if the condition number
+            of the normal equations exceeds settings["cond_max"]).
         options["gradient_enhanced"] : boolean, optional, default: False
             Use gradient information to determine the gPC coefficients.
         options["gradient_calculation"] : str, optional, default="standard_forward"
@@ -83,9 +108,21 @@ class Algorithm(object):
             Options for gradient calculation (details in get_gradient() function in Gradient.py)
         options["backend"] : str, optional, default: "python"
             Default computing backend, certain functions can be computed with Multicore-CPU or GPU acceleration
+        options["dtype"] : str, optional, default: "float64"
+            Floating point precision ("float64" or "float32") used to evaluate the gPC approximation. The gPC matrix
+            of the regression and the gPC coefficients are always determined in "float64". "float32" halves the memory
+            and increases the throughput of large evaluations at a relative accuracy of about 1e-5.
+        options["memory_limit"] : float, optional, default: 1.
+            Memory in GB, which is available for gPC matrix blocks when evaluating the gPC approximation
+            (e.g. in post-processing). The coordinates are processed in blocks fitting into this limit.
         options["lambda_eps_gradient"] : float, optional, default: 0.95
             Bound of principal components in %. All eigenvectors are included until lambda_eps of total sum of all
             eigenvalues is included in the system.
+        options["lambda_eps_output"] : float, optional, default: None
+            Compression of the output quantities (e.g. time series or field values) before solving. The gPC is
+            determined for the principal components of the results, which include lambda_eps_output (0...1) of the
+            energy of the centered results. The gPC coefficients (ReducedCoeffs) are only expanded to all output
+            quantities on request. None: no compression.
         options["matrix_ratio"]: float, optional, default=1.5
             Ration between the number of model evaluations and the number of basis functions.
             If "adaptive_sampling" is activated this factor is only used to
@@ -97,6 +134,16 @@ class Algorithm(object):
             GPC method to apply ['Reg', 'Quad']
         options["n_cpu"] : int, optional, default=1
             Number of threads to use for parallel evaluation of the model function.
+        options["dispatch"] : str, optional, default: "map"
+            Dispatch of the grid points to the worker processes (n_cpu > 1)
+            - "map": one task per grid point, the results are returned by the tasks
+            - "shared_memory": the coordinates and results are stored in shared memory and the tasks only contain
+              index ranges of the grid points (recommended for many and cheap model evaluations)
+            - "vectorized": chunks of grid points are evaluated by one call of the model in the worker processes
+              (for vectorized models, which can evaluate several grid points at once like with n_cpu=0)
+        options["chunk_size"] : int, optional, default: None
+            Number of grid points per call of the model for options["dispatch"] = "vectorized"
+            (Default: 4 chunks per worker process)
         options["n_samples_validation"] : int, optional, default: 1e4
             Number of validation points used to determine the NRMSD if chosen as "error_type". Does not create a
             validation set if there is already one present in the Problem instance (problem.validation).
@@ -110,10 +157,17 @@ class Algorithm(object):
             Solver to determine the gPC coefficients
             - 'Moore-Penrose' ... Pseudoinverse of gPC matrix (SGPC.Reg, EGPC)
             - 'OMP' ... Orthogonal Matching Pursuit, sparse recovery approach (SGPC.Reg, EGPC)
+            - 'incremental-lstsq' ... Least squares solution with incrementally updated Cholesky factorization
+              of the normal equations (SGPC.Reg)
         options["settings"]: dict
             Solver settings
             - 'Moore-Penrose' ... None
             - 'OMP' ... {"n_coeffs_sparse": int} Number of gPC coefficients != 0
+              {"joint": bool} Simultaneous OMP with common support of all output quantities (default: False),
+              {"n_out_block": int} Number of output quantities, whose correlations are determined at once (the
+              support is common to all output quantities, default: determined by options["memory_limit"])
+            - 'incremental-lstsq' ... {"lambda": float >= 0, "cond_max": float} Tikhonov regularization parameter
+              (default: 0) and maximal condition number of the normal equations (default: 1e12)
         options["verbose"] : boolean, optional, default=True
             Print output of iterations and sub-iterations (True/False)
         options["backend"] : str
@@ -131,9 +185,30 @@ class Algorithm(object):
         if "error_type" not in self.options.keys():
             self.options["error_type"] = "loocv"
 
+        if "cv_mode" not in self.options.keys():
+            self.options["cv_mode"] = "loo"
+
+        if "cv_n_folds" not in self.options.keys():
+            self.options["cv_n_folds"] = 25
+
+        if "cv_test_ratio" not in self.options.keys():
+            self.options["cv_test_ratio"] = 0.1
+
+        if "cv_n_threads" not in self.options.keys():
+            self.options["cv_n_threads"] = None
+
+        if "cv_seed" not in self.options.keys():
+            self.options["cv_seed"] = None
+
         if "fn_results" not in self.options.keys():
             self.options["fn_results"] = None
 
+        if "out_of_core" not in self.options.keys():
+            self.options["out_of_core"] = False
+
+        if self.options["out_of_core"] and self.options["fn_results"] is None:
+            raise AssertionError("Please specify 'fn_results' to store the results out-of-core")
+
         if "gradient_enhanced" not in self.options.keys():
             self.options["gradient_enhanced"] = False
 
@@ -152,9 +227,18 @@ class Algorithm(object):
         if "backend" not in self.options.keys():
             self.options["backend"] = "python"
 
+        if "dtype" not in self.options.keys():
+            self.options["dtype"] = "float64"
+
+        if "memory_limit" not in self.options.keys():
+            self.options["memory_limit"] = 1.
+
         if "lambda_eps_gradient" not in self.options.keys():
             self.options["lambda_eps_gradient"] = 0.95
 
+        if "lambda_eps_output" not in self.options.keys():
+            self.options["lambda_eps_output"] = None
+
         if "matrix_ratio" not in self.options.keys():
             self.options["matrix_ratio"] = 2
 
@@ -167,12 +251,20 @@ class Algorithm(object):
                 self.options["settings"] = None
             elif self.options["method"] == "reg" and not (self.options["solver"] == "Moore-Penrose" or
                                                           self.options["solver"] == "OMP" or
-                                                          self.options["solver"] == "LarsLasso"):
-                raise AssertionError("Please specify 'Moore-Penrose' or 'OMP' as solver for 'reg' method")
+                                                          self.options["solver"] == "LarsLasso" or
+                                                          self.options["solver"] == "incremental-lstsq"):
+                raise AssertionError("Please specify 'Moore-Penrose', 'OMP', 'LarsLasso' or 'incremental-lstsq' as "
+                                     "solver for 'reg' method")
 
         if "n_cpu" in self.options.keys():
             self.n_cpu = self.options["n_cpu"]
 
+        if "dispatch" not in self.options.keys():
+            self.options["dispatch"] = "map"
+
+        if "chunk_size" not in self.options.keys():
+            self.options["chunk_size"] = None
+
         if "n_samples_validation" not in self.options.keys():
             self.options["n_samples_validation"] = 1e4
 
@@ -208,6 +300,16 @@ class Algorithm(object):
         if self.options["solver"] == "Moore-Penrose":
             self.options["settings"] = None
 
+        if self.options["solver"] == "incremental-lstsq":
+            if "settings" not in self.options.keys() or self.options["settings"] is None:
+                self.options["settings"] = dict()
+
+            if "lambda" not in self.options["settings"].keys():
+                self.options["settings"]["lambda"] = 0.
+
+            if "cond_max" not in self.options["settings"].keys():
+                self.options["settings"]["cond_max"] = 1e12
+
         if self.options["solver"] == "OMP" and ("settings" not in self.options.keys() or not (
                 "n_coeffs_sparse" not in self.options["settings"].keys() or
                 "sparsity" not in self.options["settings"].keys())):
@@ -357,7 +459,8 @@ class Static(Algorithm):
         gpc.interaction_order_current = copy.deepcopy(self.options["interaction_order"])
 
         # Initialize parallel Computation class
-        com = Computation(n_cpu=self.n_cpu, matlab_model=self.options["matlab_model"])
+        com = Computation(n_cpu=self.n_cpu, matlab_model=self.options["matlab_model"],
+                          dispatch=self.options["dispatch"], chunk_size=self.options["chunk_size"])
 
         # Run simulations
         iprint("Performing {} simulations!".format(gpc.grid.coords.shape[0]),
@@ -586,7 +689,8 @@ class MEStatic(Algorithm):
         grid = self.grid
 
         # Initialize parallel Computation class
-        com = Computation(n_cpu=self.n_cpu, matlab_model=self.options["matlab_model"])
+        com = Computation(n_cpu=self.n_cpu, matlab_model=self.options["matlab_model"],
+                          dispatch=self.options["dispatch"], chunk_size=self.options["chunk_size"])
 
         # Run simulations
         iprint("Performing {} simulations!".format(grid.coords.shape[0]),
@@ -915,7 +1019,8 @@ class StaticProjection(Algorithm):
                              options=self.options["grid_options"])
 
         # Initialize parallel Computation class
-        com = Computation(n_cpu=self.n_cpu, matlab_model=self.options["matlab_model"])
+        com = Computation(n_cpu=self.n_cpu, matlab_model=self.options["matlab_model"],
+                          dispatch=self.options["dispatch"], chunk_size=self.options["chunk_size"])
 
         # Run simulations
         iprint("Performing {} simulations!".format(grid_original.coords.shape[0]),
@@ -1310,7 +1415,8 @@ class MEStaticProjection(Algorithm):
                     options=self.options["grid_options"])
 
         # Initialize parallel Computation class
-        com = Computation(n_cpu=self.n_cpu, matlab_model=self.options["matlab_model"])
+        com = Computation(n_cpu=self.n_cpu, matlab_model=self.options["matlab_model"],
+                          dispatch=self.options["dispatch"], chunk_size=self.options["chunk_size"])
 
         # Run simulations
         iprint("Performing {} simulations!".format(grid.coords.shape[0]),
@@ -1736,6 +1842,7 @@ class RegAdaptive(Algorithm):
         # initialize iterators
         eps = self.options["eps"] + 1.0
         i_grid = 0
+        res_buffer = GrowableArray()
         order = self.options["order_start"]
         first_iter = True
         grad_res_3D = None
@@ -1746,7 +1853,8 @@ class RegAdaptive(Algorithm):
                                 min(self.options["interaction_order"], self.options["order_start"])])
 
         # Initialize parallel Computation class
-        com = Computation(n_cpu=self.n_cpu, matlab_model=self.options["matlab_model"])
+        com = Computation(n_cpu=self.n_cpu, matlab_model=self.options["matlab_model"],
+                          dispatch=self.options["dispatch"], chunk_size=self.options["chunk_size"])
 
         # Initialize Reg gPC object
         print("Initializing gPC object...")
@@ -1766,7 +1874,7 @@ class RegAdaptive(Algorithm):
                                       n_cpu=self.options["n_cpu"])
 
         # Initialize Grid object
-        if self.options["solver"] == "Moore-Penrose":
+        if self.options["solver"] in ["Moore-Penrose", "incremental-lstsq"]:
             n_grid_init = np.ceil(self.options["matrix_ratio"] * gpc.basis.n_basis)
         else:
             n_grid_init = gpc.basis.n_basis
@@ -1780,6 +1888,10 @@ class RegAdaptive(Algorithm):
         gpc.settings = self.options["settings"]
         gpc.options = copy.deepcopy(self.options)
 
+        # store gpc matrices out-of-core in the results file
+        if self.options["out_of_core"]:
+            gpc.set_out_of_core(fn_results + ".hdf5")
+
         # Initialize gpc matrix
         print("Initializing gPC matrix...")
         gpc.init_gpc_matrix(gradient_idx=gradient_idx)
@@ -1874,10 +1986,16 @@ class RegAdaptive(Algorithm):
                                tab=0, verbose=self.options["verbose"])
 
                         # Append result to solution matrix (RHS)
-                        if i_grid == 0:
+                        if self.options["out_of_core"]:
+                            # results of the models are already stored in the results file (the new rows are
+                            # written again in case the model did not store them)
+                            res = HDF5Array(fn=fn_results + ".hdf5", name="model_evaluations/results")
+                            res.set_rows(i_start=int(i_grid), values=res_new)
+                        elif i_grid == 0:
                             res = res_new
                         else:
-                            res = np.vstack([res, res_new])
+                            res_buffer.adopt(res)
+                            res = res_buffer.append_rows(res_new)
 
                         if self.options["gradient_enhanced"]:
                             start_time = time.time()
@@ -1909,7 +2027,7 @@ class RegAdaptive(Algorithm):
                         i_grid = gpc.grid.coords.shape[0]
 
                     # update gpc matrix
-                    gpc.init_gpc_matrix(gradient_idx=gradient_idx)
+                    gpc.update_gpc_matrix(gradient_idx=gradient_idx)
 
                     # determine gpc coefficients
                     coeffs = gpc.solve(results=res,
@@ -1972,23 +2090,25 @@ class RegAdaptive(Algorithm):
                         f.create_dataset("model_evaluations/gradient_results_idx", data=gpc.gradient_idx,
                                          maxshape=None, dtype="int64")
 
-                    try:
-                        del f["gpc_matrix"]
-                    except KeyError:
-                        pass
-                    f.create_dataset("gpc_matrix",
-                                     data=gpc.gpc_matrix,
-                                     maxshape=None, dtype="float64")
-
-                    if gpc.gpc_matrix_gradient is not None:
+                    # out-of-core gpc matrices are already stored in the results file
+                    if not self.options["out_of_core"]:
                         try:
-                            del f["gpc_matrix_gradient"]
+                            del f["gpc_matrix"]
                         except KeyError:
                             pass
-                        f.create_dataset("gpc_matrix_gradient",
-                                         data=gpc.gpc_matrix_gradient,
+                        f.create_dataset("gpc_matrix",
+                                         data=gpc.gpc_matrix,
                                          maxshape=None, dtype="float64")
 
+                        if gpc.gpc_matrix_gradient is not None:
+                            try:
+                                del f["gpc_matrix_gradient"]
+                            except KeyError:
+                                pass
+                            f.create_dataset("gpc_matrix_gradient",
+                                             data=gpc.gpc_matrix_gradient,
+                                             maxshape=None, dtype="float64")
+
         # determine gpc coefficients
         coeffs = gpc.solve(results=res,
                            gradient_results=grad_res_3D,
@@ -1997,7 +2117,7 @@ class RegAdaptive(Algorithm):
                            verbose=True)
 
         gpc.gpc_matrix.shape
-        len(gpc.basis.b)
+        gpc.basis.n_basis
         # save gpc object and gpc coeffs
         if self.options["fn_results"] is not None:
 
@@ -2006,23 +2126,25 @@ class RegAdaptive(Algorithm):
                     del f['coeffs']
                 f.create_dataset("coeffs", data=coeffs, maxshape=None, dtype="float64")
 
-                try:
-                    del f["gpc_matrix"]
-                except KeyError:
-                    pass
-                f.create_dataset("gpc_matrix",
-                                 data=gpc.gpc_matrix,
-                                 maxshape=None, dtype="float64")
-
-                if gpc.gpc_matrix_gradient is not None:
+                # out-of-core gpc matrices are already stored in the results file
+                if not self.options["out_of_core"]:
                     try:
-                        del f["gpc_matrix_gradient"]
+                        del f["gpc_matrix"]
                     except KeyError:
                         pass
-                    f.create_dataset("gpc_matrix_gradient",
-                                     data=gpc.gpc_matrix_gradient,
+                    f.create_dataset("gpc_matrix",
+                                     data=gpc.gpc_matrix,
                                      maxshape=None, dtype="float64")
 
+                    if gpc.gpc_matrix_gradient is not None:
+                        try:
+                            del f["gpc_matrix_gradient"]
+                        except KeyError:
+                            pass
+                        f.create_dataset("gpc_matrix_gradient",
+                                         data=gpc.gpc_matrix_gradient,
+                                         maxshape=None, dtype="float64")
+
                 # misc
                 f.create_dataset("misc/fn_session",
                                  data=np.array([os.path.split(self.options["fn_session"])[1]]).astype("|S"))
@@ -2150,6 +2272,7 @@ class MERegAdaptiveProjection(Algorithm):
         gradient_idx = None
         gradient_idx_FD_fwd = None
         basis_increment = 0
+        res_all_buffer = GrowableArray()
 
         n_grid_init = self.options["n_grid_init"]
 
@@ -2160,7 +2283,8 @@ class MERegAdaptiveProjection(Algorithm):
                     options=self.options["grid"])
 
         # Initialize parallel Computation class
-        com = Computation(n_cpu=self.n_cpu, matlab_model=self.options["matlab_model"])
+        com = Computation(n_cpu=self.n_cpu, matlab_model=self.options["matlab_model"],
+                          dispatch=self.options["dispatch"], chunk_size=self.options["chunk_size"])
 
         # Run initial simulations to determine initial projection matrix
         iprint("Performing {} initial simulations!".format(grid.coords.shape[0]),
@@ -2329,7 +2453,8 @@ class MERegAdaptiveProjection(Algorithm):
                 megpc[i_qoi].gpc[d].settings = self.options["settings"]
 
                 # extend initial grid and perform additional simulations if necessary
-                if not self.options["adaptive_sampling"] or megpc[i_qoi].gpc[d].solver == "Moore-Penrose":
+                if not self.options["adaptive_sampling"] or \
+                        megpc[i_qoi].gpc[d].solver in ["Moore-Penrose", "incremental-lstsq"]:
                     n_coeffs = get_num_coeffs_sparse(
                         order_dim_max=[self.options["order_start"] for _ in range(dim[d])],
                         order_glob_max=self.options["order_start"],
@@ -2369,7 +2494,8 @@ class MERegAdaptiveProjection(Algorithm):
                                   print_func_time=self.options["print_func_time"])
 
                 # add results to results array
-                res_all = np.vstack((res_all, res_new))
+                res_all_buffer.adopt(res_all)
+                res_all = res_all_buffer.append_rows(res_new)
                 i_grid = grid.n_grid
 
                 iprint('Total function evaluation: ' + str(time.time() - start_time) + ' sec',
@@ -2487,7 +2613,8 @@ class MERegAdaptiveProjection(Algorithm):
                        tab=0, verbose=self.options["verbose"])
 
                 # add results to results array
-                res_all = np.vstack((res_all, res_disc))
+                res_all_buffer.adopt(res_all)
+                res_all = res_all_buffer.append_rows(res_disc)
 
                 # Determine gradient [n_grid x n_out x dim]
                 if self.options["gradient_enhanced"] or self.options["projection"]:
@@ -2787,7 +2914,8 @@ class MERegAdaptiveProjection(Algorithm):
                                         tab=0, verbose=self.options["verbose"])
 
                                     # append to results array containing all qoi
-                                    res_all = np.vstack([res_all, res_new])
+                                    res_all_buffer.adopt(res_all)
+                                    res_all = res_all_buffer.append_rows(res_new)
 
                                     if self.options["gradient_enhanced"] or self.options["projection"]:
                                         start_time = time.time()
@@ -3259,6 +3387,7 @@ class RegAdaptiveProjection(Algorithm):
         # initialize iterators
         eps = self.options["eps"] + 1.0
         order = self.options["order_start"]
+        res_all_buffer = GrowableArray()
         error = []
         nrmsd = []
         loocv = []
@@ -3270,7 +3399,8 @@ class RegAdaptiveProjection(Algorithm):
                              options=self.options["grid_options"])
 
         # Initialize parallel Computation class
-        com = Computation(n_cpu=self.n_cpu, matlab_model=self.options["matlab_model"])
+        com = Computation(n_cpu=self.n_cpu, matlab_model=self.options["matlab_model"],
+                          dispatch=self.options["dispatch"], chunk_size=self.options["chunk_size"])
 
         # Run initial simulations to determine initial projection matrix
         iprint("Performing {} simulations!".format(grid_original.coords.shape[0]),
@@ -3500,7 +3630,8 @@ class RegAdaptiveProjection(Algorithm):
                                               fn_results=gpc[i_qoi].fn_results,
                                               print_func_time=self.options["print_func_time"])
 
-                            res_all = np.vstack((res_all, res_new))
+                            res_all_buffer.adopt(res_all)
+                            res_all = res_all_buffer.append_rows(res_new)
 
                             iprint('Total parallel function evaluation: ' + str(time.time() - start_time) + ' sec',
                                    tab=0, verbose=self.options["verbose"])
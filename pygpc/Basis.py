@@ -2,11 +2,11 @@ import os
 import uuid
 import time
 import numpy as np
-import multiprocessing
-import multiprocessing.pool
 import matplotlib.pyplot as plt
-from _functools import partial
+from importlib import import_module
 from .misc import get_multi_indices
+from .misc import append_to_buffer
+from .MultiIndexSet import MultiIndexSet
 # from mpl_toolkits.mplot3d import Axes3D
 from .BasisFunction import *
 
@@ -15,13 +15,23 @@ class Basis:
     """
     Basis class of gPC
 
+    The basis is represented by the multi-indices of the global basis functions (int16) together with a descriptor
+    of the polynomial family of each parameter. The BasisFunction objects are shared instances from a process-wide
+    cache (see BasisFunction.get_basis_function). The list of lists self.b is only materialized on demand.
+
     Attributes
     ----------
     b : list of list of BasisFunction object instances [n_basis][n_dim]
-        Parameter wise basis function objects used in gPC.
+        Parameter wise basis function objects used in gPC (materialized on first access).
         Multiplying all elements in a row at location xi = (x1, x2, ..., x_dim) yields the global basis function.
     b_array : ndarray of float [n_poly_coeffs]
         Polynomial coefficients of basis functions
+    b_array_grad : ndarray of float [n_poly_coeffs_grad]
+        Polynomial coefficients of basis functions for gradient evaluation
+    b_array_offset : ndarray of int [n_basis + 1]
+        Start index of the coefficients of each basis function in b_array (last entry: len(b_array))
+    b_array_grad_offset : ndarray of int [n_basis + 1]
+        Start index of the coefficients of each basis function in b_array_grad (last entry: len(b_array_grad))
     b_id : list of UUID objects (version 4) [n_basis]
         Unique IDs of global basis functions
     b_norm : ndarray of float [n_basis x dim]
@@ -30,28 +40,171 @@ class Basis:
         Normalization factor of global basis functions
     dim : int
         Number of variables
+    families : list of dict [dim]
+        Polynomial family of each parameter
+        - families[i_dim]["type"] ... name of BasisFunction subclass (e.g. "Jacobi")
+        - families[i_dim]["p"] ... shape parameters of the polynomials (all parameters except the order "i")
     n_basis : int
         Total number of (global) basis function
-    multi_indices: ndarray [n_basis x dim]
+    multi_indices: ndarray of int16 [n_basis x dim]
         Multi-indices of polynomial basis functions
+    multi_index_set: MultiIndexSet object
+        Hash indexed set of the multi-indices (lookup of the position of a multi-index in the basis)
     """
     def __init__(self):
         """
         Constructor; initializes the Basis class
         """
-        self.b = None
+        self._b = None
         self.b_array = None
         self.b_array_grad = None
+        self.b_array_offset = None
+        self.b_array_grad_offset = None
+        self._b_array_buffer = None
+        self._b_array_grad_buffer = None
+        self._b_array_offset_buffer = None
+        self._b_array_grad_offset_buffer = None
         self.b_id = None
         self.b_norm = None
         self.b_norm_basis = None
         self.dim = None
+        self.families = None
         self.n_basis = 0
         self.multi_indices = None
+        self.multi_index_set = None
+
+    def __getstate__(self):
+        """
+        Returns the state of the Basis for pickling and writing to .hdf5 files. Only the multi-indices and the
+        polynomial families are stored, all other attributes are derived from them when the state is restored.
+        """
+        state = self.__dict__.copy()
+
+        for key in ["_b", "b_array", "b_array_grad", "b_array_offset", "b_array_grad_offset", "_b_array_buffer",
+                    "_b_array_grad_buffer", "_b_array_offset_buffer", "_b_array_grad_offset_buffer", "b_norm",
+                    "b_norm_basis", "multi_index_set"]:
+            state.pop(key, None)
+
+        return state
+
+    def __setstate__(self, state):
+        """
+        Restores the Basis from its state (see __getstate__).
+        """
+        self.__init__()
+        self.__dict__.update(state)
+
+        if self.multi_indices is not None:
+            self.multi_index_set = MultiIndexSet(dim=self.dim, multi_indices=self.multi_indices)
+            self.multi_indices = self.multi_index_set.multi_indices
+            self.init_basis_norm()
+            self.init_basis_array()
+
+    @property
+    def b(self):
+        """
+        List of lists of BasisFunction objects [n_basis][dim], materialized from the multi-indices on first access
+        (and extended if the basis was extended since).
+        """
+        if self.multi_indices is None:
+            return None
+
+        if self._b is None:
+            self._b = []
+
+        if len(self._b) < self.n_basis:
+            self._b += self.get_b(self.multi_indices[len(self._b):, :])
+
+        return self._b
+
+    @b.setter
+    def b(self, b):
+        """
+        Sets the basis from a list of lists of BasisFunction objects [n_basis][dim].
+        """
+        self._b = None
+        self.b_id = None
+        self.families = None
+        self.multi_indices = None
+        self.multi_index_set = None
+        self.n_basis = 0
+        self.init_basis_array()
+
+        if b is not None:
+            self.extend_basis(b)
+
+    def get_univariate_basis_function(self, i_dim, order):
+        """
+        Returns the (shared) univariate basis function of a parameter.
+
+        bf = Basis.get_univariate_basis_function(i_dim, order)
+
+        Parameters
+        ----------
+        i_dim : int
+            Index of parameter
+        order : int
+            Order of the polynomial
+
+        Returns
+        -------
+        bf : BasisFunction object instance
+            Univariate basis function
+        """
+        family = self.families[i_dim]
+
+        return get_basis_function(getattr(import_module(".BasisFunction", package="pygpc"), family["type"]),
+                                  dict(family["p"], i=order))
+
+    def get_univariate_basis_functions(self, i_dim, order_max):
+        """
+        Returns the (shared) univariate basis functions of a parameter from order 0 to order_max.
+
+        bf = Basis.get_univariate_basis_functions(i_dim, order_max)
+
+        Parameters
+        ----------
+        i_dim : int
+            Index of parameter
+        order_max : int
+            Maximum order of the polynomials
+
+        Returns
+        -------
+        bf : list of BasisFunction object instances [order_max + 1]
+            Univariate basis functions of order 0, ..., order_max
+        """
+        return [self.get_univariate_basis_function(i_dim, order) for order in range(int(order_max) + 1)]
+
+    def get_b(self, multi_indices):
+        """
+        Materializes the BasisFunction objects of the given multi-indices.
+
+        b = Basis.get_b(multi_indices)
+
+        Parameters
+        ----------
+        multi_indices : ndarray of int [n_basis x dim]
+            Multi-indices of the global basis functions
+
+        Returns
+        -------
+        b : list of list of BasisFunction object instances [n_basis][dim]
+            Parameter wise basis function objects
+        """
+        multi_indices = np.reshape(multi_indices, (-1, self.dim))
+
+        if multi_indices.shape[0] == 0:
+            return []
+
+        tables = [self.get_univariate_basis_functions(i_dim, np.max(multi_indices[:, i_dim]))
+                  for i_dim in range(self.dim)]
+
+        return [[tables[i_dim][order] for i_dim, order in enumerate(row)] for row in multi_indices.tolist()]
 
     def set_basis(self, i_basis, problem):
         """
-        Worker function to initialize a global basis function (called by multiprocessing.pool).
+        Worker function to initialize a global basis function.
         It also initializes polynomial basis coefficients for fast processing. Converts list of lists of basis
         into np.ndarray that can be processed on multi core systems.
 
@@ -96,6 +249,45 @@ class Basis:
 
         return b_, b_a_, b_a_grad_
 
+    @staticmethod
+    def get_families(problem):
+        """
+        Determines the polynomial families of the random parameters of a gPC problem.
+
+        families = Basis.get_families(problem)
+
+        Parameters
+        ----------
+        problem : Problem class instance
+            gPC problem
+
+        Returns
+        -------
+        families : list of dict [dim]
+            Polynomial family of each parameter (see Basis.families)
+        """
+        return [Basis.get_family(problem.parameters_random[p].init_basis_function(order=0))
+                for p in problem.parameters_random]
+
+    @staticmethod
+    def get_family(bf):
+        """
+        Determines the descriptor of the polynomial family of a univariate basis function.
+
+        family = Basis.get_family(bf)
+
+        Parameters
+        ----------
+        bf : BasisFunction object instance
+            Univariate basis function
+
+        Returns
+        -------
+        family : dict
+            Polynomial family (see Basis.families)
+        """
+        return {"type": type(bf).__name__, "p": {key: float(bf.p[key]) for key in bf.p if key != "i"}}
+
     def init_basis_sgpc(self, problem, order, order_max, order_max_norm, interaction_order,
                         interaction_order_current=None):
         """
@@ -142,56 +334,39 @@ class Basis:
 
         Adds Attributes:
 
-        b: list of BasisFunction object instances [n_basis x n_dim]
-            Parameter wise basis function objects used in gPC.
-            Multiplying all elements in a row at location xi = (x1, x2, ..., x_dim) yields the global basis function.
+        multi_indices: ndarray of int16 [n_basis x n_dim]
+            Multi-indices of the global basis functions (the BasisFunction objects in self.b are materialized
+            from them on demand).
         """
 
         self.dim = problem.dim
+        self.families = self.get_families(problem)
 
         if self.dim == 1:
-            self.multi_indices = np.linspace(0, order_max, order_max + 1, dtype=int)[:, np.newaxis]
+            multi_indices = np.linspace(0, order_max, order_max + 1, dtype=int)[:, np.newaxis]
         else:
-            self.multi_indices = get_multi_indices(order=order,
-                                                   order_max=order_max,
-                                                   order_max_norm=order_max_norm,
-                                                   interaction_order=interaction_order,
-                                                   interaction_order_current=interaction_order_current)
+            multi_indices = get_multi_indices(order=order,
+                                              order_max=order_max,
+                                              order_max_norm=order_max_norm,
+                                              interaction_order=interaction_order,
+                                              interaction_order_current=interaction_order_current)
 
-        # get total number of basis functions
-        self.n_basis = self.multi_indices.shape[0]
-
-        # construct 2D list with BasisFunction objects and array with coefficients and
-        # initialize array of basis coefficients
-        workhorse_partial = partial(self.set_basis, problem=problem)
-
-        with multiprocessing.Pool(multiprocessing.cpu_count()) as pool:
-            out = pool.map(workhorse_partial, range(self.n_basis))
-            self.b = [o[0] for o in out]
-            self.b_array = np.concatenate([o[1] for o in out])
-            self.b_array_grad = np.concatenate([o[2] for o in out])
-
-        # This is the single core implementation:
-        # self.b = [[0 for _ in range(self.dim)] for _ in range(self.n_basis)]
-        #
-        # for i_basis in range(self.n_basis):
-        #     for i_dim, p in enumerate(problem.parameters_random):   # OrderedDict of RandomParameter objects
-        #         self.b[i_basis][i_dim] = problem.parameters_random[p].init_basis_function(
-        #             order=self.multi_indices[i_basis, i_dim])
-
-        # Generate unique IDs of basis functions
-        self.b_id = [uuid.uuid4() for _ in range(self.n_basis)]
-
-        # initialize normalization factor (self.b_norm and self.b_norm_basis)
-        self.init_basis_norm()
+        # initialize multi-indices, IDs, normalization factors and array of basis coefficients
+        self.extend_multi_indices(multi_indices)
 
     def init_basis_norm(self):
         """
         Construct array of scaling factors self.b_norm [n_basis x dim] and self.b_norm_basis [n_basis x 1]
         to normalize basis functions <psi^2> = int(psi^2*p)dx
         """
-        # read individual normalization factors from function objects
-        self.b_norm = np.array([list(map(lambda x:x.fun_norm, _b)) for _b in self.b])
+        self.b_norm = np.ones((self.n_basis, self.dim))
+
+        # read individual normalization factors from function objects (one per parameter and order)
+        for i_dim in range(self.dim):
+            if self.n_basis > 0:
+                fun_norm = np.array([bf.fun_norm for bf in self.get_univariate_basis_functions(
+                    i_dim, np.max(self.multi_indices[:, i_dim]))])
+                self.b_norm[:, i_dim] = fun_norm[self.multi_indices[:, i_dim]]
 
         # determine global normalization factor of basis function
         self.b_norm_basis = np.prod(self.b_norm, axis=1)
@@ -237,26 +412,20 @@ class Basis:
                                                   interaction_order_current=interaction_order_current)
 
         # delete multi-indices, which are already present
-        if self.b is not None:
-            multi_indices_all_current = np.array([list(map(lambda x: x.p["i"], _b)) for _b in self.b])
-
-            idx_old = np.hstack([np.where((multi_indices_all_current[i, :] == multi_indices_all_new).all(axis=1))
-                                 for i in range(multi_indices_all_current.shape[0])])
-
-            multi_indices_all_new = np.delete(multi_indices_all_new, idx_old, axis=0)
+        if self.multi_index_set is not None:
+            multi_indices_all_new = self.multi_index_set.difference(multi_indices_all_new)
 
         if multi_indices_all_new.any():
 
-            # construct 2D list with new BasisFunction objects
-            b_added = [[0 for _ in range(dim)] for _ in range(multi_indices_all_new.shape[0])]
-
-            for i_basis in range(multi_indices_all_new.shape[0]):
-                for i_p, p in enumerate(problem.parameters_random):
-                    b_added[i_basis][i_p] = problem.parameters_random[p].init_basis_function(
-                        order=multi_indices_all_new[i_basis, i_p])
+            if self.families is None:
+                self.dim = dim
+                self.families = self.get_families(problem)
 
             # extend basis
-            self.extend_basis(b_added)
+            self.extend_multi_indices(multi_indices_all_new)
+
+            # new BasisFunction objects
+            b_added = self.get_b(multi_indices_all_new)
 
         return b_added
 
@@ -269,86 +438,174 @@ class Basis:
         b_added: list of list of BasisFunction instances [n_b_added][dim]
             Individual BasisFunctions to add
         """
-        if self.b is None:
-            self.b = []
+        if len(b_added) == 0:
+            return
+
+        if self.families is None:
+            self.dim = len(b_added[0])
+            self.families = [self.get_family(bf) for bf in b_added[0]]
+
+        self.extend_multi_indices(np.array([[_b_dim.p["i"] for _b_dim in _b] for _b in b_added], dtype=int))
+
+    def extend_multi_indices(self, multi_indices_added):
+        """
+        Extend set of basis functions by their multi-indices. Skips multi-indices, which are already present.
+        Generates the IDs, normalization factors and polynomial basis coefficients of the new basis functions.
+
+        Parameters
+        ----------
+        multi_indices_added : ndarray of int [n_b_added x dim]
+            Multi-indices of the global basis functions to add
 
+        Returns
+        -------
+        idx_added : ndarray of int [n_added]
+            Indices of the rows of multi_indices_added, which were added to the basis
+        """
         if self.b_id is None:
             self.b_id = []
 
-        # add b_added to b (check for duplicates) and generate IDs
-        for i_row, _b in enumerate(b_added):
-            if _b not in self.b:
-                self.b.append(_b)
-                self.b_id.append(uuid.uuid4())
+        if self.multi_index_set is None:
+            self.multi_index_set = MultiIndexSet(dim=self.dim)
+
+        # add multi-indices (check for duplicates) and generate IDs
+        multi_indices_added = np.reshape(multi_indices_added, (-1, self.dim))
+        idx_added = self.multi_index_set.add(multi_indices_added)
+
+        self.b_id += [uuid.uuid4() for _ in range(len(idx_added))]
+        self.multi_indices = self.multi_index_set.multi_indices
 
         # update size
-        self.n_basis = len(self.b)
+        self.n_basis = self.multi_indices.shape[0]
 
         # update normalization factors
         self.init_basis_norm()
 
         # extend array of basis coefficients
-        self.extend_basis_array(b_added)
+        self.extend_basis_array(multi_indices_added[idx_added, :])
+
+        return idx_added
 
     def init_basis_array(self):
         """
-        Initialize polynomial basis coefficients for fast processing. Converts list of lists of self.b
-        into np.ndarray that can be processed on multi core systems.
+        Initialize polynomial basis coefficients for fast processing. Converts the basis functions of
+        self.multi_indices into np.ndarray that can be processed on multi core systems.
         """
+        self.b_array = None
+        self.b_array_grad = None
+        self.b_array_offset = None
+        self.b_array_grad_offset = None
+        self._b_array_buffer = None
+        self._b_array_grad_buffer = None
+        self._b_array_offset_buffer = None
+        self._b_array_grad_offset_buffer = None
 
-        _b_array = []
-        _b_array_grad = []
-        for i_basis in range(self.n_basis):
-            for i_dim_outer in range(self.dim):
-                for i_dim_inner in range(self.dim):
-                    if i_dim_outer == 0:
-                        _b_array = _b_array + [np.array([self.b[i_basis][i_dim_inner].fun.order]),
-                                               self.b[i_basis][i_dim_inner].fun.c]
-                    if i_dim_outer == i_dim_inner:
-                        _b_array_grad = _b_array_grad + [np.array([self.b[i_basis][i_dim_inner].fun.deriv().order]),
-                                                         self.b[i_basis][i_dim_inner].fun.deriv().c]
-                    else:
-                        _b_array_grad = _b_array_grad + [np.array([self.b[i_basis][i_dim_inner].fun.order]),
-                                                         self.b[i_basis][i_dim_inner].fun.c]
-
-        self.b_array = np.concatenate(_b_array)
-        self.b_array_grad = np.concatenate(_b_array_grad)
-
-    def extend_basis_array(self, b_added):
-        """
-        Extends polynomial basis coefficients for fast processing. Converts list of lists of b_added
-        into np.ndarray that can be processed on multi core systems.
+        if self.multi_indices is not None:
+            self.extend_basis_array(self.multi_indices)
+
+    def extend_basis_array(self, multi_indices_added):
+        """
+        Extends polynomial basis coefficients for fast processing. Converts the basis functions of
+        multi_indices_added into np.ndarray that can be processed on multi core systems.
+
+        The coefficients are appended to preallocated buffers, whose capacity is doubled if exceeded, such that
+        an extension costs amortized O(n_b_added). self.b_array and self.b_array_grad are views on the used part
+        of the buffers. The coefficients of the i-th basis function are located in
+        self.b_array[self.b_array_offset[i]:self.b_array_offset[i+1]] (self.b_array_grad_offset accordingly).
 
         Parameters
         ----------
-        b_added: list of list of BasisFunction instances [n_b_added][dim]
-            Individual BasisFunctions to add
+        multi_indices_added : ndarray of int [n_b_added x dim]
+            Multi-indices of the global basis functions to add
         """
+        if self.b_array_offset is None:
+            self._b_array_offset_buffer = np.zeros(1, dtype=int)
+            self._b_array_grad_offset_buffer = np.zeros(1, dtype=int)
+            self.b_array_offset = self._b_array_offset_buffer[:1]
+            self.b_array_grad_offset = self._b_array_grad_offset_buffer[:1]
+
+        n_b_added = multi_indices_added.shape[0]
+
+        if n_b_added == 0:
+            return
+
+        # [order, coeffs] of the polynomials and their derivatives of each parameter and order
+        fun_table = []
+        fun_der_table = []
+
+        for i_dim in range(self.dim):
+            bf = self.get_univariate_basis_functions(i_dim, np.max(multi_indices_added[:, i_dim]))
+            fun_table.append([np.hstack((_bf.fun.order, _bf.fun.c)) for _bf in bf])
+            fun_der_table.append([np.hstack((_bf.fun_der.order, _bf.fun_der.c)) for _bf in bf])
 
         _b_array = []
         _b_array_grad = []
-        for i_basis in range(len(b_added)):
-            for i_dim_outer in range(self.dim):
-                for i_dim_inner in range(self.dim):
-                    if i_dim_outer == 0:
-                        _b_array = _b_array + [np.array([b_added[i_basis][i_dim_inner].fun.order]),
-                                               b_added[i_basis][i_dim_inner].fun.c]
-                    if i_dim_outer == i_dim_inner:
-                        _b_array_grad = _b_array_grad + [np.array([b_added[i_basis][i_dim_inner].fun.deriv().order]),
-                                                         b_added[i_basis][i_dim_inner].fun.deriv().c]
-                    else:
-                        _b_array_grad = _b_array_grad + [np.array([b_added[i_basis][i_dim_inner].fun.order]),
-                                                         b_added[i_basis][i_dim_inner].fun.c]
-
-        if self.b_array is not None:
-            self.b_array = np.hstack((self.b_array, np.concatenate(_b_array)))
-        else:
-            self.b_array = np.concatenate(_b_array)
+        n_b_array = np.zeros(n_b_added, dtype=int)
+        n_b_array_grad = np.zeros(n_b_added, dtype=int)
+
+        for i_basis, multi_index in enumerate(multi_indices_added.tolist()):
+            fun = [fun_table[i_dim][order] for i_dim, order in enumerate(multi_index)]
+            fun_der = [fun_der_table[i_dim][order] for i_dim, order in enumerate(multi_index)]
+
+            _b_array += fun
+
+            # derivative in dimension i_dim: polynomial of dimension i_dim is replaced by its derivative
+            for i_dim in range(self.dim):
+                _b_array_grad += fun[:i_dim] + [fun_der[i_dim]] + fun[i_dim + 1:]
 
-        if self.b_array_grad is not None:
-            self.b_array_grad = np.hstack((self.b_array_grad, np.concatenate(_b_array_grad)))
+            n_b_array[i_basis] = sum(len(f) for f in fun)
+            n_b_array_grad[i_basis] = (self.dim - 1) * n_b_array[i_basis] + sum(len(f) for f in fun_der)
+
+        n_used = self.b_array_offset[-1]
+        n_used_grad = self.b_array_grad_offset[-1]
+        n_offset = len(self.b_array_offset)
+
+        self._b_array_buffer = append_to_buffer(self._b_array_buffer, n_used, np.concatenate(_b_array))
+        self._b_array_grad_buffer = append_to_buffer(self._b_array_grad_buffer, n_used_grad,
+                                                     np.concatenate(_b_array_grad))
+        self._b_array_offset_buffer = append_to_buffer(self._b_array_offset_buffer, n_offset,
+                                                       n_used + np.cumsum(n_b_array))
+        self._b_array_grad_offset_buffer = append_to_buffer(self._b_array_grad_offset_buffer, n_offset,
+                                                            n_used_grad + np.cumsum(n_b_array_grad))
+
+        self.b_array_offset = self._b_array_offset_buffer[:n_offset + n_b_added]
+        self.b_array_grad_offset = self._b_array_grad_offset_buffer[:n_offset + n_b_added]
+        self.b_array = self._b_array_buffer[:self.b_array_offset[-1]]
+        self.b_array_grad = self._b_array_grad_buffer[:self.b_array_grad_offset[-1]]
+
+    def get_b_array(self, idx, gradient=False):
+        """
+        Gathers the polynomial basis coefficients of a subset of the global basis functions from self.b_array
+        (or self.b_array_grad) using the offsets of the basis functions.
+
+        b_array = Basis.get_b_array(idx, gradient=False)
+
+        Parameters
+        ----------
+        idx : ndarray of int [n_b]
+            Indices of the global basis functions
+        gradient : bool, optional, default: False
+            Return coefficients of the derivatives (self.b_array_grad)
+
+        Returns
+        -------
+        b_array : ndarray of float
+            Polynomial basis coefficients of the selected basis functions (same layout as self.b_array)
+        """
+        idx = np.asarray(idx, dtype=int)
+
+        if gradient:
+            b_array, offset = self.b_array_grad, self.b_array_grad_offset
         else:
-            self.b_array_grad = np.concatenate(_b_array_grad)
+            b_array, offset = self.b_array, self.b_array_offset
+
+        start = offset[idx]
+        lengths = offset[idx + 1] - start
+
+        # position of each coefficient inside its segment added to the start of the segment
+        pos = np.repeat(start - (np.cumsum(lengths) - lengths), lengths) + np.arange(np.sum(lengths))
+
+        return b_array[pos]
 
     def plot_basis(self, dims, fn_plot=None, dynamic_plot_update=False):
         """
@@ -370,7 +627,7 @@ class Basis:
         plt.rc('text', usetex=True)
         plt.rc('font', family='serif', size=14)
 
-        multi_indices = np.array([list(map(lambda x: x.p["i"], _b)) for _b in self.b])
+        multi_indices = self.multi_indices.astype(int)
 
         fig = plt.figure(figsize=[6, 6])
 
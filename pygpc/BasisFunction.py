@@ -1,11 +1,62 @@
+import functools
 import scipy.special
 import scipy.stats
 import numpy as np
 from .Quadrature import get_quadrature_jacobi_1d
 from .Quadrature import get_quadrature_hermite_1d
 from .Quadrature import get_quadrature_laguerre_1d
+from .FrozenGPC import get_recurrence_table
 from .Grid import *
 
+# maximum number of distinct univariate basis functions kept in the process-wide cache
+BASIS_FUNCTION_CACHE_SIZE = 1024
+
+
+def get_basis_function(family, p):
+    """
+    Returns the univariate basis function of the given family and parameters from a process-wide, bounded
+    LRU cache. The construction of a basis function (normalization factor, polynomial, quadrature of fun_int and
+    fun_der_int) is performed only once per (family, order, shape parameters). All requests with the same key
+    share the same instance, which must therefore not be modified.
+
+    x = get_basis_function(family, p)
+
+    Parameters
+    ----------
+    family : BasisFunction subclass
+        Polynomial family (e.g. Jacobi, Hermite, Laguerre)
+    p : dict
+        Parameters of the polynomial (p["i"] ... order, remaining entries ... shape parameters)
+
+    Returns
+    -------
+    basis_function : BasisFunction object instance
+        Shared (read-only) basis function
+    """
+    shape = tuple(sorted((key, float(value)) for key, value in p.items() if key != "i"))
+
+    return _get_basis_function_cached(family, int(p["i"]), shape)
+
+
+@functools.lru_cache(maxsize=BASIS_FUNCTION_CACHE_SIZE)
+def _get_basis_function_cached(family, order, shape):
+    """
+    Cached constructor of get_basis_function (the arguments form the hashable cache key).
+    """
+    p = {"i": order}
+    p.update(shape)
+
+    return family(p)
+
+
+def clear_basis_function_cache():
+    """
+    Clears the process-wide cache of univariate basis functions.
+
+    clear_basis_function_cache()
+    """
+    _get_basis_function_cached.cache_clear()
+
 
 class BasisFunction(object):
     """
@@ -50,6 +101,91 @@ class BasisFunction(object):
         else:
             return self.fun(x)
 
+    def get_recurrence_coeffs(self, order_max):
+        """
+        Determines the coefficients of the three-term recurrence relation of the normalized polynomials
+        of this family up to order_max (the order p["i"] of the instance itself is ignored).
+
+        .. math::
+           \\psi_{n+1}(x) = (a_n x + b_n) \\psi_n(x) - c_n \\psi_{n-1}(x)
+
+        Parameters
+        ----------
+        order_max : int
+            Maximum order of the polynomials
+
+        Returns
+        -------
+        psi_0 : float
+            Value of the normalized polynomial of order 0
+        a : ndarray of float [order_max]
+            Recurrence coefficients a_n (n = 0, ..., order_max-1)
+        b : ndarray of float [order_max]
+            Recurrence coefficients b_n (n = 0, ..., order_max-1)
+        c : ndarray of float [order_max]
+            Recurrence coefficients c_n (n = 0, ..., order_max-1), c_0 = 0
+        """
+        raise NotImplementedError("Basis function {} has no three-term recurrence.".format(type(self).__name__))
+
+    def get_value_table(self, x, order_max, derivative=False):
+        """
+        Evaluates all normalized polynomials of this family from order 0 to order_max at x
+        using the three-term recurrence relation.
+
+        Parameters
+        ----------
+        x : ndarray of float [n_x]
+            Arguments for which the polynomials are evaluated
+        order_max : int
+            Maximum order of the polynomials
+        derivative : boolean, optional, default: False
+            Returns the derivatives of the polynomials at x
+
+        Returns
+        -------
+        table : ndarray of float [n_x x (order_max + 1)]
+            Function values (or derivatives) of the polynomials of order 0, ..., order_max (columns) at x (rows)
+        """
+        psi_0, a, b, c = self.get_recurrence_coeffs(int(order_max))
+
+        return get_recurrence_table(x=x, psi_0=psi_0, a=a, b=b, c=c, derivative=derivative)
+
+    @staticmethod
+    def normalize_recurrence_coeffs(a, b, c, norm):
+        """
+        Transforms the recurrence coefficients of the standard polynomials P_n to the ones of the normalized
+        polynomials psi_n = P_n / sqrt(norm_n) (assuming P_0 = 1).
+
+        Parameters
+        ----------
+        a : ndarray of float [order_max]
+            Recurrence coefficients a_n of the standard polynomials
+        b : ndarray of float [order_max]
+            Recurrence coefficients b_n of the standard polynomials
+        c : ndarray of float [order_max]
+            Recurrence coefficients c_n of the standard polynomials
+        norm : ndarray of float [order_max + 1]
+            Normalization factors <P_n^2> of the standard polynomials
+
+        Returns
+        -------
+        psi_0 : float
+            Value of the normalized polynomial of order 0
+        a : ndarray of float [order_max]
+            Recurrence coefficients a_n of the normalized polynomials
+        b : ndarray of float [order_max]
+            Recurrence coefficients b_n of the normalized polynomials
+        c : ndarray of float [order_max]
+            Recurrence coefficients c_n of the normalized polynomials
+        """
+        s = np.sqrt(np.asarray(norm, dtype=float))
+
+        a = a * s[:-1] / s[1:]
+        b = b * s[:-1] / s[1:]
+        c = c * np.hstack((0., s[:-2])) / s[1:]
+
+        return 1. / s[0], a, b, c
+
 
 class Jacobi(BasisFunction):
     """
@@ -71,19 +207,8 @@ class Jacobi(BasisFunction):
 
         super(Jacobi, self).__init__(p)
 
-        # determine polynomial normalization factor
-        beta_norm = (scipy.special.gamma(self.p["q"]) * scipy.special.gamma(self.p["p"]) /
-                     scipy.special.gamma(self.p["p"] + self.p["q"]) * 2.0 ** (self.p["p"] + self.p["q"] - 1)) ** (-1)
-
-        jacobi_norm = 2 ** (self.p["p"] + self.p["q"] - 1) / (
-                      (2.0 * self.p["i"] + self.p["p"] + self.p["q"] - 1)) * (
-                      scipy.special.gamma(self.p["i"] + self.p["p"])) * (
-                      scipy.special.gamma(self.p["i"] + self.p["q"])) / (
-                              scipy.special.gamma(self.p["i"] + self.p["p"] + self.p["q"] - 1) *
-                              scipy.special.factorial(self.p["i"]))
-
         # normalization factor of polynomial (to later normalize basis functions <psi^2> = int(psi^2*p)dx)
-        self.fun_norm = jacobi_norm * beta_norm
+        self.fun_norm = self.get_norm(self.p)
 
         # define basis function
         self.fun = scipy.special.jacobi(self.p["i"],
@@ -99,6 +224,76 @@ class Jacobi(BasisFunction):
         self.fun_int = np.dot(self.fun(knots), weights)
         self.fun_der_int = np.dot(self.fun_der(knots), weights)
 
+    @staticmethod
+    def get_norm(p):
+        """
+        Determines the normalization factor <P_i^2> of the Jacobi polynomial w.r.t. the beta distribution.
+
+        Parameters
+        ----------
+        p : dict
+            Parameters of the Jacobi polynomial (p["i"] may be an ndarray of int)
+
+        Returns
+        -------
+        norm : float or ndarray of float
+            Normalization factor of the polynomial
+        """
+        # determine polynomial normalization factor
+        beta_norm = (scipy.special.gamma(p["q"]) * scipy.special.gamma(p["p"]) /
+                     scipy.special.gamma(p["p"] + p["q"]) * 2.0 ** (p["p"] + p["q"] - 1)) ** (-1)
+
+        jacobi_norm = 2 ** (p["p"] + p["q"] - 1) / (
+                      (2.0 * p["i"] + p["p"] + p["q"] - 1)) * (
+                      scipy.special.gamma(p["i"] + p["p"])) * (
+                      scipy.special.gamma(p["i"] + p["q"])) / (
+                              scipy.special.gamma(p["i"] + p["p"] + p["q"] - 1) *
+                              scipy.special.factorial(p["i"]))
+
+        return jacobi_norm * beta_norm
+
+    def get_recurrence_coeffs(self, order_max):
+        """
+        Determines the coefficients of the three-term recurrence relation of the normalized Jacobi polynomials
+        up to order_max (see BasisFunction.get_recurrence_coeffs).
+
+        Parameters
+        ----------
+        order_max : int
+            Maximum order of the polynomials
+
+        Returns
+        -------
+        psi_0 : float
+            Value of the normalized polynomial of order 0
+        a, b, c : ndarray of float [order_max]
+            Recurrence coefficients
+        """
+        # beta-pdf: p, q /// jacobi-poly: alpha=q-1, beta=p-1
+        alpha = self.p["q"] - 1
+        beta = self.p["p"] - 1
+
+        # P_m = (a_(m-1) * x + b_(m-1)) * P_(m-1) - c_(m-1) * P_(m-2) for m >= 2
+        m = np.arange(2, order_max + 1, dtype=float)
+        s = 2 * m + alpha + beta
+        den = 2 * m * (m + alpha + beta) * (s - 2)
+
+        a = np.zeros(order_max)
+        b = np.zeros(order_max)
+        c = np.zeros(order_max)
+
+        # first order is treated separately to avoid 0/0 for alpha + beta = 0 (uniform distribution)
+        if order_max > 0:
+            a[0] = (alpha + beta + 2) / 2.
+            b[0] = (alpha - beta) / 2.
+            a[1:] = (s - 1) * s * (s - 2) / den
+            b[1:] = (s - 1) * (alpha ** 2 - beta ** 2) / den
+            c[1:] = 2 * (m + alpha - 1) * (m + beta - 1) * s / den
+
+        norm = self.get_norm(dict(self.p, i=np.arange(order_max + 1)))
+
+        return self.normalize_recurrence_coeffs(a, b, c, norm)
+
 
 class Hermite(BasisFunction):
     """
@@ -119,7 +314,7 @@ class Hermite(BasisFunction):
         super(Hermite, self).__init__(p)
 
         # normalization factor of polynomial (to later normalize basis functions <psi^2> = int(psi^2*p)dx)
-        self.fun_norm = np.float(scipy.special.factorial(p["i"]))
+        self.fun_norm = self.get_norm(self.p)
 
         # define basis function
         self.fun = scipy.special.hermitenorm(p["i"], monic=False) / np.sqrt(self.fun_norm)
@@ -136,6 +331,46 @@ class Hermite(BasisFunction):
             self.fun_int = np.dot(self.fun(knots), weights)
             self.fun_der_int = np.dot(self.fun_der(knots), weights)
 
+    @staticmethod
+    def get_norm(p):
+        """
+        Determines the normalization factor <P_i^2> of the Hermite polynomial w.r.t. the standard normal distribution.
+
+        Parameters
+        ----------
+        p : dict
+            Parameters of the Hermite polynomial (p["i"] may be an ndarray of int)
+
+        Returns
+        -------
+        norm : float or ndarray of float
+            Normalization factor of the polynomial
+        """
+        return scipy.special.factorial(p["i"]) * 1.
+
+    def get_recurrence_coeffs(self, order_max):
+        """
+        Determines the coefficients of the three-term recurrence relation of the normalized Hermite polynomials
+        up to order_max (see BasisFunction.get_recurrence_coeffs).
+
+        Parameters
+        ----------
+        order_max : int
+            Maximum order of the polynomials
+
+        Returns
+        -------
+        psi_0 : float
+            Value of the normalized polynomial of order 0
+        a, b, c : ndarray of float [order_max]
+            Recurrence coefficients
+        """
+        n = np.arange(order_max, dtype=float)
+
+        norm = self.get_norm(dict(self.p, i=np.arange(order_max + 1)))
+
+        return self.normalize_recurrence_coeffs(np.ones(order_max), np.zeros(order_max), n, norm)
+
 
 class Laguerre(BasisFunction):
     """
@@ -158,8 +393,7 @@ class Laguerre(BasisFunction):
 
         super(Laguerre, self).__init__(p)
 
-        self.fun_norm = (scipy.special.factorial(p["i"]+p["alpha"]) / scipy.special.factorial(p["i"])) / \
-                        scipy.special.gamma(p["alpha"] + 1)
+        self.fun_norm = self.get_norm(self.p)
 
         # define basis function
         self.fun = scipy.special.genlaguerre(p["i"], alpha=p["alpha"], monic=False) / np.sqrt(self.fun_norm)
@@ -176,6 +410,52 @@ class Laguerre(BasisFunction):
             self.fun_int = np.dot(self.fun(knots), weights)
             self.fun_der_int = np.dot(self.fun_der(knots), weights)
 
+    @staticmethod
+    def get_norm(p):
+        """
+        Determines the normalization factor <P_i^2> of the Laguerre polynomial w.r.t. the gamma distribution.
+
+        Parameters
+        ----------
+        p : dict
+            Parameters of the Laguerre polynomial (p["i"] may be an ndarray of int)
+
+        Returns
+        -------
+        norm : float or ndarray of float
+            Normalization factor of the polynomial
+        """
+        return (scipy.special.factorial(p["i"]+p["alpha"]) / scipy.special.factorial(p["i"])) / \
+            scipy.special.gamma(p["alpha"] + 1)
+
+    def get_recurrence_coeffs(self, order_max):
+        """
+        Determines the coefficients of the three-term recurrence relation of the normalized Laguerre polynomials
+        up to order_max (see BasisFunction.get_recurrence_coeffs).
+
+        Parameters
+        ----------
+        order_max : int
+            Maximum order of the polynomials
+
+        Returns
+        -------
+        psi_0 : float
+            Value of the normalized polynomial of order 0
+        a, b, c : ndarray of float [order_max]
+            Recurrence coefficients
+        """
+        n = np.arange(order_max, dtype=float)
+
+        a = -1. / (n + 1)
+        b = (2 * n + 1 + self.p["alpha"]) / (n + 1)
+        c = (n + self.p["alpha"]) / (n + 1)
+        c[:1] = 0.
+
+        norm = self.get_norm(dict(self.p, i=np.arange(order_max + 1)))
+
+        return self.normalize_recurrence_coeffs(a, b, c, norm)
+
 
 class StepUp(BasisFunction):
     """
@@ -1,4 +1,7 @@
 import subprocess
+import atexit
+import hashlib
+import pickle
 import time
 import copy
 import numpy as np
@@ -10,10 +13,16 @@ import multiprocessing.pool
 from collections import OrderedDict
 from pygpc import Worker
 from .io import iprint
+from .EvaluationCache import EvaluationCache
 from .RandomParameter import *
 
+try:
+    from multiprocessing import shared_memory
+except ImportError:
+    shared_memory = None
 
-def Computation(n_cpu, matlab_model=False):
+
+def Computation(n_cpu, matlab_model=False, dispatch="map", chunk_size=None):
     """
     Helper function to initialize the Computation class.
     n_cpu = 0 : use this if the model is capable of to evaluate several parameterizations in parallel
@@ -26,21 +35,344 @@ def Computation(n_cpu, matlab_model=False):
         Number of CPU cores to use (parallel model evaluations)
     matlab_model : boolean, optional, default: False
         Use a Matlab model
+    dispatch : str, optional, default: "map"
+        Dispatch of the grid points to the worker pool (n_cpu > 1)
+        - "map": one task (context of the simulation) per grid point, the results are returned by the tasks
+        - "shared_memory": tasks only contain index ranges of the coordinates, which are stored in shared memory
+          together with the results
+        - "vectorized": tasks contain chunks of grid points, which are evaluated by one call of the model
+          (for vectorized models, see ComputationFuncPar)
+    chunk_size : int, optional, default: None
+        Number of grid points per task of the "vectorized" dispatch (Default: 4 chunks per worker)
 
     Returns
     -------
     obj : object instance of Computation class
         Object instance of Computation class
     """
+    if dispatch not in ["map", "shared_memory", "vectorized"]:
+        raise AttributeError("Unknown dispatch '{}' (choose 'map', 'shared_memory' or 'vectorized')".format(dispatch))
+
     if n_cpu == 0:
         return ComputationFuncPar(n_cpu, matlab_model=matlab_model)
     else:
-        return ComputationPoolMap(n_cpu, matlab_model=matlab_model)
+        return ComputationPoolMap(n_cpu, matlab_model=matlab_model, dispatch=dispatch, chunk_size=chunk_size)
+
+
+def create_shared_array(shape, dtype="float64"):
+    """
+    Creates an array in a new block of shared memory, which can be attached by the workers of a pool
+    (see Worker.attach_shared_array). The block has to be released by shm.close() and shm.unlink().
+
+    shm, array, descriptor = create_shared_array(shape, dtype="float64")
+
+    Parameters
+    ----------
+    shape : tuple of int
+        Shape of the array
+    dtype : str or np.dtype, optional, default: "float64"
+        Data type of the array
+
+    Returns
+    -------
+    shm : multiprocessing.shared_memory.SharedMemory
+        Block of shared memory
+    array : ndarray
+        Array in the block of shared memory (uninitialized)
+    descriptor : tuple of (str, tuple of int, str)
+        Name of the block, shape and data type of the array
+    """
+    dtype = np.dtype(dtype)
+    shm = shared_memory.SharedMemory(create=True, size=max(int(np.prod(shape)) * dtype.itemsize, 1))
+    array = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+    return shm, array, (shm.name, tuple(shape), dtype.str)
+
+
+class WorkerPool:
+    """
+    Process pool with the objects shared by its workers (process IDs, global task counter, lock and the installed
+    models). The workers are started once and can be reused by several Computation instances. Models and
+    problems are installed once per worker (see install) such that the tasks only contain the grid points and
+    the context of the simulations. At most n_models_max installations are kept (in the registry and in every
+    worker), the least recently installed ones are removed.
+
+    Parameters
+    ----------
+    n_cpu : int
+        Number of worker processes
+    n_models_max : int, optional, default: 8
+        Maximum number of installed models and problems
+
+    Attributes
+    ----------
+    n_cpu : int
+        Number of worker processes
+    pid : int
+        ID of the process the pool was created in
+    process_pool : multiprocessing.Pool
+        Process pool
+    global_task_counter : multiprocessing.Value
+        Global counter used by all workers to keep track of the progress
+    global_lock : multiprocessing.RLock
+        Lock to synchronize read/write access to serialized results
+    n_models_max : int
+        Maximum number of installed models and problems
+    model_keys : OrderedDict
+        Keys of the installed models and problems (least recently installed first)
+    n_out : dict of int
+        Number of output quantities of the installed models and problems (known after their first shared memory
+        run, see ComputationPoolMap.run_shared_memory)
+    """
+
+    def __init__(self, n_cpu, n_models_max=8):
+        """
+        Constructor; Initializes WorkerPool class
+        """
+        self.n_cpu = n_cpu
+        self.n_models_max = n_models_max
+        self.pid = os.getpid()
+        self.model_keys = OrderedDict()
+        self.n_out = dict()
+
+        # Use a process queue to assign persistent, unique IDs to the processes in the pool
+        self.process_manager = multiprocessing.Manager()
+        self.process_queue = self.process_manager.Queue()
+        self.model_registry = self.process_manager.dict()
+
+        # Global counter used by all threads to keep track of the progress (in shared memory, passed to the
+        # workers on start-up)
+        self.global_task_counter = multiprocessing.Value('i', 0)
+
+        # Necessary to synchronize read/write access to serialized results
+        self.global_lock = multiprocessing.RLock()
+
+        for i in range(0, n_cpu):
+            self.process_queue.put(i)
+
+        self.process_pool = multiprocessing.Pool(self.n_cpu, Worker.init, (self.process_queue,
+                                                                            self.global_task_counter,
+                                                                            self.global_lock,
+                                                                            self.model_registry,
+                                                                            self.n_models_max))
+
+    def install(self, model, problem):
+        """
+        Installs a model and the parameters of a problem in the workers. The workers load them from the
+        registry at their first task and keep them for subsequent tasks.
+
+        key = WorkerPool.install(model, problem)
+
+        Parameters
+        ----------
+        model: Model object
+            Model object instance of model to investigate (derived from AbstractModel class, implemented by user)
+        problem: Problem class instance
+            GPC Problem under investigation, includes the parameters of the model (constant and random)
+
+        Returns
+        -------
+        key : str
+            Key of the installed model and problem (passed to Worker.run_installed with every task)
+        """
+        # deepcopy model and delete attributes
+        model_ = copy.deepcopy(model)
+        model_.__clean__()
+
+        installation = pickle.dumps((model_, problem.parameters, list(problem.parameters_random.keys())))
+        key = hashlib.sha1(installation).hexdigest()
+
+        if key not in self.model_keys:
+            self.model_registry[key] = installation
+            self.model_keys[key] = True
+        else:
+            self.model_keys.move_to_end(key)
+
+        # remove least recently installed models (the workers drop their copies in the same order)
+        while len(self.model_keys) > self.n_models_max:
+            key_old = self.model_keys.popitem(last=False)[0]
+            del self.model_registry[key_old]
+            self.n_out.pop(key_old, None)
+
+        return key
+
+    def map(self, func, iterable):
+        """
+        Applies func to every element of iterable in the workers.
+
+        results = WorkerPool.map(func, iterable)
+
+        Parameters
+        ----------
+        func : function
+            Function to apply
+        iterable : iterable
+            Arguments
+
+        Returns
+        -------
+        results : list
+            Results in the order of the arguments
+        """
+        return self.process_pool.map(func, iterable)
+
+    def imap_unordered(self, func, iterable):
+        """
+        Applies func to every element of iterable in the workers (one task per element). The tasks are started
+        immediately and the results are yielded as they finish.
+
+        results = WorkerPool.imap_unordered(func, iterable)
+
+        Parameters
+        ----------
+        func : function
+            Function to apply
+        iterable : iterable
+            Arguments
+
+        Returns
+        -------
+        results : iterator
+            Results in the order the tasks finish
+        """
+        return self.process_pool.imap_unordered(func, iterable, chunksize=1)
+
+    def close(self, terminate=False):
+        """
+        Closes the pool and shuts down the manager process.
+
+        WorkerPool.close(terminate=False)
+
+        Parameters
+        ----------
+        terminate : bool, optional, default: False
+            Stop the workers immediately instead of waiting for outstanding tasks
+        """
+        if terminate:
+            self.process_pool.terminate()
+        else:
+            self.process_pool.close()
+
+        self.process_pool.join()
+        self.process_manager.shutdown()
+
+
+class PoolRegistry:
+    """
+    Process-wide registry of worker pools. Inside of a PoolRegistry context, Computation instances borrow the
+    worker pool with the requested number of workers from the registry instead of starting their own pool.
+    The pools (and the installed models) are kept alive until the outermost context is left, such that the
+    algorithm, the validation set, the gradient evaluation and the post-processing share the workers.
+    Contexts can be nested. If the context is left because of an exception, the workers are terminated.
+
+    with PoolRegistry():
+        session, coeffs, results = session.run()
+        nrmsd = validate_gpc_mc(session=session, coeffs=coeffs, n_cpu=session.n_cpu)
+
+    Attributes
+    ----------
+    pools : OrderedDict of WorkerPool
+        Registered worker pools (keys: number of workers)
+    n_scopes : int
+        Number of open contexts
+    pid : int
+        ID of the process the registry belongs to (forked processes start with an empty registry)
+    """
+    pools = OrderedDict()
+    n_scopes = 0
+    pid = os.getpid()
+
+    def __enter__(self):
+        PoolRegistry.check_pid()
+        PoolRegistry.n_scopes += 1
+
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        PoolRegistry.check_pid()
+        PoolRegistry.n_scopes = max(PoolRegistry.n_scopes - 1, 0)
+
+        if PoolRegistry.n_scopes == 0:
+            PoolRegistry.close(terminate=exc_type is not None)
+
+    @staticmethod
+    def check_pid():
+        """
+        Resets the registry in forked processes (the pools of the parent process can not be used).
+
+        PoolRegistry.check_pid()
+        """
+        if PoolRegistry.pid != os.getpid():
+            PoolRegistry.pools = OrderedDict()
+            PoolRegistry.n_scopes = 0
+            PoolRegistry.pid = os.getpid()
+
+    @staticmethod
+    def is_active():
+        """
+        Tests if a PoolRegistry context is open.
+
+        is_active = PoolRegistry.is_active()
+
+        Returns
+        -------
+        is_active : bool
+            True if worker pools are borrowed from the registry
+        """
+        PoolRegistry.check_pid()
+
+        return PoolRegistry.n_scopes > 0
+
+    @staticmethod
+    def get(n_cpu):
+        """
+        Returns the registered worker pool with n_cpu workers. It is started if it is not registered yet.
+
+        pool = PoolRegistry.get(n_cpu)
+
+        Parameters
+        ----------
+        n_cpu : int
+            Number of workers
+
+        Returns
+        -------
+        pool : WorkerPool
+            Worker pool
+        """
+        PoolRegistry.check_pid()
+
+        if n_cpu not in PoolRegistry.pools:
+            PoolRegistry.pools[n_cpu] = WorkerPool(n_cpu)
+
+        return PoolRegistry.pools[n_cpu]
+
+    @staticmethod
+    def close(terminate=False):
+        """
+        Closes all registered worker pools.
+
+        PoolRegistry.close(terminate=False)
+
+        Parameters
+        ----------
+        terminate : bool, optional, default: False
+            Stop the workers immediately instead of waiting for outstanding tasks
+        """
+        PoolRegistry.check_pid()
+
+        while len(PoolRegistry.pools) > 0:
+            PoolRegistry.pools.popitem()[1].close(terminate=terminate)
+
+
+atexit.register(PoolRegistry.close, terminate=True)
 
 
 class ComputationPoolMap:
     """
-    Computation sub-class to run the model using a processing pool for parallelization
+    Computation sub-class to run the model using a processing pool for parallelization. Inside of a PoolRegistry
+    context, the worker pool is borrowed from the registry, otherwise it is owned by the instance and closed by
+    close(). The models are evaluated in the calling process if n_cpu is 1.
 
     Parameters
     ----------
@@ -48,9 +380,13 @@ class ComputationPoolMap:
         Number of CPU cores to use (parallel model evaluations)
     matlab_model : boolean, optional, default: False
         Use a Matlab model
+    dispatch : str, optional, default: "map"
+        Dispatch of the grid points to the worker pool ("map", "shared_memory" or "vectorized", see Computation)
+    chunk_size : int, optional, default: None
+        Number of grid points per task of the "vectorized" dispatch (Default: 4 chunks per worker)
     """
 
-    def __init__(self, n_cpu, matlab_model=False):
+    def __init__(self, n_cpu, matlab_model=False, dispatch="map", chunk_size=None):
         """
         Constructor; Initializes ComputationPoolMap class
         """
@@ -58,21 +394,30 @@ class ComputationPoolMap:
         n_cpu_available = multiprocessing.cpu_count()
         self.n_cpu = min(n_cpu, n_cpu_available)
 
-        self.i_grid = 0
+        if dispatch == "shared_memory" and shared_memory is None:
+            raise NotImplementedError("Dispatch 'shared_memory' requires multiprocessing.shared_memory "
+                                      "(Python >= 3.8)")
 
-        # Use a process queue to assign persistent, unique IDs to the processes in the pool
-        self.process_manager = multiprocessing.Manager()
-        self.process_queue = self.process_manager.Queue()
-        self.process_pool = multiprocessing.Pool(self.n_cpu, Worker.init, (self.process_queue,))
+        self.dispatch = dispatch
+        self.chunk_size = chunk_size
+        self.i_grid = 0
+        self.pool = None
+        self.pool_owned = False
 
-        # Global counter used by all threads to keep track of the progress
-        self.global_task_counter = self.process_manager.Value('i', 0)
+        if self.n_cpu == 1:
+            # Global counter and lock of the simulations in this process
+            self.global_task_counter = multiprocessing.Value('i', 0)
+            self.global_lock = multiprocessing.RLock()
 
-        for i in range(0, n_cpu):
-            self.process_queue.put(i)
+        else:
+            if PoolRegistry.is_active():
+                self.pool = PoolRegistry.get(self.n_cpu)
+            else:
+                self.pool = WorkerPool(self.n_cpu)
+                self.pool_owned = True
 
-        # Necessary to synchronize read/write access to serialized results
-        self.global_lock = self.process_manager.RLock()
+            self.global_task_counter = self.pool.global_task_counter
+            self.global_lock = self.pool.global_lock
 
         self.matlab_engine = None
 
@@ -113,115 +458,283 @@ class ComputationPoolMap:
         res: ndarray of float [n_sims x n_out]
             n_sims simulation results of the n_out output quantities of the model under investigation.
         """
+        n_grid_new = coords.shape[0]
+
+        if self.pool is not None and self.dispatch == "shared_memory" and n_grid_new > 1:
+            self.global_task_counter.value = 0  # since we re-use the  global counter, we need to reset it first
+
+            # the model is identified in the cache before its instance state is removed by the installation
+            cache_model_id = EvaluationCache.get_model_id(model) if EvaluationCache.get_active() is not None else None
+
+            context = {
+                'i_grid': self.i_grid,
+                'increment_grid': increment_grid,
+                'max_grid': n_grid_new,
+                'i_iter': "N/A" if i_iter is None else i_iter,
+                'i_subiter': "N/A" if i_subiter is None else i_subiter,
+                'fn_results': fn_results,
+                'print_func_time': print_func_time,
+                'evaluation_cache': EvaluationCache.get_active(),
+                'cache_model_id': cache_model_id
+            }
+
+            res = self.run_shared_memory(key=self.pool.install(model=model, problem=problem),
+                                         coords=coords, coords_norm=coords_norm, context=context)
+
+            if increment_grid:
+                self.i_grid += n_grid_new
+
+            return res
+
+        # Initialize the result array with the correct size and set the elements according to their order
+        # (the results are received in the order the simulations finish)
+        res = [None] * n_grid_new
+
+        for i, res_i in self.submit(model=model, problem=problem, coords=coords, coords_norm=coords_norm,
+                                    i_iter=i_iter, i_subiter=i_subiter, fn_results=fn_results,
+                                    print_func_time=print_func_time, increment_grid=increment_grid):
+            res[i] = res_i
+
+        res = np.vstack(res)
+
+        return res
+
+    def submit(self, model, problem, coords, coords_norm=None, i_iter=None, i_subiter=None, fn_results=None,
+               print_func_time=False, increment_grid=True):
+        """
+        Submits model evaluations for parameter combinations specified in coords array and returns an iterator,
+        which yields the results in the order the simulations finish. The simulations are started immediately
+        by the worker pool (one task per grid point or chunk of grid points), such that the caller can process
+        partial results or do other work while the remaining simulations are running. Without a worker pool
+        (n_cpu = 1), the simulations are run when the iterator is advanced.
+
+        for i, res_i in ComputationPoolMap.submit(model, problem, coords, ...):
+
+        Parameters
+        ----------
+        model: Model object
+            Model object instance of model to investigate (derived from AbstractModel class, implemented by user)
+        problem: Problem class instance
+            GPC Problem under investigation, includes the parameters of the model (constant and random)
+        coords: ndarray of float [n_sims, n_dim]
+            Set of n_sims parameter combinations to run the model with (only the random parameters!).
+        coords_norm: ndarray of float [n_sims, n_dim]
+            Set of n_sims parameter combinations to run the model with (normalized coordinates [-1, 1].
+        i_iter: int
+            Index of main-iteration
+        i_subiter: int
+            Index of sub-iteration
+        fn_results : string, optional, default=None
+            If provided, model evaluations are saved in fn_results.hdf5 file and gpc object in fn_results.pkl file
+        print_func_time : bool
+            Print time of single function evaluation
+        increment_grid : bool
+            Increment grid counter (not done in case of gradient calculation)
+
+        Returns
+        -------
+        results : iterator of (int, ndarray of float [n_out])
+            Index of the grid point in coords and simulation results of the n_out output quantities
+        """
         if i_iter is None:
             i_iter = "N/A"
 
         if i_subiter is None:
             i_subiter = "N/A"
 
-        # read new grid points and convert to list for multiprocessing
-        grid_new = coords.tolist()
-
-        n_grid_new = len(grid_new)
+        n_grid_new = coords.shape[0]
 
-        # create worker objects that will evaluate the function
-        worker_objs = []
         self.global_task_counter.value = 0  # since we re-use the  global counter, we need to reset it first
-        seq_num = 0
 
-        # assign the instances of the random_vars to the respective
-        # replace random vars of the Problem with single instances
-        # determined by the PyGPC framework:
-        # assign the instances of the random_vars to the respective
-        # entries of the dictionary
-        # -> As a result we have the same keys in the dictionary but
-        #    no RandomParameters anymore but a sample from the defined PDF.
+        # the model is identified in the cache before its instance state is removed by the installation
+        cache_model_id = EvaluationCache.get_model_id(model) if EvaluationCache.get_active() is not None else None
 
-        # deepcopy model and delete attributes
-        model_ = copy.deepcopy(model)
-        model_.__clean__()
+        # the workers of the pool receive the model and the problem only once (installed by their key)
+        if self.pool is not None:
+            key = self.pool.install(model=model, problem=problem)
+        else:
+            model_ = copy.deepcopy(model)
+            model_.__clean__()
+
+        # grid points evaluated per task (chunks are evaluated by one call of the vectorized model)
+        if self.dispatch == "vectorized":
+            chunk_size = self.get_chunk_size(n_grid_new)
+        else:
+            chunk_size = 1
+
+        n_tasks = int(np.ceil(n_grid_new / chunk_size))
+        tasks = []
+
+        for i_start in range(0, n_grid_new, chunk_size):
+            i_stop = min(i_start + chunk_size, n_grid_new)
 
-        for j, random_var_instances in enumerate(grid_new):
+            if self.dispatch == "vectorized":
+                # i_grid indices is a range [min_idx, max_idx] (see ComputationFuncPar)
+                i_grid = [self.i_grid + i_start, self.i_grid + i_stop] if increment_grid else self.i_grid
+            else:
+                i_grid = self.i_grid + i_start if increment_grid else self.i_grid
 
             if coords_norm is None:
                 c_norm = None
             else:
-                c_norm = coords_norm[j, :][np.newaxis, :]
+                c_norm = np.array(coords_norm[i_start:i_stop, :])
 
             # setup context (let the process know which iteration, interaction order etc.)
             context = {
-                'global_task_counter': self.global_task_counter,
-                'lock': self.global_lock,
-                'seq_number': seq_num,
-                'i_grid': self.i_grid,
-                'max_grid': n_grid_new,
+                'seq_number': i_start,
+                'i_grid': i_grid,
+                'max_grid': n_tasks,
                 'i_iter': i_iter,
                 'i_subiter': i_subiter,
                 'fn_results': fn_results,
-                'coords': np.array(random_var_instances)[np.newaxis, :],
+                'coords': np.array(coords[i_start:i_stop, :]),
                 'coords_norm': c_norm,
-                'print_func_time': print_func_time
+                'print_func_time': print_func_time,
+                'evaluation_cache': EvaluationCache.get_active(),
+                'cache_model_id': cache_model_id
             }
 
-            # deepcopy parameters
-            parameters = OrderedDict()
-            for key in problem.parameters:
-                parameters[key] = problem.parameters[key]
+            if self.pool is not None:
+                tasks.append((key, context))
 
-            # replace RandomParameters with grid points
-            for i in range(0, len(random_var_instances)):
-                if type(random_var_instances[i]) is not np.array:
-                    random_var_instances[i] = np.array([random_var_instances[i]])
-                parameters[list(problem.parameters_random.keys())[i]] = random_var_instances[i]
+            else:
+                context['global_task_counter'] = self.global_task_counter
+                context['lock'] = self.global_lock
+
+                # assign the instances of the random_vars to the respective entries of the dictionary
+                # -> As a result we have the same keys in the dictionary but
+                #    no RandomParameters anymore but a sample from the defined PDF.
+                if self.dispatch == "vectorized":
+                    parameters = Worker.get_parameters_vectorized(
+                        parameters=problem.parameters,
+                        parameters_random_keys=list(problem.parameters_random.keys()),
+                        coords=context['coords'])
+                else:
+                    parameters = Worker.get_parameters(
+                        parameters=problem.parameters,
+                        parameters_random_keys=list(problem.parameters_random.keys()),
+                        coords=context['coords'][0])
 
-            # append new worker which will evaluate the model with particular parameters from grid
-            import time
+                tasks.append(model_.__copy__().set_parameters(p=parameters, context=context))
 
-            # start = time.time()
-            # model_ = copy.deepcopy(model)
-            # end = time.time()
-            # print("copy.deepcopy: {}s".format(end-start))
+        if increment_grid:
+            self.i_grid += n_grid_new
 
-            # start = time.time()
-            # model_worker = model_.__copy__().set_parameters(p=parameters, context=context)
-            # model_worker1 = model_.__copy__().set_parameters(p=parameters, context=context)
-            # end = time.time()
-            # print("__copy__: {}s".format(end - start))
+        # start model evaluations
+        if self.pool is None:
+            results = (Worker.run(obj=task, matlab_engine=self.matlab_engine) for task in tasks)
+        elif self.dispatch == "vectorized":
+            results = self.pool.imap_unordered(Worker.run_installed_vectorized, tasks)
+        else:
+            results = self.pool.imap_unordered(Worker.run_installed, tasks)
 
-            # model_worker.p["exp_idx"] = 99
-            # model_worker1.p["exp_idx"]
+        # split the results of the tasks into the results of the grid points (sequence number: first grid point)
+        return ((i_start + j, res_j)
+                for i_start, res in results
+                for j, res_j in enumerate(np.reshape(res, (min(chunk_size, n_grid_new - i_start), -1))))
 
-            worker_objs.append(model_.__copy__().set_parameters(p=parameters, context=context))
+    def get_chunk_size(self, n_grid):
+        """
+        Determines the number of grid points evaluated per task in the "vectorized" dispatch. If no chunk size was
+        given, the grid points are split into 4 chunks per worker (all grid points without worker pool).
 
-            if increment_grid:
-                self.i_grid += 1
-            seq_num += 1
+        chunk_size = ComputationPoolMap.get_chunk_size(n_grid)
 
-        # start model evaluations
-        if self.n_cpu == 1:
-            res_new_list = []
+        Parameters
+        ----------
+        n_grid : int
+            Number of grid points
 
-            for i in range(len(worker_objs)):
-                res_new_list.append(Worker.run(obj=worker_objs[i], matlab_engine=self.matlab_engine))
+        Returns
+        -------
+        chunk_size : int
+            Number of grid points per task
+        """
+        if self.chunk_size is not None:
+            return max(int(self.chunk_size), 1)
 
-        else:
-            # The map-function deals with chunking the data
-            res_new_list = self.process_pool.map(Worker.run, worker_objs, self.matlab_engine)
+        if self.pool is None:
+            return max(n_grid, 1)
 
-        # Initialize the result array with the correct size and set the elements according to their order
-        # (the first element in 'res' might not necessarily be the result of the first Process/i_grid)
-        res = [None] * n_grid_new
-        for result in res_new_list:
-            res[result[0]] = result[1]
+        chunk_size, extra = divmod(n_grid, 4 * self.n_cpu)
 
-        res = np.vstack(res)
+        return max(chunk_size + int(extra > 0), 1)
+
+    def run_shared_memory(self, key, coords, coords_norm, context):
+        """
+        Runs model evaluations in the worker pool with the coordinates and results stored in shared memory.
+        The tasks only contain the index ranges of the grid points (chunks) and the context common to all
+        simulations. All chunks are dispatched at once. The results array in shared memory is allocated with the
+        number of output quantities of a previous run of the installed model; in the first run, the chunks return
+        their results instead.
+
+        res = ComputationPoolMap.run_shared_memory(key, coords, coords_norm, context)
+
+        Parameters
+        ----------
+        key : str
+            Key of the model and problem installed in the worker pool
+        coords: ndarray of float [n_sims, n_dim]
+            Set of n_sims parameter combinations to run the model with (only the random parameters!).
+        coords_norm: ndarray of float [n_sims, n_dim] or None
+            Set of n_sims parameter combinations to run the model with (normalized coordinates [-1, 1].
+        context : dict
+            Context common to all simulations (i_grid of first grid point, increment_grid, max_grid, i_iter,
+            i_subiter, fn_results, print_func_time)
+
+        Returns
+        -------
+        res: ndarray of float [n_sims x n_out]
+            n_sims simulation results of the n_out output quantities of the model under investigation.
+        """
+        n_grid = coords.shape[0]
+        shm = dict()
+        arrays = dict()
+        buffers = dict()
+
+        try:
+            for name, array in [("coords", coords), ("coords_norm", coords_norm)]:
+                if array is None:
+                    buffers[name] = None
+                else:
+                    shm[name], arrays[name], buffers[name] = create_shared_array(shape=array.shape,
+                                                                                 dtype=array.dtype)
+                    arrays[name][:] = array
+
+            # the number of output quantities is known from a previous run of the installed model
+            if key in self.pool.n_out:
+                shm["results"], arrays["results"], buffers["results"] = create_shared_array(
+                    shape=(n_grid, self.pool.n_out[key]))
+
+            # chunks of the grid points (similar to the chunking of multiprocessing.Pool.map)
+            chunksize, extra = divmod(n_grid, 4 * self.n_cpu)
+            chunksize += int(extra > 0)
+
+            res_chunks = self.pool.map(Worker.run_shared_memory,
+                                       [(key, buffers, i, min(i + chunksize, n_grid), context)
+                                        for i in range(0, n_grid, chunksize)])
+
+            if "results" in arrays:
+                res = np.array(arrays["results"])
+            else:
+                res = np.vstack(res_chunks)
+                self.pool.n_out[key] = res.shape[1]
+
+        finally:
+            # the arrays have to be released before the shared memory can be closed
+            arrays.clear()
+
+            for name in shm:
+                shm[name].close()
+                shm[name].unlink()
 
         return res
 
     def close(self):
-        """ Closes the pool """
-        self.process_pool.close()
-        self.process_pool.join()
+        """ Closes the pool (borrowed pools are returned to the PoolRegistry) """
+        if self.pool_owned:
+            self.pool.close()
+            self.pool_owned = False
 
 
 class ComputationFuncPar:
@@ -313,6 +826,8 @@ class ComputationFuncPar:
         else:
             c_norm = coords_norm
 
+        cache_model_id = EvaluationCache.get_model_id(model) if EvaluationCache.get_active() is not None else None
+
         # setup context (let the process know which iteration, interaction order etc.)
         context = {
             'global_task_counter': self.global_task_counter,
@@ -325,28 +840,14 @@ class ComputationFuncPar:
             'fn_results': fn_results,
             'coords': coords,
             'coords_norm': c_norm,
-            'print_func_time': print_func_time
+            'print_func_time': print_func_time,
+            'evaluation_cache': EvaluationCache.get_active(),
+            'cache_model_id': cache_model_id
         }
 
-        parameters = OrderedDict()
-        i_random_parameter = 0
-
-        for key in problem.parameters:
-
-            if isinstance(problem.parameters[key], RandomParameter):
-                # replace RandomParameters with grid points
-                parameters[key] = coords[:, i_random_parameter]
-                i_random_parameter += 1
-
-            else:
-                # copy constant parameters n_grid times
-                if type(problem.parameters[key]) == float or problem.parameters[key].size == 1:
-                    parameters[key] = problem.parameters[key] * np.ones(n_grid)
-                else:
-                    if str(type(problem.parameters[key])) == "<class 'matlab.engine.matlabengine.MatlabEngine'>":
-                        parameters[key] = problem.parameters[key]
-                    else:
-                        parameters[key] = np.tile(problem.parameters[key], (n_grid, 1))
+        parameters = Worker.get_parameters_vectorized(parameters=problem.parameters,
+                                                      parameters_random_keys=list(problem.parameters_random.keys()),
+                                                      coords=coords)
 
         # generate worker, which will evaluate the model (here only one for all grid points in coords)
         worker_objs = model.set_parameters(p=parameters, context=context)
@@ -358,6 +859,47 @@ class ComputationFuncPar:
 
         return res
 
+    def submit(self, model, problem, coords, coords_norm=None, i_iter=None, i_subiter=None, fn_results=None,
+               print_func_time=False, increment_grid=True):
+        """
+        Runs model evaluations for parameter combinations specified in coords array and returns an iterator over
+        the results of the grid points (provided for compatibility with ComputationPoolMap.submit, the model
+        evaluates all grid points at once).
+
+        for i, res_i in ComputationFuncPar.submit(model, problem, coords, ...):
+
+        Parameters
+        ----------
+        model: Model object
+            Model object instance of model to investigate (derived from AbstractModel class, implemented by user)
+        problem: Problem class instance
+            GPC Problem under investigation, includes the parameters of the model (constant and random)
+        coords: ndarray of float [n_sims, n_dim]
+            Set of n_sims parameter combinations to run the model with (only the random parameters!).
+        coords_norm: ndarray of float [n_sims, n_dim]
+            Set of n_sims parameter combinations to run the model with (normalized coordinates [-1, 1].
+        i_iter: int
+            Index of main-iteration
+        i_subiter: int
+            Index of sub-iteration
+        fn_results : string, optional, default=None
+            If provided, model evaluations are saved in fn_results.hdf5 file and gpc object in fn_results.pkl file
+        print_func_time : bool
+            Print time of single function evaluation
+        increment_grid : bool
+            Increment grid counter (not done in case of gradient calculation)
+
+        Returns
+        -------
+        results : iterator of (int, ndarray of float [n_out])
+            Index of the grid point in coords and simulation results of the n_out output quantities
+        """
+        res = self.run(model=model, problem=problem, coords=coords, coords_norm=coords_norm, i_iter=i_iter,
+                       i_subiter=i_subiter, fn_results=fn_results, print_func_time=print_func_time,
+                       increment_grid=increment_grid)
+
+        return enumerate(np.reshape(res, (coords.shape[0], -1)))
+
     def close(self):
         """ Closes the pool """
         pass
@@ -0,0 +1,289 @@
+import os
+import time
+import pickle
+import hashlib
+import sqlite3
+import numpy as np
+
+
+class EvaluationCache(object):
+    """
+    Persistent store of model evaluations, which is addressed by the content of the simulations instead of their
+    position in the results file. The key of a grid point is the hash of the model (see get_model_id), the constant
+    parameters and the (rounded) values of the random parameters. The results are stored as blobs in an SQLite database,
+    which can be shared by several processes, sessions, algorithms (including the validation sets) and
+    TestBench repetitions. If the size of the stored results exceeds max_size, the least recently used results
+    are evicted.
+
+    The cache is used by all model evaluations (Computation) inside of its context. Grid points, which are found
+    in the cache, are not simulated again (the results are written to fn_results.hdf5 as usual):
+
+    with EvaluationCache(fn="evaluations.sqlite", max_size=1e9):
+        session, coeffs, results = session.run()
+
+    The model is identified by its class and its instance state (attributes set in the constructor), but not by its
+    code. Changing the implementation of a model does not invalidate its stored results; in this case, clear the
+    cache or set a new model_id attribute in the constructor of the model (e.g. self.model_id = "Ishigami_v2"),
+    which replaces the instance state in the keys.
+
+    Parameters
+    ----------
+    fn : str
+        Filename of the SQLite database (created if not existing)
+    max_size : float, optional, default: 1e9
+        Maximum size of the stored results in bytes (None: unlimited)
+    decimals : int, optional, default: 10
+        Number of decimals the parameter values are rounded to before hashing
+
+    Attributes
+    ----------
+    fn : str
+        Filename of the SQLite database
+    max_size : float
+        Maximum size of the stored results in bytes
+    decimals : int
+        Number of decimals the parameter values are rounded to before hashing
+    active : list of EvaluationCache
+        Stack of the caches of the open contexts (class attribute)
+    context_keys : list of str
+        Attributes of the model, which are set by AbstractModel.set_parameters and do not identify the model
+        (class attribute)
+    """
+    active = []
+    context_keys = ["p", "lock", "max_grid", "global_task_counter", "seq_number", "fn_results", "i_grid", "i_iter",
+                    "i_subiter", "coords", "coords_norm", "print_func_time", "increment_grid", "evaluation_cache",
+                    "cache_model_id"]
+
+    def __init__(self, fn, max_size=1e9, decimals=10):
+        """
+        Constructor; initializes the EvaluationCache class
+        """
+        self.fn = os.path.abspath(fn)
+        self.max_size = max_size
+        self.decimals = decimals
+
+        with self.connect():
+            pass
+
+    def __enter__(self):
+        EvaluationCache.active.append(self)
+
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        EvaluationCache.active.remove(self)
+
+    def __len__(self):
+        with self.connect() as con:
+            return con.execute("SELECT COUNT(*) FROM evaluations").fetchone()[0]
+
+    @staticmethod
+    def get_active():
+        """
+        Returns the cache of the innermost open context.
+
+        cache = EvaluationCache.get_active()
+
+        Returns
+        -------
+        cache : EvaluationCache or None
+            Active cache (None if no context is open)
+        """
+        if len(EvaluationCache.active) > 0:
+            return EvaluationCache.active[-1]
+
+        return None
+
+    def connect(self):
+        """
+        Opens a connection to the database and creates the table of the evaluations if it is not existing.
+
+        con = EvaluationCache.connect()
+
+        Returns
+        -------
+        con : sqlite3.Connection
+            Connection to the database (use as context manager to commit transactions)
+        """
+        con = sqlite3.connect(self.fn, timeout=60)
+        con.execute("PRAGMA journal_mode=WAL")
+        con.execute("CREATE TABLE IF NOT EXISTS evaluations "
+                    "(key TEXT PRIMARY KEY, result BLOB, size INTEGER, last_access REAL)")
+
+        return con
+
+    @staticmethod
+    def get_model_id(obj):
+        """
+        Determines the identifier of a model instance from its class and its instance state. The parameters and the
+        context of the simulations (see context_keys) are not part of the instance state. If the model defines a
+        model_id attribute, it is used instead of the instance state.
+
+        model_id = EvaluationCache.get_model_id(obj)
+
+        Parameters
+        ----------
+        obj : Model object
+            Model object instance
+
+        Returns
+        -------
+        model_id : bytes
+            Identifier of the model instance
+        """
+        h = hashlib.sha1("{}.{}".format(type(obj).__module__, type(obj).__qualname__).encode())
+
+        if hasattr(obj, "model_id"):
+            h.update(str(obj.model_id).encode())
+            return h.digest()
+
+        for key in sorted(obj.__dict__):
+            if key in EvaluationCache.context_keys:
+                continue
+
+            h.update(str(key).encode())
+
+            try:
+                h.update(pickle.dumps(obj.__dict__[key], protocol=4))
+            except Exception:
+                # objects, which can not be pickled (e.g. Matlab engine), are identified by their type only
+                h.update(str(type(obj.__dict__[key])).encode())
+
+        return h.digest()
+
+    def get_keys(self, obj):
+        """
+        Determines the keys of the grid points of a model instance with set parameters (see
+        AbstractModel.set_parameters). Constant parameters are either given once or for every grid point.
+        The identifier of the model is taken from the context (cache_model_id), which is determined by Computation
+        before the instance state of the model is removed for the workers, or determined from obj otherwise.
+
+        keys = EvaluationCache.get_keys(obj)
+
+        Parameters
+        ----------
+        obj : Model object
+            Model object instance with set parameters and coords [n_sim x n_dim]
+
+        Returns
+        -------
+        keys : list of str [n_sim]
+            Keys of the grid points
+        """
+        n_sim = obj.coords.shape[0]
+        model_id = getattr(obj, "cache_model_id", None)
+
+        if model_id is None:
+            model_id = self.get_model_id(obj)
+        keys = []
+
+        for i_sim in range(n_sim):
+            h = hashlib.sha1(model_id)
+
+            for key in obj.p:
+                value = np.asarray(obj.p[key])
+
+                if n_sim > 1 and value.ndim > 0 and value.shape[0] == n_sim:
+                    value = value[i_sim]
+
+                value = np.atleast_1d(value)
+
+                h.update(str(key).encode())
+
+                if np.issubdtype(value.dtype, np.number):
+                    h.update(np.round(value.astype(float), self.decimals).tobytes())
+                elif value.dtype.kind in "SU":
+                    h.update(value.astype(str).tobytes())
+                else:
+                    # objects (e.g. Matlab engine) are identified by their type only
+                    h.update(str(type(value.flatten()[0])).encode())
+
+            keys.append(h.hexdigest())
+
+        return keys
+
+    def read(self, keys):
+        """
+        Reads the results of grid points from the cache and updates their time of last access.
+
+        results = EvaluationCache.read(keys)
+
+        Parameters
+        ----------
+        keys : list of str [n_sim]
+            Keys of the grid points
+
+        Returns
+        -------
+        results : ndarray of float [n_sim x n_out] or None
+            Results of the grid points (None if at least one grid point is not in the cache)
+        """
+        with self.connect() as con:
+            rows = dict(con.execute("SELECT key, result FROM evaluations WHERE key IN ({})".format(
+                ",".join("?" * len(keys))), keys).fetchall())
+
+            if len(rows) < len(set(keys)):
+                return None
+
+            con.executemany("UPDATE evaluations SET last_access = ? WHERE key = ?",
+                            [(time.time(), key) for key in rows])
+
+        return np.vstack([np.frombuffer(rows[key], dtype="float64") for key in keys])
+
+    def write(self, keys, results):
+        """
+        Writes the results of grid points to the cache and evicts the least recently used results if the size of
+        the cache exceeds max_size.
+
+        EvaluationCache.write(keys, results)
+
+        Parameters
+        ----------
+        keys : list of str [n_sim]
+            Keys of the grid points
+        results : ndarray of float [n_sim x n_out]
+            Results of the grid points
+        """
+        results = np.reshape(np.asarray(results, dtype="float64"), (len(keys), -1))
+
+        with self.connect() as con:
+            con.executemany("INSERT OR REPLACE INTO evaluations VALUES (?, ?, ?, ?)",
+                            [(key, results[i].tobytes(), results[i].nbytes, time.time())
+                             for i, key in enumerate(keys)])
+
+            if self.max_size is not None:
+                self.evict(con)
+
+    def evict(self, con):
+        """
+        Deletes the least recently used results until the size of the cache does not exceed max_size.
+
+        EvaluationCache.evict(con)
+
+        Parameters
+        ----------
+        con : sqlite3.Connection
+            Connection to the database
+        """
+        if con.execute("SELECT COALESCE(SUM(size), 0) FROM evaluations").fetchone()[0] <= self.max_size:
+            return
+
+        size = 0
+        keys_evict = []
+
+        for key, size_key in con.execute("SELECT key, size FROM evaluations ORDER BY last_access DESC"):
+            size += size_key
+
+            if size > self.max_size:
+                keys_evict.append((key, ))
+
+        con.executemany("DELETE FROM evaluations WHERE key = ?", keys_evict)
+
+    def clear(self):
+        """
+        Deletes all results from the cache.
+
+        EvaluationCache.clear()
+        """
+        with self.connect() as con:
+            con.execute("DELETE FROM evaluations")
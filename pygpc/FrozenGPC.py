@@ -0,0 +1,621 @@
+import numpy as np
+
+
+def get_recurrence_table(x, psi_0, a, b, c, derivative=False):
+    """
+    Evaluates the normalized polynomials psi_0, ..., psi_order_max of a family with three-term recurrence at x.
+
+    .. math::
+       \\psi_{n+1}(x) = (a_n x + b_n) \\psi_n(x) - c_n \\psi_{n-1}(x)
+
+    table = get_recurrence_table(x, psi_0, a, b, c, derivative=False)
+
+    Parameters
+    ----------
+    x : ndarray of float [n_x]
+        Arguments for which the polynomials are evaluated
+    psi_0 : float
+        Value of the normalized polynomial of order 0
+    a : ndarray of float [order_max]
+        Recurrence coefficients a_n (n = 0, ..., order_max-1)
+    b : ndarray of float [order_max]
+        Recurrence coefficients b_n (n = 0, ..., order_max-1)
+    c : ndarray of float [order_max]
+        Recurrence coefficients c_n (n = 0, ..., order_max-1), c_0 = 0
+    derivative : boolean, optional, default: False
+        Returns the derivatives of the polynomials at x
+
+    Returns
+    -------
+    table : ndarray of float [n_x x (order_max + 1)]
+        Function values (or derivatives) of the polynomials of order 0, ..., order_max (columns) at x (rows)
+    """
+    order_max = len(a)
+
+    table = np.empty((x.shape[0], order_max + 1))
+    table[:, 0] = psi_0
+
+    if order_max > 0:
+        table[:, 1] = (a[0] * x + b[0]) * psi_0
+
+    for n in range(1, order_max):
+        table[:, n + 1] = (a[n] * x + b[n]) * table[:, n] - c[n] * table[:, n - 1]
+
+    if not derivative:
+        return table
+
+    table_der = np.zeros((x.shape[0], order_max + 1))
+
+    if order_max > 0:
+        table_der[:, 1] = a[0] * psi_0
+
+    for n in range(1, order_max):
+        table_der[:, n + 1] = a[n] * table[:, n] + (a[n] * x + b[n]) * table_der[:, n] - \
+                              c[n] * table_der[:, n - 1]
+
+    return table_der
+
+
+def get_normalization_constants(parameters_random):
+    """
+    Determines the constants to transform coordinates from the original to the normalized parameter space
+    coords_norm = (coords - offset) * scale (see Grid.get_normalized_coordinates).
+
+    offset, scale = get_normalization_constants(parameters_random)
+
+    Parameters
+    ----------
+    parameters_random : OrderedDict of RandomParameter instances
+        Random parameters of the gPC problem
+
+    Returns
+    -------
+    offset : ndarray of float [dim]
+        Offset of the coordinates in the original parameter space
+    scale : ndarray of float [dim]
+        Scaling factor of the coordinates
+    """
+    offset = np.zeros(len(parameters_random))
+    scale = np.ones(len(parameters_random))
+
+    for i_p, p in enumerate(parameters_random):
+        if parameters_random[p].pdf_type == "beta":
+            offset[i_p] = (parameters_random[p].pdf_limits[0] + parameters_random[p].pdf_limits[1]) / 2.
+            scale[i_p] = 2. / (parameters_random[p].pdf_limits[1] - parameters_random[p].pdf_limits[0])
+
+        elif parameters_random[p].pdf_type in ["norm", "normal"]:
+            offset[i_p] = parameters_random[p].pdf_shape[0]
+            scale[i_p] = 1. / parameters_random[p].pdf_shape[1]
+
+        elif parameters_random[p].pdf_type in ["gamma"]:
+            offset[i_p] = parameters_random[p].pdf_shape[2]
+            scale[i_p] = parameters_random[p].pdf_shape[1]
+
+    return offset, scale
+
+
+def load_frozen_gpc(fname):
+    """
+    Loads a frozen gPC (FrozenGPC or FrozenMEGPC) saved with FrozenGPC.save() or FrozenMEGPC.save().
+
+    frozen_gpc = load_frozen_gpc(fname)
+
+    Parameters
+    ----------
+    fname : str
+        Filename of the .npz file
+
+    Returns
+    -------
+    frozen_gpc : FrozenGPC or FrozenMEGPC object instance
+        Frozen gPC
+    """
+    with np.load(fname) as f:
+        data = {key: f[key] for key in f.files}
+
+    if str(data["type"]) == "FrozenMEGPC":
+        return FrozenMEGPC.from_dict(data)
+    else:
+        return FrozenGPC.from_dict(data)
+
+
+class FrozenGPC(object):
+    """
+    Frozen gPC expansion for fast evaluations (e.g. for serving). It only contains numpy arrays and does not
+    depend on the Problem, Basis, BasisFunction and Grid objects of the gPC it was created from.
+    Created by SGPC.freeze(coeffs).
+
+    Parameters
+    ----------
+    multi_indices : ndarray of int [n_basis x dim]
+        Orders of the univariate polynomials of the basis functions
+    psi_0 : ndarray of float [dim]
+        Value of the normalized polynomial of order 0 of each parameter
+    a : ndarray of float [dim x order_max]
+        Recurrence coefficients a_n of the normalized polynomials of each parameter (zero padded)
+    b : ndarray of float [dim x order_max]
+        Recurrence coefficients b_n of the normalized polynomials of each parameter (zero padded)
+    c : ndarray of float [dim x order_max]
+        Recurrence coefficients c_n of the normalized polynomials of each parameter (zero padded)
+    coeffs : ndarray of float [n_basis x n_out]
+        GPC coefficients
+    offset : ndarray of float [dim_original]
+        Offset of the coordinates in the original parameter space
+    scale : ndarray of float [dim_original]
+        Scaling factor of the coordinates (coords_norm = (coords - offset) * scale)
+    x_min : ndarray of float [dim]
+        Lower bounds of the normalized coordinates (coordinates are cropped to the gPC boundaries)
+    x_max : ndarray of float [dim]
+        Upper bounds of the normalized coordinates (coordinates are cropped to the gPC boundaries)
+    projection : ndarray of float [dim_original x dim], optional, default: None
+        Projection matrix from the original to the reduced normalized parameter space (projected gPC)
+    """
+
+    def __init__(self, multi_indices, psi_0, a, b, c, coeffs, offset, scale, x_min, x_max, projection=None):
+        """
+        Constructor; initializes FrozenGPC class
+        """
+        self.multi_indices = np.asarray(multi_indices, dtype=int)
+        self.psi_0 = np.asarray(psi_0, dtype=float)
+        self.a = np.asarray(a, dtype=float)
+        self.b = np.asarray(b, dtype=float)
+        self.c = np.asarray(c, dtype=float)
+        self.coeffs = np.asarray(coeffs, dtype=float)
+        self.offset = np.asarray(offset, dtype=float)
+        self.scale = np.asarray(scale, dtype=float)
+        self.x_min = np.asarray(x_min, dtype=float)
+        self.x_max = np.asarray(x_max, dtype=float)
+        self.projection = projection
+
+        if self.coeffs.ndim == 1:
+            self.coeffs = self.coeffs[:, np.newaxis]
+
+        # maximum order of each parameter
+        if self.multi_indices.shape[0] > 0:
+            self.order_max = np.max(self.multi_indices, axis=0)
+        else:
+            self.order_max = np.zeros(self.multi_indices.shape[1], dtype=int)
+
+        self.dim = self.multi_indices.shape[1]
+        self.dim_original = self.offset.shape[0]
+        self.n_basis = self.multi_indices.shape[0]
+        self.n_out = self.coeffs.shape[1]
+
+    def get_normalized_coordinates(self, coords):
+        """
+        Normalize coordinates from the original to the normalized parameter space.
+
+        coords_norm = FrozenGPC.get_normalized_coordinates(coords)
+
+        Parameters
+        ----------
+        coords : ndarray of float [n_x x dim_original]
+            Coordinates in the original parameter space
+
+        Returns
+        -------
+        coords_norm : ndarray of float [n_x x dim_original]
+            Normalized coordinates
+        """
+        return (coords - self.offset[np.newaxis, :]) * self.scale[np.newaxis, :]
+
+    def get_tables(self, x, derivative=False):
+        """
+        Evaluates the univariate polynomials of every parameter up to its maximum order.
+
+        tables = FrozenGPC.get_tables(x, derivative=False)
+
+        Parameters
+        ----------
+        x : ndarray of float [n_x x dim]
+            Normalized coordinates (reduced parameter space in case of projected gPC)
+        derivative : boolean, optional, default: False
+            Returns the derivatives of the polynomials
+
+        Returns
+        -------
+        tables : list of ndarray of float [dim][n_x x (order_max + 1)]
+            Function values (or derivatives) of the polynomials of each parameter
+        """
+        return [get_recurrence_table(x=x[:, i_dim],
+                                     psi_0=self.psi_0[i_dim],
+                                     a=self.a[i_dim, :self.order_max[i_dim]],
+                                     b=self.b[i_dim, :self.order_max[i_dim]],
+                                     c=self.c[i_dim, :self.order_max[i_dim]],
+                                     derivative=derivative) for i_dim in range(self.dim)]
+
+    def predict(self, coords, normalized=False):
+        """
+        Calculates the gPC approximation at the given coordinates.
+
+        pce = FrozenGPC.predict(coords, normalized=False)
+
+        Parameters
+        ----------
+        coords : ndarray of float [n_x x dim_original]
+            Coordinates where the gPC approximation is calculated
+        normalized : boolean, optional, default: False
+            Coordinates are given in the normalized parameter space instead of the original one
+
+        Returns
+        -------
+        pce : ndarray of float [n_x x n_out]
+            GPC approximation at coords
+        """
+        x = np.array(coords, dtype=float, ndmin=2)
+
+        if not normalized:
+            x = self.get_normalized_coordinates(x)
+
+        # crop coordinates to gPC boundaries (values outside do not yield meaningful values)
+        n_crop = len(self.x_min)
+        x[:, :n_crop] = np.clip(x[:, :n_crop], self.x_min[np.newaxis, :], self.x_max[np.newaxis, :])
+
+        # transform variables from xi to eta space if gpc model is reduced
+        if self.projection is not None:
+            x = np.matmul(x, self.projection)
+
+        tables = self.get_tables(x)
+        gpc_matrix = np.ones([x.shape[0], self.n_basis])
+
+        for i_dim in range(self.dim):
+            gpc_matrix *= tables[i_dim][:, self.multi_indices[:, i_dim]]
+
+        return np.matmul(gpc_matrix, self.coeffs)
+
+    def predict_gradient(self, coords, normalized=False):
+        """
+        Calculates the gradient of the gPC approximation at the given coordinates.
+
+        grad = FrozenGPC.predict_gradient(coords, normalized=False)
+
+        Parameters
+        ----------
+        coords : ndarray of float [n_x x dim_original]
+            Coordinates where the gradient of the gPC approximation is calculated
+        normalized : boolean, optional, default: False
+            Coordinates are given in the normalized parameter space instead of the original one. The gradient
+            is determined w.r.t. the normalized coordinates in this case.
+
+        Returns
+        -------
+        grad : ndarray of float [n_x x n_out x dim_original]
+            Gradient of the gPC approximation at coords
+        """
+        x = np.array(coords, dtype=float, ndmin=2)
+
+        if not normalized:
+            x = self.get_normalized_coordinates(x)
+
+        # transform variables from xi to eta space if gpc model is reduced
+        if self.projection is not None:
+            x = np.matmul(x, self.projection)
+
+        tables = self.get_tables(x)
+        tables_der = self.get_tables(x, derivative=True)
+
+        # partial derivatives of the basis functions from prefix and suffix products [n_x x n_basis x dim]
+        gpc_matrix_gradient = np.ones([x.shape[0], self.n_basis, self.dim])
+
+        for i_dim in range(self.dim - 2, -1, -1):
+            gpc_matrix_gradient[:, :, i_dim] = gpc_matrix_gradient[:, :, i_dim + 1] * \
+                                               tables[i_dim + 1][:, self.multi_indices[:, i_dim + 1]]
+
+        prefix = np.ones([x.shape[0], self.n_basis])
+        for i_dim in range(self.dim):
+            gpc_matrix_gradient[:, :, i_dim] *= prefix * tables_der[i_dim][:, self.multi_indices[:, i_dim]]
+            prefix *= tables[i_dim][:, self.multi_indices[:, i_dim]]
+
+        grad = np.matmul(gpc_matrix_gradient.transpose(2, 0, 1), self.coeffs).transpose(1, 2, 0)
+
+        # project the gradient back to the original space if necessary
+        if self.projection is not None:
+            grad = np.matmul(grad, self.projection.transpose())
+
+        if not normalized:
+            grad *= self.scale[np.newaxis, np.newaxis, :]
+
+        return grad
+
+    def to_dict(self, prefix=""):
+        """
+        Returns the arrays of the frozen gPC as dictionary.
+
+        data = FrozenGPC.to_dict(prefix="")
+
+        Parameters
+        ----------
+        prefix : str, optional, default: ""
+            Prefix of the keys
+
+        Returns
+        -------
+        data : dict of ndarray
+            Arrays of the frozen gPC
+        """
+        data = {"type": np.array("FrozenGPC"),
+                "multi_indices": self.multi_indices,
+                "psi_0": self.psi_0,
+                "a": self.a,
+                "b": self.b,
+                "c": self.c,
+                "coeffs": self.coeffs,
+                "offset": self.offset,
+                "scale": self.scale,
+                "x_min": self.x_min,
+                "x_max": self.x_max}
+
+        if self.projection is not None:
+            data["projection"] = self.projection
+
+        return {prefix + key: data[key] for key in data}
+
+    @staticmethod
+    def from_dict(data, prefix=""):
+        """
+        Initializes a frozen gPC from a dictionary created by FrozenGPC.to_dict().
+
+        frozen_gpc = FrozenGPC.from_dict(data, prefix="")
+
+        Parameters
+        ----------
+        data : dict of ndarray
+            Arrays of the frozen gPC
+        prefix : str, optional, default: ""
+            Prefix of the keys
+
+        Returns
+        -------
+        frozen_gpc : FrozenGPC object instance
+            Frozen gPC
+        """
+        return FrozenGPC(multi_indices=data[prefix + "multi_indices"],
+                         psi_0=data[prefix + "psi_0"],
+                         a=data[prefix + "a"],
+                         b=data[prefix + "b"],
+                         c=data[prefix + "c"],
+                         coeffs=data[prefix + "coeffs"],
+                         offset=data[prefix + "offset"],
+                         scale=data[prefix + "scale"],
+                         x_min=data[prefix + "x_min"],
+                         x_max=data[prefix + "x_max"],
+                         projection=data.get(prefix + "projection", None))
+
+    def save(self, fname):
+        """
+        Saves the frozen gPC in an uncompressed .npz file (load with load_frozen_gpc(fname)).
+
+        FrozenGPC.save(fname)
+
+        Parameters
+        ----------
+        fname : str
+            Filename of the .npz file
+        """
+        np.savez(fname, **self.to_dict())
+
+
+class FrozenMEGPC(object):
+    """
+    Frozen multi-element gPC expansion for fast evaluations (e.g. for serving). The domains are predicted by
+    evaluating the trained MLPClassifier of the MEGPC directly from its weights.
+    Created by MEGPC.freeze(coeffs).
+
+    Parameters
+    ----------
+    gpc : list of FrozenGPC object instances [n_gpc]
+        Frozen gPCs of the sub-domains
+    clf_coefs : list of ndarray of float [n_layers - 1]
+        Weights of the layers of the classifier
+    clf_intercepts : list of ndarray of float [n_layers - 1]
+        Biases of the layers of the classifier
+    clf_classes : ndarray of int [n_classes]
+        Domain labels of the classifier outputs
+    clf_activation : str
+        Activation function of the hidden layers ("relu", "tanh", "logistic" or "identity")
+    offset : ndarray of float [dim]
+        Offset of the coordinates in the original parameter space
+    scale : ndarray of float [dim]
+        Scaling factor of the coordinates (coords_norm = (coords - offset) * scale)
+    """
+
+    def __init__(self, gpc, clf_coefs, clf_intercepts, clf_classes, clf_activation, offset, scale):
+        """
+        Constructor; initializes FrozenMEGPC class
+        """
+        self.gpc = gpc
+        self.clf_coefs = [np.asarray(w, dtype=float) for w in clf_coefs]
+        self.clf_intercepts = [np.asarray(w, dtype=float) for w in clf_intercepts]
+        self.clf_classes = np.asarray(clf_classes)
+        self.clf_activation = str(clf_activation)
+        self.offset = np.asarray(offset, dtype=float)
+        self.scale = np.asarray(scale, dtype=float)
+        self.dim_original = self.offset.shape[0]
+        self.n_out = self.gpc[0].n_out
+
+    def get_normalized_coordinates(self, coords):
+        """
+        Normalize coordinates from the original to the normalized parameter space.
+
+        coords_norm = FrozenMEGPC.get_normalized_coordinates(coords)
+
+        Parameters
+        ----------
+        coords : ndarray of float [n_x x dim]
+            Coordinates in the original parameter space
+
+        Returns
+        -------
+        coords_norm : ndarray of float [n_x x dim]
+            Normalized coordinates
+        """
+        return (coords - self.offset[np.newaxis, :]) * self.scale[np.newaxis, :]
+
+    def predict_domains(self, x):
+        """
+        Predict the domains of normalized coordinates (forward pass of the MLPClassifier).
+
+        domains = FrozenMEGPC.predict_domains(x)
+
+        Parameters
+        ----------
+        x : ndarray of float [n_x x dim]
+            Normalized coordinates
+
+        Returns
+        -------
+        domains : ndarray of int [n_x]
+            Domain IDs of the coordinates
+        """
+        activation = {"relu": lambda z: np.maximum(z, 0),
+                      "tanh": np.tanh,
+                      "logistic": lambda z: 1. / (1. + np.exp(-z)),
+                      "identity": lambda z: z}[self.clf_activation]
+
+        z = x
+        for i_layer in range(len(self.clf_coefs)):
+            z = np.matmul(z, self.clf_coefs[i_layer]) + self.clf_intercepts[i_layer][np.newaxis, :]
+
+            if i_layer < len(self.clf_coefs) - 1:
+                z = activation(z)
+
+        # the output activation (logistic or softmax) is monotonic
+        if z.shape[1] == 1:
+            return self.clf_classes[(z[:, 0] > 0).astype(int)]
+        else:
+            return self.clf_classes[np.argmax(z, axis=1)]
+
+    def predict(self, coords, normalized=False):
+        """
+        Calculates the gPC approximation at the given coordinates.
+
+        pce = FrozenMEGPC.predict(coords, normalized=False)
+
+        Parameters
+        ----------
+        coords : ndarray of float [n_x x dim]
+            Coordinates where the gPC approximation is calculated
+        normalized : boolean, optional, default: False
+            Coordinates are given in the normalized parameter space instead of the original one
+
+        Returns
+        -------
+        pce : ndarray of float [n_x x n_out]
+            GPC approximation at coords
+        """
+        x = np.array(coords, dtype=float, ndmin=2)
+
+        if not normalized:
+            x = self.get_normalized_coordinates(x)
+
+        pce = np.zeros((x.shape[0], self.n_out))
+        domains = self.predict_domains(x)
+
+        for d in np.unique(domains):
+            pce[domains == d, :] = self.gpc[d].predict(x[domains == d, :], normalized=True)
+
+        return pce
+
+    def predict_gradient(self, coords, normalized=False):
+        """
+        Calculates the gradient of the gPC approximation at the given coordinates.
+
+        grad = FrozenMEGPC.predict_gradient(coords, normalized=False)
+
+        Parameters
+        ----------
+        coords : ndarray of float [n_x x dim]
+            Coordinates where the gradient of the gPC approximation is calculated
+        normalized : boolean, optional, default: False
+            Coordinates are given in the normalized parameter space instead of the original one. The gradient
+            is determined w.r.t. the normalized coordinates in this case.
+
+        Returns
+        -------
+        grad : ndarray of float [n_x x n_out x dim]
+            Gradient of the gPC approximation at coords
+        """
+        x = np.array(coords, dtype=float, ndmin=2)
+
+        if not normalized:
+            x = self.get_normalized_coordinates(x)
+
+        grad = np.zeros((x.shape[0], self.n_out, x.shape[1]))
+        domains = self.predict_domains(x)
+
+        for d in np.unique(domains):
+            grad[domains == d, :, :] = self.gpc[d].predict_gradient(x[domains == d, :], normalized=True)
+
+        if not normalized:
+            grad *= self.scale[np.newaxis, np.newaxis, :]
+
+        return grad
+
+    def to_dict(self):
+        """
+        Returns the arrays of the frozen multi-element gPC as dictionary.
+
+        data = FrozenMEGPC.to_dict()
+
+        Returns
+        -------
+        data : dict of ndarray
+            Arrays of the frozen multi-element gPC
+        """
+        data = {"type": np.array("FrozenMEGPC"),
+                "n_gpc": np.array(len(self.gpc)),
+                "n_layers": np.array(len(self.clf_coefs)),
+                "clf_classes": self.clf_classes,
+                "clf_activation": np.array(self.clf_activation),
+                "offset": self.offset,
+                "scale": self.scale}
+
+        for i_layer in range(len(self.clf_coefs)):
+            data["clf_coefs_{}".format(i_layer)] = self.clf_coefs[i_layer]
+            data["clf_intercepts_{}".format(i_layer)] = self.clf_intercepts[i_layer]
+
+        for i_gpc, gpc in enumerate(self.gpc):
+            data.update(gpc.to_dict(prefix="gpc_{}/".format(i_gpc)))
+
+        return data
+
+    @staticmethod
+    def from_dict(data):
+        """
+        Initializes a frozen multi-element gPC from a dictionary created by FrozenMEGPC.to_dict().
+
+        frozen_megpc = FrozenMEGPC.from_dict(data)
+
+        Parameters
+        ----------
+        data : dict of ndarray
+            Arrays of the frozen multi-element gPC
+
+        Returns
+        -------
+        frozen_megpc : FrozenMEGPC object instance
+            Frozen multi-element gPC
+        """
+        n_layers = int(data["n_layers"])
+
+        return FrozenMEGPC(gpc=[FrozenGPC.from_dict(data, prefix="gpc_{}/".format(i_gpc))
+                                for i_gpc in range(int(data["n_gpc"]))],
+                           clf_coefs=[data["clf_coefs_{}".format(i)] for i in range(n_layers)],
+                           clf_intercepts=[data["clf_intercepts_{}".format(i)] for i in range(n_layers)],
+                           clf_classes=data["clf_classes"],
+                           clf_activation=str(data["clf_activation"]),
+                           offset=data["offset"],
+                           scale=data["scale"])
+
+    def save(self, fname):
+        """
+        Saves the frozen multi-element gPC in an uncompressed .npz file (load with load_frozen_gpc(fname)).
+
+        FrozenMEGPC.save(fname)
+
+        Parameters
+        ----------
+        fname : str
+            Filename of the .npz file
+        """
+        np.savez(fname, **self.to_dict())
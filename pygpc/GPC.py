@@ -1,20 +1,35 @@
 import numpy as np
 import fastmat as fm
 import scipy.stats
+import scipy.linalg
 import copy
+import os
 import h5py
 import time
 import random
 import sys
 from sklearn import linear_model
+from concurrent.futures import ThreadPoolExecutor
 from scipy.signal import savgol_filter
 from .misc import get_cartesian_product
 from .misc import display_fancy_bar
 from .misc import nrmsd
 from .misc import mat2ten
 from .misc import ten2mat
+from .misc import get_cv_folds
+from .misc import somp
+from .misc import determine_output_projection
+from .GrowableArray import GrowableArray
+from .HDF5Array import HDF5Array
+from .HDF5Array import get_blocks
+from .IncrementalCholesky import IncrementalCholesky
+from .ReducedCoeffs import ReducedCoeffs
 from .pygpc_extensions import create_gpc_matrix_cpu
 from .pygpc_extensions import create_gpc_matrix_omp
+from .pygpc_extensions import create_gpc_matrix_grad_cpu
+from .pygpc_extensions import create_gpc_matrix_grad_omp
+from .pygpc_extensions import get_approximation_cpu
+from .pygpc_extensions import get_approximation_omp
 from .ValidationSet import *
 from .Computation import *
 from .Grid import *
@@ -61,6 +76,12 @@ class GPC(object):
         Derivative of generalized polynomial chaos matrix
     matrix_inv: [N_poly (+ N_gradient) x N_samples] ndarray of float
         Pseudo inverse of the generalized polynomial chaos matrix (with or without gradient)
+    fn_out_of_core: str or None
+        Filename of the .hdf5 file, which stores the gPC matrices out-of-core in the datasets "gpc_matrix" and
+        "gpc_matrix_gradient" (None: gPC matrices are stored in memory, see GPC.set_out_of_core)
+    lstsq_factorization: IncrementalCholesky object
+        Cholesky factorization of the normal equations of the gPC matrix (with or without gradient), which is updated
+        by the 'incremental-lstsq' solver when grid points or basis functions are added
     p_matrix: [dim_red x dim] ndarray of float
         Projection matrix to reduce number of efficient dimensions (\\eta = p_matrix * \\xi)
     p_matrix_norm: [dim_red] ndarray of float
@@ -72,6 +93,10 @@ class GPC(object):
         UUID4() IDs of grid points the gPC matrix derived with
     gpc_matrix_b_id: list of UUID4()
         UUID4() IDs of basis functions the gPC matrix derived with
+    gpc_matrix_gradient_coords_id: list of UUID4()
+        UUID4() IDs of grid points of the rows of the gPC gradient matrix (grid points in gradient_idx)
+    gpc_matrix_gradient_b_id: list of UUID4()
+        UUID4() IDs of basis functions the gPC gradient matrix derived with
     n_basis: int or list of int
         Number of basis functions (for iterative solvers, this is a list of its history)
     n_grid: int or list of int
@@ -81,6 +106,7 @@ class GPC(object):
         - 'Moore-Penrose' ... Pseudoinverse of gPC matrix (SGPC.Reg, EGPC)
         - 'OMP' ... Orthogonal Matching Pursuit, sparse recovery approach (SGPC.Reg, EGPC)
         - 'LarsLasso' ... {"alpha": float 0...1} Regularization parameter
+        - 'incremental-lstsq' ... Least squares solution with incrementally updated Cholesky factorization (SGPC.Reg)
         - 'NumInt' ... Numerical integration, spectral projection (SGPC.Quad)
     verbose: bool
         Boolean value to determine if to print out the progress into the standard output
@@ -88,8 +114,13 @@ class GPC(object):
         If provided, model evaluations are saved in fn_results.hdf5 file and gpc object in fn_results.pkl file
     relative_error_loocv: list of float
         Relative error of the leave-one-out-cross-validation
+    cv_fold_times: list of float
+        Computation times of the folds of the last cross validation (see GPC.cross_validate)
     relative_error_nrmsd: list of float
         Normalized root mean square deviation between model and gpc approximation
+    lambda_eps_output : float or None
+        Bound of the energy of the principal components of the output quantities, which are included in the
+        gPC (None: no compression of the output quantities, see GPC.solve)
     options : dict
         Options of gPC algorithm
     """
@@ -109,6 +140,7 @@ class GPC(object):
         self.gpc_matrix = None
         self.gpc_matrix_gradient = None
         self.matrix_inv = None
+        self.lstsq_factorization = None
         self.p_matrix = None
         self.p_matrix_norm = None
         self.nan_elm = []
@@ -116,6 +148,9 @@ class GPC(object):
         self.gpc_matrix_b_id = None
         self.gpc_matrix_gradient_coords_id = None
         self.gpc_matrix_gradient_b_id = None
+        self._gpc_matrix_buffer = GrowableArray()
+        self._gpc_matrix_gradient_buffer = GrowableArray()
+        self.fn_out_of_core = None
         self.n_basis = []
         self.n_grid = []
         self.relative_error_nrmsd = []
@@ -123,6 +158,7 @@ class GPC(object):
         self.error = []
         self.n_out = []
         self.gradient_idx = None
+        self.cv_fold_times = []
 
         # options
         if options is not None:
@@ -138,16 +174,46 @@ class GPC(object):
             if "backend" not in options.keys():
                 options["backend"] = "python"
 
+            if "memory_limit" not in options.keys():
+                options["memory_limit"] = 1.
+
+            if "dtype" not in options.keys():
+                options["dtype"] = "float64"
+
+            if "cv_mode" not in options.keys():
+                options["cv_mode"] = "loo"
+
+            if "cv_n_folds" not in options.keys():
+                options["cv_n_folds"] = 25
+
+            if "cv_test_ratio" not in options.keys():
+                options["cv_test_ratio"] = 0.1
+
+            if "cv_n_threads" not in options.keys():
+                options["cv_n_threads"] = None
+
+            if "cv_seed" not in options.keys():
+                options["cv_seed"] = None
+
+            if "lambda_eps_output" not in options.keys():
+                options["lambda_eps_output"] = None
+
             self.gradient = options["gradient_enhanced"]
             self.fn_results = options["fn_results"]
             self.matlab_model = options["matlab_model"]
             self.backend = options["backend"]
+            self.memory_limit = options["memory_limit"]
+            self.dtype = options["dtype"]
+            self.lambda_eps_output = options["lambda_eps_output"]
 
         else:
             self.gradient = None
             self.fn_results = None
             self.matlab_model = None
             self.backend = "python"
+            self.memory_limit = 1.
+            self.dtype = "float64"
+            self.lambda_eps_output = None
 
         self.solver = None
         self.settings = None
@@ -155,6 +221,63 @@ class GPC(object):
 
         self.options = options
 
+    def __getstate__(self):
+        """
+        Returns the state of the GPC without the preallocated storage of the gPC matrices. Out-of-core gPC matrices
+        are stored as references to their datasets.
+        """
+        state = self.__dict__.copy()
+
+        for key in ["_gpc_matrix_buffer", "_gpc_matrix_gradient_buffer", "lstsq_factorization"]:
+            state.pop(key, None)
+
+        return state
+
+    def __setstate__(self, state):
+        """
+        Restores the GPC from its state (see __getstate__).
+        """
+        self.__dict__.update(state)
+        self._gpc_matrix_buffer = GrowableArray()
+        self._gpc_matrix_gradient_buffer = GrowableArray()
+        self.lstsq_factorization = None
+
+        if self.__dict__.get("fn_out_of_core", None) is not None:
+            if isinstance(self.gpc_matrix, HDF5Array):
+                self._gpc_matrix_buffer = self.gpc_matrix
+
+            if isinstance(self.gpc_matrix_gradient, HDF5Array):
+                self._gpc_matrix_gradient_buffer = self.gpc_matrix_gradient
+
+    def set_out_of_core(self, fn):
+        """
+        Stores the gPC matrix and the gPC gradient matrix out-of-core in the datasets "gpc_matrix" and
+        "gpc_matrix_gradient" of an .hdf5 file (see HDF5Array). Rows and columns, which are added by
+        GPC.update_gpc_matrix, are appended to the datasets without rewriting them. The least squares solvers
+        and the leave-one-out cross validation process the out-of-core gPC matrix and results in row blocks
+        fitting into self.memory_limit.
+
+        GPC.set_out_of_core(fn)
+
+        Parameters
+        ----------
+        fn : str
+            Filename of the .hdf5 file
+        """
+        self.fn_out_of_core = fn
+        self._gpc_matrix_buffer = HDF5Array(fn=fn, name="gpc_matrix")
+
+        if self.gpc_matrix is not None:
+            self._gpc_matrix_buffer.adopt(self.gpc_matrix)
+            self.gpc_matrix = self._gpc_matrix_buffer.data
+
+        if self.gradient:
+            self._gpc_matrix_gradient_buffer = HDF5Array(fn=fn, name="gpc_matrix_gradient")
+
+        if self.gradient and self.gpc_matrix_gradient is not None:
+            self._gpc_matrix_gradient_buffer.adopt(self.gpc_matrix_gradient)
+            self.gpc_matrix_gradient = self._gpc_matrix_gradient_buffer.data
+
     def init_gpc_matrix(self, gradient_idx=None):
         """
         Sets self.gpc_matrix and self.gpc_matrix_gradient with given self.basis and self.grid
@@ -168,7 +291,10 @@ class GPC(object):
         if self.gradient_idx is None or gradient_idx is not None:
             self.gradient_idx = gradient_idx
 
-        self.gpc_matrix = self.create_gpc_matrix(b=self.basis.b,
+        # the factorization of the incremental least squares solver is not valid for the new matrix
+        self.lstsq_factorization = None
+
+        self.gpc_matrix = self.create_gpc_matrix(b=self.basis.multi_indices,
                                                  x=self.grid.coords_norm,
                                                  gradient=False)
         self.n_grid.append(self.gpc_matrix.shape[0])
@@ -177,21 +303,89 @@ class GPC(object):
         self.gpc_matrix_b_id = copy.deepcopy(self.basis.b_id)
 
         if self.gradient and self.gradient_idx is not None:
-            self.gpc_matrix_gradient = self.create_gpc_matrix(b=self.basis.b,
+            self.gpc_matrix_gradient = self.create_gpc_matrix(b=self.basis.multi_indices,
                                                               x=self.grid.coords_norm,
                                                               gradient=True)
             self.gpc_matrix_gradient = ten2mat(self.gpc_matrix_gradient)
-            self.gpc_matrix_gradient_coords_id = copy.deepcopy(self.grid.coords_id)
+            self.gpc_matrix_gradient_coords_id = [self.grid.coords_id[i] for i in self.gradient_idx]
             self.gpc_matrix_gradient_b_id = copy.deepcopy(self.basis.b_id)
 
-    def create_gpc_matrix(self, b, x, gradient=False, gradient_idx=None, verbose=False):
+        if self.fn_out_of_core is not None:
+            self.set_out_of_core(self.fn_out_of_core)
+
+    def get_multi_indices(self, b):
+        """
+        Determines the multi-indices of the global basis functions and the univariate basis functions of order 0 of
+        each parameter (providing the three-term recurrence of the polynomial families).
+
+        multi_indices, b_0 = GPC.get_multi_indices(b)
+
+        Parameters
+        ----------
+        b : list of BasisFunction object instances [n_basis][n_dim] or ndarray of int [n_basis x n_dim]
+            Parameter wise basis function objects or multi-indices of the global basis functions
+
+        Returns
+        -------
+        multi_indices : ndarray of int [n_basis x n_dim]
+            Multi-indices of the global basis functions
+        b_0 : list of BasisFunction object instances [n_dim]
+            Univariate basis functions of order 0
+        """
+        if isinstance(b, np.ndarray):
+            return np.asarray(b, dtype=int), [self.basis.get_univariate_basis_function(i_dim, 0)
+                                              for i_dim in range(self.problem.dim)]
+
+        multi_indices = np.array([[_b.p["i"] for _b in b_row] for b_row in b], dtype=int)
+
+        return multi_indices, b[0] if len(b) > 0 else None
+
+    def get_b_array(self, b, gradient=False):
+        """
+        Determines the polynomial basis coefficients of the given global basis functions for the C++ and CUDA
+        backends. The coefficients of the complete basis are returned without copying.
+
+        b_array = GPC.get_b_array(b, gradient=False)
+
+        Parameters
+        ----------
+        b : list of BasisFunction object instances [n_basis][n_dim] or ndarray of int [n_basis x n_dim]
+            Parameter wise basis function objects or multi-indices of the global basis functions
+        gradient : bool, optional, default: False
+            Return coefficients of the derivatives (Basis.b_array_grad)
+
+        Returns
+        -------
+        b_array : ndarray of float
+            Polynomial basis coefficients of the global basis functions
+        """
+        b_array_full = self.basis.b_array_grad if gradient else self.basis.b_array
+
+        if b is self.basis.multi_indices:
+            return b_array_full
+
+        multi_indices, _ = self.get_multi_indices(b)
+
+        if multi_indices.shape == self.basis.multi_indices.shape and \
+                np.array_equal(multi_indices, self.basis.multi_indices):
+            return b_array_full
+
+        idx = self.basis.multi_index_set.get_index(multi_indices)
+
+        if np.any(idx < 0):
+            raise ValueError("Basis functions are not contained in the basis of the gPC.")
+
+        return self.basis.get_b_array(idx, gradient=gradient)
+
+    def create_gpc_matrix(self, b, x, gradient=False, gradient_idx=None, verbose=False, dtype="float64"):
         """
         Construct the gPC matrix or its derivative.
 
         Parameters
         ----------
-        b : list of BasisFunction object instances [n_basis][n_dim]
-            Parameter wise basis function objects used in gPC (Basis.b)
+        b : list of BasisFunction object instances [n_basis][n_dim] or ndarray of int [n_basis x n_dim]
+            Parameter wise basis function objects used in gPC (Basis.b) or multi-indices of the global basis
+            functions (Basis.multi_indices).
             Multiplying all elements in a row at location xi = (x1, x2, ..., x_dim) yields the global basis function.
         x : ndarray of float [n_x x n_dim]
             Coordinates of x = (x1, x2, ..., x_dim) where the rows of the gPC matrix are evaluated (normalized [-1, 1])
@@ -201,6 +395,8 @@ class GPC(object):
             Indices of grid points where the gradient in gradient_results is provided
         verbose : bool, optional, default: False
             boolean value to determine if to print out the progress into the standard output
+        dtype : str, optional, default: "float64"
+            Floating point precision of the gPC matrix ("float64" or "float32")
 
         Returns
         -------
@@ -217,45 +413,92 @@ class GPC(object):
         # Python backend
         if self.backend == "python":
             if not gradient:
-                gpc_matrix = np.ones([x.shape[0], len(b)])
-                for i_basis in range(len(b)):
+                gpc_matrix = np.ones([x.shape[0], len(b)], dtype=dtype)
+                try:
+                    # evaluate the univariate polynomials of every parameter only once up to the maximum order
+                    # (three-term recurrence) and gather the columns of the global basis functions from it
+                    multi_indices, b_0 = self.get_multi_indices(b)
+
                     for i_dim in range(self.problem.dim):
-                        gpc_matrix[:, i_basis] *= b[i_basis][i_dim](x[:, i_dim])
-            else:
-                gpc_matrix = np.ones([len(self.gradient_idx), len(b), self.problem.dim])
-                for i_dim_gradient in range(self.problem.dim):
+                        if len(b) > 0:
+                            table = b_0[i_dim].get_value_table(x=x[:, i_dim],
+                                                               order_max=np.max(multi_indices[:, i_dim]))
+                            gpc_matrix *= table.astype(dtype, copy=False)[:, multi_indices[:, i_dim]]
+
+                except (NotImplementedError, KeyError):
+                    # basis functions without three-term recurrence (non-orthogonal) are evaluated one by one
+                    b = self.basis.get_b(b) if isinstance(b, np.ndarray) else b
+                    gpc_matrix = np.ones([x.shape[0], len(b)], dtype=dtype)
                     for i_basis in range(len(b)):
                         for i_dim in range(self.problem.dim):
-                            if i_dim == i_dim_gradient:
-                                derivative = True
-                            else:
-                                derivative = False
-                            gpc_matrix[:, i_basis, i_dim_gradient] *= b[i_basis][i_dim](x[self.gradient_idx, i_dim],
-                                                                                        derivative=derivative)
+                            gpc_matrix[:, i_basis] *= b[i_basis][i_dim](x[:, i_dim])
+            else:
+                gpc_matrix = np.ones([len(self.gradient_idx), len(b), self.problem.dim], dtype=dtype)
+                try:
+                    # one table of polynomial values and derivatives per parameter, the partial derivatives
+                    # are assembled from prefix and suffix products of the values
+                    multi_indices, b_0 = self.get_multi_indices(b)
+                    x_gradient = x[self.gradient_idx, :]
+                    tables = []
+                    tables_der = []
+
+                    for i_dim in range(self.problem.dim):
+                        if len(b) > 0:
+                            order_max = np.max(multi_indices[:, i_dim])
+                            tables.append(b_0[i_dim].get_value_table(x=x_gradient[:, i_dim],
+                                                                     order_max=order_max).astype(dtype, copy=False))
+                            tables_der.append(b_0[i_dim].get_value_table(x=x_gradient[:, i_dim],
+                                                                         order_max=order_max,
+                                                                         derivative=True).astype(dtype, copy=False))
+
+                    if len(b) > 0:
+                        # suffix products (parameters > i_dim)
+                        for i_dim in range(self.problem.dim - 2, -1, -1):
+                            gpc_matrix[:, :, i_dim] = gpc_matrix[:, :, i_dim + 1] * \
+                                                      tables[i_dim + 1][:, multi_indices[:, i_dim + 1]]
+
+                        # multiply with derivative and prefix products (parameters < i_dim)
+                        prefix = np.ones([len(self.gradient_idx), len(b)], dtype=dtype)
+                        for i_dim in range(self.problem.dim):
+                            gpc_matrix[:, :, i_dim] *= prefix * tables_der[i_dim][:, multi_indices[:, i_dim]]
+                            prefix *= tables[i_dim][:, multi_indices[:, i_dim]]
+
+                except (NotImplementedError, KeyError):
+                    b = self.basis.get_b(b) if isinstance(b, np.ndarray) else b
+                    gpc_matrix = np.ones([len(self.gradient_idx), len(b), self.problem.dim], dtype=dtype)
+                    for i_dim_gradient in range(self.problem.dim):
+                        for i_basis in range(len(b)):
+                            for i_dim in range(self.problem.dim):
+                                if i_dim == i_dim_gradient:
+                                    derivative = True
+                                else:
+                                    derivative = False
+                                gpc_matrix[:, i_basis, i_dim_gradient] *= \
+                                    b[i_basis][i_dim](x[self.gradient_idx, i_dim], derivative=derivative)
 
         # CPU backend (CPU single core)
         elif self.backend == "cpu":
             if not gradient:
                 # the third dimension is important and should not be removed
                 # otherwise the code could produce undefined behaviour
-                gpc_matrix = np.empty([x.shape[0], len(b), 1])
-                create_gpc_matrix_cpu(x, self.basis.b_array, gpc_matrix)
+                gpc_matrix = np.empty([x.shape[0], len(b), 1], dtype=dtype)
+                create_gpc_matrix_cpu(x, self.get_b_array(b), gpc_matrix)
                 gpc_matrix = np.squeeze(gpc_matrix)
             else:
-                gpc_matrix = np.empty([len(self.gradient_idx), len(b), self.problem.dim])
-                create_gpc_matrix_cpu(x[self.gradient_idx, :], self.basis.b_array_grad, gpc_matrix)
+                gpc_matrix = np.empty([len(self.gradient_idx), len(b), self.problem.dim], dtype=dtype)
+                create_gpc_matrix_grad_cpu(x[self.gradient_idx, :], self.get_b_array(b), gpc_matrix)
 
         # OpenMP backend (CPU multi core)
         elif self.backend == "omp":
             if not gradient:
                 # the third dimension is important and should not be removed
                 # otherwise the code could produce undefined behaviour
-                gpc_matrix = np.empty([x.shape[0], len(b), 1])
-                create_gpc_matrix_omp(x, self.basis.b_array, gpc_matrix)
+                gpc_matrix = np.empty([x.shape[0], len(b), 1], dtype=dtype)
+                create_gpc_matrix_omp(x, self.get_b_array(b), gpc_matrix)
                 gpc_matrix = np.squeeze(gpc_matrix)
             else:
-                gpc_matrix = np.empty([len(self.gradient_idx), len(b), self.problem.dim])
-                create_gpc_matrix_omp(x[self.gradient_idx, :], self.basis.b_array_grad, gpc_matrix)
+                gpc_matrix = np.empty([len(self.gradient_idx), len(b), self.problem.dim], dtype=dtype)
+                create_gpc_matrix_grad_omp(x[self.gradient_idx, :], self.get_b_array(b), gpc_matrix)
 
         # CUDA backend (GPU multi core)
         elif self.backend == "cuda":
@@ -268,11 +511,15 @@ class GPC(object):
                     # the third dimension is important and should not be removed
                     # otherwise the code could produce undefined behaviour
                     gpc_matrix = np.empty([x.shape[0], len(b), 1])
-                    create_gpc_matrix_cuda(x, self.basis.b_array, gpc_matrix)
+                    create_gpc_matrix_cuda(x, self.get_b_array(b), gpc_matrix)
                     gpc_matrix = np.squeeze(gpc_matrix)
                 else:
                     gpc_matrix = np.empty([len(self.gradient_idx), len(b), self.problem.dim])
-                    create_gpc_matrix_cuda(x[self.gradient_idx, :], self.basis.b_array_grad, gpc_matrix)
+                    create_gpc_matrix_cuda(x[self.gradient_idx, :], self.get_b_array(b, gradient=True),
+                                           gpc_matrix)
+
+                # the CUDA extension computes in double precision only
+                gpc_matrix = gpc_matrix.astype(dtype, copy=False)
 
         else:
             raise NotImplementedError
@@ -282,19 +529,24 @@ class GPC(object):
     def get_loocv(self, coeffs, results, gradient_results=None, error_norm="relative"):
         """
         Perform leave-one-out cross validation of gPC approximation and add error value to self.relative_error_loocv.
-        The loocv error is calculated analytically after eq. (35) in [1] but omitting the "1 - " term, i.e. it
-        corresponds to 1 - Q^2.
+        For least squares solvers ('Moore-Penrose', 'incremental-lstsq'), the leave-one-out errors of all grid points
+        are determined exactly from a single QR decomposition of the gPC matrix without re-solving the system
+        (see get_loocv_lstsq).
 
         relative_error_loocv = GPC.loocv(sim_results, coeffs)
 
         .. math::
-           \\epsilon_{LOOCV} = \\frac{\\frac{1}{N}\sum_{i=1}^N \\left( \\frac{y(\\xi_i) - \hat{y}(\\xi_i)}{1-h_i}
-           \\right)^2}{\\frac{1}{N-1}\sum_{i=1}^N \\left( y(\\xi_i) - \\bar{y} \\right)^2}
+           \\epsilon_{LOOCV} = \\frac{1}{N}\\sum_{i=1}^N \\frac{\\| y(\\xi_i) - \\hat{y}(\\xi_i) \\|}
+           {|1-h_i| \\| y(\\xi_i) \\|}
 
         with
 
         .. math::
-           \\mathbf{h} = \mathrm{diag}(\\mathbf{\\Psi} (\\mathbf{\\Psi}^T \\mathbf{\\Psi})^{-1} \\mathbf{\\Psi}^T)
+           \\mathbf{h} = \\mathrm{diag}(\\mathbf{\\Psi} (\\mathbf{\\Psi}^T \\mathbf{\\Psi})^{-1} \\mathbf{\\Psi}^T)
+
+        For sparse solvers ('OMP', 'LarsLasso') and underdetermined systems, the gPC approximation is cross validated
+        according to the options "cv_mode", "cv_n_folds", ... (see GPC.cross_validate). By default, the gPC
+        coefficients are re-computed leaving out one of 25 randomly selected grid points at a time.
 
         Parameters
         ----------
@@ -317,82 +569,210 @@ class GPC(object):
         .. [1] Blatman, G., & Sudret, B. (2010). An adaptive algorithm to build up sparse polynomial chaos expansions
            for stochastic finite element analysis. Probabilistic Engineering Mechanics, 25(2), 183-197.
         """
-        # if self.options["gradient_enhanced"]:
-        #     matrix = np.vstack((self.gpc_matrix, self.gpc_matrix_gradient))
-        #
-        #     # transform gradient of results in case of projection
-        #     if self.p_matrix is not None:
-        #         gradient_results = np.matmul(gradient_results,
-        #                                   self.p_matrix.transpose() * self.p_matrix_norm[np.newaxis, :])
-        #
-        #     results_complete = np.vstack((results, ten2mat(gradient_results)))
-        # else:
-        #     matrix = self.gpc_matrix
-        #     results_complete = results
-
-        # matrix = self.gpc_matrix
-        # results_complete = results
-
-        # Analytical error estimation in case of overdetermined systems
-        # if matrix.shape[0] > 2*matrix.shape[1]:
-            # determine Psi (Psi^T Psi)^-1 Psi^T
-            # h = np.matmul(np.matmul(matrix, np.linalg.inv(np.matmul(matrix.transpose(), matrix))), matrix.transpose())
-            #
-            # # determine loocv error
-            # err = np.mean(((results_complete - np.matmul(matrix, coeffs)) /
-            #                (1 - np.diag(h))[:, np.newaxis]) ** 2, axis=0)
-            #
-            # if error_norm == "relative":
-            #     norm = np.var(results_complete, axis=0, ddof=1)
-            # else:
-            #     norm = 1.
-            #
-            # # normalize
-            # relative_error_loocv = np.mean(err / norm)
-
-        # else:
-        # perform manual loocv without gradient
         matrix = self.gpc_matrix
         results_complete = results
 
-        n_loocv = 25
+        # exact leave-one-out errors of all grid points in case of least squares solutions
+        if self.options["solver"] in ["Moore-Penrose", "incremental-lstsq"]:
+            start = time.time()
+            settings = self.options["settings"] if self.options["settings"] is not None else dict()
+            regularization = settings["lambda"] if "lambda" in settings.keys() else 0.
+
+            if isinstance(matrix, HDF5Array) or isinstance(results_complete, HDF5Array):
+                relative_error = self.get_loocv_lstsq_out_of_core(matrix=matrix,
+                                                                  results=results_complete,
+                                                                  error_norm=error_norm,
+                                                                  regularization=regularization)
+            else:
+                relative_error = self.get_loocv_lstsq(matrix=matrix,
+                                                      results=results_complete,
+                                                      error_norm=error_norm,
+                                                      regularization=regularization)
 
-        # define number of performed cross validations (max 100)
-        n_loocv_points = np.min((results_complete.shape[0], n_loocv))
+            if relative_error is not None:
+                relative_error_loocv = np.mean(relative_error)
+                iprint("LOOCV computation time: {} sec".format(time.time() - start), tab=0, verbose=True)
 
-        # make list of indices, which are randomly sampled
-        loocv_point_idx = random.sample(list(range(results_complete.shape[0])), n_loocv_points)
+                return relative_error_loocv
 
+        # cross validation without gradient (sparse solvers, requires the gPC matrix and results in memory)
         start = time.time()
-        relative_error = np.zeros(n_loocv_points)
-        for i in range(n_loocv_points):
-            # get mask of eliminated row
-            mask = np.arange(results_complete.shape[0]) != loocv_point_idx[i]
+        relative_error = self.cross_validate(matrix=np.asarray(matrix),
+                                             results=np.asarray(results_complete),
+                                             error_norm=error_norm)
+
+        # store result in relative_error_loocv
+        relative_error_loocv = np.mean(relative_error)
+        iprint("LOOCV computation time: {} sec".format(time.time() - start), tab=0, verbose=True)
+
+        return relative_error_loocv
+
+    def cross_validate(self, matrix, results, error_norm="relative", solver=None, settings=None, mode=None,
+                       n_folds=None, test_ratio=None, n_threads=None, seed=None):
+        """
+        Cross validation of the gPC approximation. The gPC coefficients are determined for every fold without its
+        test samples and the errors are evaluated at the test samples. The folds are processed in a thread pool
+        (the solvers release the GIL in LAPACK/fastmat) sharing the gPC matrix and the results read-only.
+        The computation times of the folds are stored in self.cv_fold_times.
+
+        relative_error = GPC.cross_validate(matrix, results, error_norm="relative")
+
+        Parameters
+        ----------
+        matrix : ndarray of float [n_grid x n_basis]
+            gPC matrix
+        results : ndarray of float [n_grid x n_out]
+            Results from n_grid simulations with n_out output quantities
+        error_norm : str, optional, default="relative"
+            Decide if error is determined "relative" or "absolute"
+        solver : str, optional, default: self.options["solver"]
+            Solver to determine the gPC coefficients (see GPC.solve)
+        settings : dict, optional, default: self.options["settings"]
+            Solver settings (see GPC.solve)
+        mode : str, optional, default: self.options["cv_mode"]
+            Cross validation mode ("loo", "kfold" or "subsample", see misc.get_cv_folds)
+        n_folds : int, optional, default: self.options["cv_n_folds"]
+            Number of folds
+        test_ratio : float, optional, default: self.options["cv_test_ratio"]
+            Ratio of test samples of every fold in case of "subsample"
+        n_threads : int, optional, default: self.options["cv_n_threads"]
+            Number of threads (None: number of CPUs, limited to the number of folds)
+        seed : int, optional, default: self.options["cv_seed"]
+            Seed of the random number generator determining the folds
+
+        Returns
+        -------
+        relative_error : ndarray of float [n_test]
+            Errors of the test samples of all folds
+        """
+        cv_options = {"solver": solver, "settings": settings, "cv_mode": mode, "cv_n_folds": n_folds,
+                      "cv_test_ratio": test_ratio, "cv_n_threads": n_threads, "cv_seed": seed}
+        cv_options_default = {"cv_mode": "loo", "cv_n_folds": 25, "cv_test_ratio": 0.1}
+
+        options = self.options if self.options is not None else dict()
+
+        for key in cv_options.keys():
+            if cv_options[key] is None:
+                if key in options.keys():
+                    cv_options[key] = options[key]
+                elif key in cv_options_default.keys():
+                    cv_options[key] = cv_options_default[key]
+
+        folds = get_cv_folds(n_samples=results.shape[0],
+                             mode=cv_options["cv_mode"],
+                             n_folds=cv_options["cv_n_folds"],
+                             test_ratio=cv_options["cv_test_ratio"],
+                             seed=cv_options["cv_seed"])
+
+        n_threads = cv_options["cv_n_threads"]
+
+        if n_threads is None:
+            n_threads = os.cpu_count()
+
+        n_threads = max(min(n_threads, len(folds)), 1)
+
+        # shared between the threads without copying (read-only)
+        matrix = matrix.view()
+        matrix.flags.writeable = False
+        results = np.reshape(results, (results.shape[0], -1)).view()
+        results.flags.writeable = False
+
+        def validate_fold(idx_test):
+            start = time.time()
+
+            mask = np.ones(results.shape[0], dtype=bool)
+            mask[idx_test] = False
 
             # determine gpc coefficients (this takes a lot of time for large problems)
-            coeffs_loo = self.solve(results=results_complete[mask, :],
-                                    solver=self.options["solver"],
-                                    matrix=matrix[mask, :],
-                                    settings=self.options["settings"],
-                                    verbose=False)
+            coeffs = self.solve(results=results[mask, :],
+                                solver=cv_options["solver"],
+                                matrix=matrix[mask, :],
+                                settings=cv_options["settings"],
+                                verbose=False)
 
-            sim_results_temp = results_complete[loocv_point_idx[i], :]
+            error = np.linalg.norm(results[idx_test, :] - np.matmul(matrix[idx_test, :], coeffs), axis=1)
 
             if error_norm == "relative":
-                norm = scipy.linalg.norm(sim_results_temp)
-            else:
-                norm = 1.
+                error /= np.linalg.norm(results[idx_test, :], axis=1)
 
-            relative_error[i] = scipy.linalg.norm(sim_results_temp - np.matmul(matrix[loocv_point_idx[i], :],
-                                                                            coeffs_loo))\
-                                / norm
-            display_fancy_bar("LOOCV", int(i + 1), int(n_loocv_points))
+            return error, time.time() - start
 
-        # store result in relative_error_loocv
-        relative_error_loocv = np.mean(relative_error)
-        iprint("LOOCV computation time: {} sec".format(time.time() - start), tab=0, verbose=True)
+        start = time.time()
 
-        return relative_error_loocv
+        if n_threads > 1:
+            with ThreadPoolExecutor(max_workers=n_threads) as executor:
+                fold_results = list(executor.map(validate_fold, folds))
+        else:
+            fold_results = [validate_fold(idx_test) for idx_test in folds]
+
+        self.cv_fold_times = [fold_time for _, fold_time in fold_results]
+
+        iprint("Cross validation ({}, {} folds, {} threads): {:.3f} sec (fold time: mean {:.3f} sec, max {:.3f} sec)"
+               .format(cv_options["cv_mode"], len(folds), n_threads, time.time() - start,
+                       np.mean(self.cv_fold_times), np.max(self.cv_fold_times)),
+               tab=0, verbose=self.verbose)
+
+        return np.hstack([error for error, _ in fold_results])
+
+    @staticmethod
+    def get_loocv_lstsq(matrix, results, error_norm="relative", regularization=0.):
+        """
+        Determines the leave-one-out errors of the (regularized) least squares solution of matrix @ coeffs = results
+        at all grid points at once. The leave-one-out residual of grid point i follows from the residual of the
+        solution using all grid points and the diagonal element h_i of the hat matrix:
+
+        y_i - \\hat{y}_{-i}(\\xi_i) = (y_i - \\hat{y}(\\xi_i)) / (1 - h_i)
+
+        The diagonal of the hat matrix is given by the squared row norms of Q of the (economic) QR decomposition
+        h_i = ||Q_i||^2. In case of Tikhonov regularization, the QR decomposition of [matrix; sqrt(lambda) * I] is used.
+
+        relative_error = GPC.get_loocv_lstsq(matrix, results, error_norm="relative", regularization=0.)
+
+        Parameters
+        ----------
+        matrix : ndarray of float [n_grid x n_basis]
+            gPC matrix
+        results : ndarray of float [n_grid x n_out]
+            Results from n_grid simulations with n_out output quantities
+        error_norm : str, optional, default="relative"
+            Decide if error is determined "relative" or "absolute"
+        regularization : float, optional, default: 0.
+            Tikhonov regularization parameter lambda
+
+        Returns
+        -------
+        relative_error : ndarray of float [n_grid] or None
+            Leave-one-out errors of the grid points (None if the system is underdetermined or rank deficient)
+        """
+        n_grid, n_basis = matrix.shape
+        results = np.reshape(results, (n_grid, -1))
+
+        if regularization > 0:
+            matrix = np.vstack((matrix, np.sqrt(regularization) * np.eye(n_basis, dtype=matrix.dtype)))
+        elif n_grid <= n_basis:
+            return None
+
+        q, r = scipy.linalg.qr(matrix, mode="economic")
+
+        # rank deficient matrix (leave-one-out solutions are not unique)
+        diag_r = np.abs(np.diag(r))
+        if diag_r.size == 0 or np.min(diag_r) <= 1e-12 * np.max(diag_r):
+            return None
+
+        q = q[:n_grid, :]
+        h = np.sum(q ** 2, axis=1)
+
+        # grid points, which determine coefficients alone (h_i = 1), can not be left out
+        if np.max(h) > 1 - 1e-10:
+            return None
+
+        residual = results - np.matmul(q, np.matmul(q.transpose(), results))
+        relative_error = np.linalg.norm(residual, axis=1) / (1 - h)
+
+        if error_norm == "relative":
+            relative_error /= np.linalg.norm(results, axis=1)
+
+        return relative_error
 
     def validate(self, coeffs, results=None, gradient_results=None, qoi_idx=None):
         """
@@ -419,18 +799,23 @@ class GPC(object):
         if qoi_idx is None:
             qoi_idx = np.arange(0, results.shape[1])
 
-        # Determine QOIs with NaN in results and exclude them from validation
-        non_nan_mask = np.where(np.all(~np.isnan(results), axis=0))[0]
+        # Determine QOIs with NaN in results and exclude them from validation (in row blocks)
+        mask_nan = np.zeros(results.shape[1], dtype=bool)
+
+        for _, results_block in get_blocks(results, self.get_n_block(n_cols=results.shape[1])):
+            mask_nan |= np.any(np.isnan(results_block), axis=0)
+
+        non_nan_mask = np.flatnonzero(~mask_nan)
         n_nan = results.shape[1] - non_nan_mask.size
 
         if n_nan > 0:
             iprint("In {}/{} output quantities NaN's were found.".format(n_nan, results.shape[1]),
                    tab=0, verbose=self.options["verbose"])
 
-        results = results[:, non_nan_mask]
+            results = results[:, non_nan_mask]
 
-        if gradient_results is not None:
-            gradient_results = gradient_results[:, non_nan_mask, :]
+            if gradient_results is not None:
+                gradient_results = gradient_results[:, non_nan_mask, :]
 
         # always determine nrmsd if a validation set is present
         if isinstance(self.validation, ValidationSet):
@@ -564,6 +949,8 @@ class GPC(object):
     def get_approximation(self, coeffs, x, output_idx=None):
         """
         Calculates the gPC approximation in points with output_idx and normalized parameters xi (interval: [-1, 1]).
+        The gPC matrix is evaluated in row blocks, whose size is determined by self.memory_limit, such that
+        the memory consumption does not scale with the number of coordinates.
 
         pce = GPC.get_approximation(coeffs, x, output_idx=None)
 
@@ -583,6 +970,50 @@ class GPC(object):
             GPC approximation at normalized coordinates x.
         """
 
+        if len(x.shape) == 1:
+            x = x[:, np.newaxis]
+
+        pce = None
+
+        for idx, pce_block in self.get_approximation_blocks(coeffs=coeffs, x=x, output_idx=output_idx):
+            if pce is None:
+                pce = np.empty([x.shape[0], pce_block.shape[1]], dtype=pce_block.dtype)
+
+            pce[idx, :] = pce_block
+
+        return pce
+
+    def get_approximation_blocks(self, coeffs, x, output_idx=None, n_block=None):
+        """
+        Generator, which calculates the gPC approximation block-wise in subsequent rows of x. The gPC matrix is
+        only evaluated for one block of coordinates at a time. The approximation is evaluated with the floating point
+        precision given in self.dtype ("float64" or "float32"), while the gPC coefficients and the sum over the basis
+        functions are kept in float64.
+        In float32 precision, the relative deviation from the float64 approximation is in the order of 1e-5
+        (checked in test_014_backends).
+
+        for idx, pce_block in GPC.get_approximation_blocks(coeffs, x, output_idx=None, n_block=None):
+
+        Parameters
+        ----------
+        coeffs: ndarray of float [n_basis x n_out]
+            GPC coefficients for each output variable
+        x: ndarray of float [n_x x n_dim]
+            Coordinates of x = (x1, x2, ..., x_dim) where the rows of the gPC matrix are evaluated (normalized [-1, 1]).
+            The coordinates will be transformed in case of projected gPC.
+        output_idx: ndarray of int, optional, default=None [n_out]
+            Indices of output quantities to consider (Default: all).
+        n_block: int, optional, default=None
+            Number of coordinates per block (Default: determined from self.memory_limit)
+
+        Yields
+        ------
+        idx: slice
+            Rows of x the block belongs to
+        pce_block: ndarray of float [n_block x n_out]
+            GPC approximation at normalized coordinates x[idx, :].
+        """
+
         if len(x.shape) == 1:
             x = x[:, np.newaxis]
 
@@ -593,6 +1024,17 @@ class GPC(object):
             x[x[:, i_dim] < xmin, i_dim] = xmin
             x[x[:, i_dim] > xmax, i_dim] = xmax
 
+        # evaluate the gPC of the principal components and map the approximation to the output quantities
+        if isinstance(coeffs, ReducedCoeffs):
+            if n_block is None:
+                n_out = coeffs.shape[1] if output_idx is None else np.asarray(output_idx).size
+                n_block = self.get_n_block(n_cols=max(coeffs.shape[0], n_out), dtype=self.dtype)
+
+            for idx, pce_block in self.get_approximation_blocks(coeffs=coeffs.coeffs, x=x, n_block=n_block):
+                yield idx, coeffs.expand_results(results=pce_block, output_idx=output_idx).astype(self.dtype,
+                                                                                                   copy=False)
+            return
+
         if output_idx is not None:
             # convert to 1d array
             output_idx = np.asarray(output_idx).flatten().astype(int)
@@ -607,25 +1049,114 @@ class GPC(object):
         if self.p_matrix is not None:
             x = np.matmul(x, self.p_matrix.transpose() / self.p_matrix_norm[np.newaxis, :])
 
-        if self.backend == 'python' or self.backend == 'cpu' or self.backend == 'omp':
-            # determine gPC matrix at coordinates x
-            gpc_matrix = self.create_gpc_matrix(self.basis.b, x, gradient=False)
-
-            # multiply with gPC coeffs
-            pce = np.matmul(gpc_matrix, coeffs)
+        if self.backend not in ["python", "cpu", "omp", "cuda"]:
+            raise NotImplementedError
 
-        elif self.backend == "cuda":
+        if self.backend == "cuda":
             try:
                 from .pygpc_extensions_cuda import get_approximation_cuda
             except ImportError:
                 raise NotImplementedError("The CUDA-extension is not installed. Use the build script to install.")
+
+        # number of coordinates per block such that the gPC matrix block (python) or the
+        # approximation block (cpu, omp, cuda without gPC matrix) fits into the memory limit
+        if n_block is None:
+            if self.backend == "python":
+                n_block = self.get_n_block(n_cols=coeffs.shape[0], dtype=self.dtype)
             else:
-                pce = np.empty([x.shape[0], coeffs.shape[1]])
-                get_approximation_cuda(x, self.basis.b_array, coeffs, pce)
-        else:
-            raise NotImplementedError
+                n_block = self.get_n_block(n_cols=coeffs.shape[1], dtype=self.dtype)
+
+        # cast the polynomials once to the precision used for the evaluation (coefficients are kept in float64)
+        coeffs = coeffs.astype("float64", copy=False)
+        b_array_eval = self.basis.b_array.astype(self.dtype, copy=False) if self.backend in ["cpu", "omp"] else None
+
+        for i_start in range(0, max(x.shape[0], 1), n_block):
+            idx = slice(i_start, min(i_start + n_block, x.shape[0]))
+
+            if self.backend == "cpu":
+                pce_block = np.empty([idx.stop - idx.start, coeffs.shape[1]], dtype=self.dtype)
+                get_approximation_cpu(x[idx, :], b_array_eval, coeffs, pce_block)
+            elif self.backend == "omp":
+                pce_block = np.empty([idx.stop - idx.start, coeffs.shape[1]], dtype=self.dtype)
+                get_approximation_omp(x[idx, :], b_array_eval, coeffs, pce_block)
+            elif self.backend == "cuda":
+                # the CUDA extension computes in double precision only
+                pce_block = np.empty([idx.stop - idx.start, coeffs.shape[1]])
+                get_approximation_cuda(x[idx, :], self.basis.b_array, coeffs, pce_block)
+                pce_block = pce_block.astype(self.dtype, copy=False)
+            else:
+                # determine gPC matrix at coordinates x and multiply with gPC coeffs (sum in float64)
+                pce_block = np.matmul(self.create_gpc_matrix(self.basis.multi_indices, x[idx, :], gradient=False,
+                                                             dtype=self.dtype), coeffs).astype(self.dtype, copy=False)
 
-        return pce
+            yield idx, pce_block
+
+    def get_n_block(self, n_cols, dtype="float64"):
+        """
+        Determine the number of rows of an array with n_cols columns fitting into self.memory_limit.
+
+        n_block = GPC.get_n_block(n_cols, dtype="float64")
+
+        Parameters
+        ----------
+        n_cols: int
+            Number of columns of the array (e.g. number of basis functions or output quantities)
+        dtype: str, optional, default: "float64"
+            Floating point precision of the array
+
+        Returns
+        -------
+        n_block: int
+            Number of rows (at least 1)
+        """
+        return max(1, int(self.memory_limit * 1024 ** 3 / (np.dtype(dtype).itemsize * max(n_cols, 1))))
+
+    def solve_output_blocks(self, solve_block, results, n_values, n_out_block=None):
+        """
+        Applies a solver, which shares its factorization between all output quantities, to blocks of columns of
+        the results. By default, the number of columns per block is determined such that the temporary arrays of a
+        block (n_values per output quantity) fit into self.memory_limit.
+
+        coeffs = GPC.solve_output_blocks(solve_block, results, n_values, n_out_block=None)
+
+        Parameters
+        ----------
+        solve_block : function
+            Solver, which determines the coefficients [n_basis x n_out_block] of a block of results
+            [n_rows x n_out_block]
+        results : ndarray of float [n_rows x n_out] or [n_rows]
+            Results
+        n_values : int
+            Number of values in temporary arrays per output quantity (e.g. n_rows + n_basis)
+        n_out_block : int, optional, default: None
+            Number of columns per block (overwrites the number determined from self.memory_limit)
+
+        Returns
+        -------
+        coeffs : ndarray of float [n_basis x n_out] or [n_basis]
+            Coefficients
+        """
+        if results.ndim == 1:
+            return solve_block(results)
+
+        n_out = results.shape[1]
+        if n_out_block is None:
+            n_out_block = self.get_n_block(n_cols=n_values)
+        coeffs = None
+
+        for i_start in range(0, max(n_out, 1), n_out_block):
+            idx = slice(i_start, min(i_start + n_out_block, n_out))
+            coeffs_block = solve_block(results[:, idx])
+
+            if coeffs is None:
+                if n_out_block >= n_out:
+                    return coeffs_block
+
+                coeffs = np.empty((coeffs_block.shape[0], n_out), dtype=coeffs_block.dtype)
+
+            coeffs[:, idx] = coeffs_block
+
+        return coeffs
 
     def replace_gpc_matrix_samples(self, idx, seed=None):
         """
@@ -657,131 +1188,183 @@ class GPC(object):
             self.gpc_matrix_coords_id[i] = copy.deepcopy(self.grid.coords_id[i])
 
         # determine new rows of gpc matrix and overwrite rows of gpc matrix
-        self.gpc_matrix[idx, :] = self.create_gpc_matrix(b=self.basis.b,
+        self.gpc_matrix[idx, :] = self.create_gpc_matrix(b=self.basis.multi_indices,
                                                          x=new_grid_points.coords_norm,
                                                          gradient=False)
 
-    def update_gpc_matrix(self):
+    def update_gpc_matrix(self, gradient_idx=None):
         """
         Update gPC matrix and gPC matrix gradient according to existing self.grid and self.basis.
 
         Call this method when self.gpc_matrix does not fit to self.grid and self.basis objects anymore
         The old gPC matrix with their self.gpc_matrix_b_id and self.gpc_matrix_coords_id is compared
         to self.basis.b_id and self.grid.coords_id. New rows and columns are computed if differences are found.
-        """
-        self._update_gpc_matrix(gradient=False)
-
-        if self.gradient:
-            self._update_gpc_matrix(gradient=True)
 
-    def _update_gpc_matrix(self, gradient=False):
-        """
-        Update gPC matrix or gPC gradient matrix
+        Parameters
+        ----------
+        gradient_idx : ndarray of int [gradient_results.shape[0]]
+            Indices of grid points where the gradient in gradient_results is provided
         """
-        if self.backend == "python":
-            # initialize updated matrix and variables
-            if gradient:
-                # reshape gpc gradient matrix from 2D to 3D representation [n_grid x n_basis x n_dim]
-                matrix = mat2ten(mat=self.gpc_matrix_gradient, incr=self.problem.dim)
-                matrix_updated = np.zeros((len(self.gradient_idx), len(self.basis.b_id), self.problem.dim))
-                # self.gpc_matrix_gradient_coords_id
-                coords_id = self.gpc_matrix_gradient_coords_id[self.gradient_idx]
-                # np.array(self.grid.coords_gradient_id).flatten()
-                coords_id_ref = self.grid.coords_gradient_id[self.gradient_idx]
-                b_id = self.gpc_matrix_gradient_b_id
-                b_id_ref = self.basis.b_id
-                coords_norm = self.grid.coords_norm[self.gradient_idx]
-                ge_str = "(gradient)"
-
-            else:
-                matrix = self.gpc_matrix
-                matrix_updated = np.zeros((len(self.grid.coords_id), len(self.basis.b_id)))
-                coords_id = self.gpc_matrix_coords_id
-                coords_id_ref = self.grid.coords_id
-                b_id = self.gpc_matrix_b_id
-                b_id_ref = self.basis.b_id
-                coords_norm = self.grid.coords_norm
-                ge_str = ""
-
-            # # determine indices of new basis functions and grid_points
-            # idx_coords_new = [i for i, _id in enumerate(self.grid.coords_id) if _id not in self.gpc_matrix_coords_id]
-            # idx_basis_new = [i for i, _id in enumerate(self.basis.b_id) if _id not in self.gpc_matrix_b_id]
-
-            # determine indices of old grid points in updated gpc matrix
-            idx_coords_old = np.empty(len(coords_id)) * np.nan
-            for i, coords_id_old in enumerate(coords_id):
-                for j, coords_id_new in enumerate(coords_id_ref):
-                    if coords_id_old == coords_id_new:
-                        idx_coords_old[i] = j
-                        break
-
-            # determine indices of old basis functions in updated gpc matrix
-            idx_b_old = np.empty(len(b_id))*np.nan
-            for i, b_id_old in enumerate(b_id):
-                for j, b_id_new in enumerate(b_id_ref):
-                    if b_id_old == b_id_new:
-                        idx_b_old[i] = j
-                        break
-
-            # filter out non-existent rows and columns
-            matrix = matrix[~np.isnan(idx_coords_old), :, ]
-            matrix = matrix[:, ~np.isnan(idx_b_old), ]
-
-            idx_coords_old = idx_coords_old[~np.isnan(idx_coords_old)].astype(int)
-            idx_b_old = idx_b_old[~np.isnan(idx_b_old)].astype(int)
+        if self.gradient_idx is None or gradient_idx is not None:
+            self.gradient_idx = gradient_idx
 
-            # indices of new coords and basis in updated gpc matrix (values have to be computed there)
-            idx_coords_new = np.array(list(set(np.arange(len(coords_id_ref))) - set(idx_coords_old))).astype(int)
-            idx_b_new = np.array(list(set(np.arange(len(b_id_ref))) - set(idx_b_old))).astype(int)
+        if self.gpc_matrix is None:
+            self.init_gpc_matrix()
+            return
 
-            # write old results at correct location in updated gpc matrix
-            idx = get_cartesian_product([idx_coords_old, idx_b_old]).astype(int)
-            idx_row = np.reshape(idx[:, 0], matrix.shape[:2]).astype(int)
-            idx_col = np.reshape(idx[:, 1], matrix.shape[:2]).astype(int)
+        self._update_gpc_matrix(gradient=False)
 
-            matrix_updated[idx_row, idx_col, ] = matrix
+        if self.gradient and self.gradient_idx is not None:
+            if self.gpc_matrix_gradient is None:
+                self.gpc_matrix_gradient = np.zeros((0, self.basis.n_basis))
+                self.gpc_matrix_gradient_coords_id = []
+                self.gpc_matrix_gradient_b_id = copy.deepcopy(self.basis.b_id)
 
-            # determine new columns (new basis functions) with old grid
-            idx = get_cartesian_product([idx_coords_old, idx_b_new]).astype(int)
-            if idx.any():
-                iprint('Adding {} columns to gPC matrix {}...'.format(idx_b_new.size, ge_str), tab=0, verbose=True)
+            self._update_gpc_matrix(gradient=True)
 
-                idx_row = np.reshape(idx[:, 0], (idx_coords_old.size, idx_b_new.size)).astype(int)
-                idx_col = np.reshape(idx[:, 1], (idx_coords_old.size, idx_b_new.size)).astype(int)
+    def _update_gpc_matrix(self, gradient=False):
+        """
+        Update gPC matrix or gPC gradient matrix. The rows and columns of the existing matrix are assigned to the
+        grid points and basis functions by hash maps of their IDs. Only the entries of new grid points (all basis
+        functions) and of new basis functions (remaining grid points) are evaluated with the selected backend.
+        If grid points and basis functions were only appended, the matrix is extended in place in a preallocated
+        buffer (see GrowableArray).
 
-                matrix_updated[idx_row, idx_col, ] = self.create_gpc_matrix(b=[self.basis.b[i] for i in idx_b_new],
-                                                                            x=coords_norm[idx_coords_old, :],
-                                                                            gradient=gradient,
-                                                                            verbose=False)
+        Parameters
+        ----------
+        gradient : bool, optional, default: False
+            Update gPC gradient matrix
+        """
+        if gradient:
+            # rows of gPC gradient matrix: [n_grid_gradient * n_dim x n_basis] (ordered by grid points)
+            n_incr = self.problem.dim
+            matrix = self.gpc_matrix_gradient
+            buffer = self._gpc_matrix_gradient_buffer
+            coords_id = self.gpc_matrix_gradient_coords_id
+            coords_id_ref = [self.grid.coords_id[i] for i in self.gradient_idx]
+            b_id = self.gpc_matrix_gradient_b_id
+            coords_norm = self.grid.coords_norm[self.gradient_idx, :]
+            ge_str = "(gradient)"
+        else:
+            n_incr = 1
+            matrix = self.gpc_matrix
+            buffer = self._gpc_matrix_buffer
+            coords_id = self.gpc_matrix_coords_id
+            coords_id_ref = self.grid.coords_id
+            b_id = self.gpc_matrix_b_id
+            coords_norm = self.grid.coords_norm
+            ge_str = ""
+
+        b_id_ref = self.basis.b_id
+
+        def get_rows(idx):
+            # rows of the gPC (gradient) matrix of the grid points with index idx
+            return (np.asarray(idx, dtype=int)[:, np.newaxis] * n_incr + np.arange(n_incr)).flatten()
+
+        def get_block(b, x):
+            block = self.create_gpc_matrix_block(b=b, x=x, gradient=gradient)
+            return block.transpose(0, 2, 1).reshape(-1, len(b)) if gradient else block
+
+        # positions of the old rows and columns in the updated gpc matrix (-1: not present anymore)
+        idx_map_coords = {_id: i for i, _id in enumerate(coords_id_ref)}
+        idx_map_b = {_id: i for i, _id in enumerate(b_id_ref)}
+        idx_coords = np.array([idx_map_coords.get(_id, -1) for _id in coords_id], dtype=int)
+        idx_b = np.array([idx_map_b.get(_id, -1) for _id in b_id], dtype=int)
+
+        mask_coords = idx_coords >= 0
+        mask_b = idx_b >= 0
+        idx_coords_old = idx_coords[mask_coords]
+        idx_b_old = idx_b[mask_b]
+
+        # indices of new coords and basis in updated gpc matrix (values have to be computed there)
+        mask_coords_new = np.ones(len(coords_id_ref), dtype=bool)
+        mask_coords_new[idx_coords_old] = False
+        idx_coords_new = np.flatnonzero(mask_coords_new)
+
+        mask_b_new = np.ones(len(b_id_ref), dtype=bool)
+        mask_b_new[idx_b_old] = False
+        idx_b_new = np.flatnonzero(mask_b_new)
+
+        # write old results at correct location in updated gpc matrix
+        if np.array_equal(idx_coords, np.arange(len(idx_coords))) and \
+                np.array_equal(idx_b, np.arange(len(idx_b))):
+            # rows and columns were only appended: extend matrix in place
+            buffer.adopt(matrix)
+            matrix_updated = buffer.resize(len(coords_id_ref) * n_incr, len(b_id_ref))
+        else:
+            matrix_updated = np.empty((len(coords_id_ref) * n_incr, len(b_id_ref)), dtype=matrix.dtype)
+            matrix_updated[np.ix_(get_rows(idx_coords_old), idx_b_old)] = \
+                matrix[np.ix_(get_rows(np.flatnonzero(mask_coords)), mask_b)]
+
+        # determine new columns (new basis functions) with old grid
+        if idx_coords_old.size > 0 and idx_b_new.size > 0:
+            iprint('Adding {} columns to gPC matrix {}...'.format(idx_b_new.size, ge_str), tab=0, verbose=True)
+
+            matrix_updated[np.ix_(get_rows(idx_coords_old), idx_b_new)] = \
+                get_block(b=self.basis.multi_indices[idx_b_new, :], x=coords_norm[idx_coords_old, :])
+
+        # determine new rows (new grid points) with all basis functions
+        if idx_coords_new.size > 0 and len(b_id_ref) > 0:
+            iprint('Adding {} rows to gPC matrix {}...'.format(idx_coords_new.size, ge_str), tab=0, verbose=True)
+
+            matrix_updated[get_rows(idx_coords_new), ] = get_block(b=self.basis.multi_indices,
+                                                                   x=coords_norm[idx_coords_new, :])
+
+        # write reordered matrix to the out-of-core dataset
+        if self.fn_out_of_core is not None:
+            buffer.adopt(matrix_updated)
+            matrix_updated = buffer.data
+
+        # overwrite old attributes and append new sizes
+        if gradient:
+            self.gpc_matrix_gradient = matrix_updated
+            self.gpc_matrix_gradient_coords_id = copy.deepcopy(coords_id_ref)
+            self.gpc_matrix_gradient_b_id = copy.deepcopy(b_id_ref)
+        else:
+            self.gpc_matrix = matrix_updated
+            self.gpc_matrix_coords_id = copy.deepcopy(coords_id_ref)
+            self.gpc_matrix_b_id = copy.deepcopy(b_id_ref)
+            self.n_grid.append(self.gpc_matrix.shape[0])
+            self.n_basis.append(self.gpc_matrix.shape[1])
 
-            # determine new rows (new grid points) with all basis functions
-            idx = get_cartesian_product([idx_coords_new, np.arange(len(self.basis.b))]).astype(int)
-            if idx.any():
-                iprint('Adding {} rows to gPC matrix {}...'.format(idx_coords_new.size, ge_str), tab=0, verbose=True)
+    def create_gpc_matrix_block(self, b, x, gradient=False):
+        """
+        Construct a block of the gPC matrix or its derivative at all given coordinates (with the selected backend).
+        In contrast to create_gpc_matrix, the gradient is evaluated at all coordinates x and self.gradient_idx is
+        not modified.
 
-                idx_row = np.reshape(idx[:, 0], (idx_coords_new.size, len(self.basis.b))).astype(int)
-                idx_col = np.reshape(idx[:, 1], (idx_coords_new.size, len(self.basis.b))).astype(int)
+        gpc_matrix = GPC.create_gpc_matrix_block(b, x, gradient=False)
 
-                matrix_updated[idx_row, idx_col, ] = self.create_gpc_matrix(b=self.basis.b,
-                                                                            x=coords_norm[idx_coords_new, :],
-                                                                            gradient=gradient,
-                                                                            verbose=False)
+        Parameters
+        ----------
+        b : ndarray of int [n_basis x n_dim]
+            Multi-indices of the global basis functions (subset of self.basis.multi_indices)
+        x : ndarray of float [n_x x n_dim]
+            Coordinates of x = (x1, x2, ..., x_dim) where the rows of the gPC matrix are evaluated (normalized [-1, 1])
+        gradient : bool, optional, default: False
+            Determine gradient gPC matrix.
 
-            # overwrite old attributes and append new sizes
-            if gradient:
-                # reshape from 3D to 2D
-                self.gpc_matrix_gradient = ten2mat(matrix_updated)
-                self.gpc_matrix_gradient_coords_id = copy.deepcopy(self.grid.coords_id)
-                self.gpc_matrix_gradient_b_id = copy.deepcopy(self.basis.b_id)
-            else:
-                self.gpc_matrix = matrix_updated
-                self.gpc_matrix_coords_id = copy.deepcopy(self.grid.coords_id)
-                self.gpc_matrix_b_id = copy.deepcopy(self.basis.b_id)
-                self.n_grid.append(self.gpc_matrix.shape[0])
-                self.n_basis.append(self.gpc_matrix.shape[1])
+        Returns
+        -------
+        gpc_matrix: ndarray of float [n_x x n_basis (x dim)]
+            GPC matrix (block)
+        """
+        gradient_idx = self.gradient_idx
+
+        try:
+            gpc_matrix = self.create_gpc_matrix(b=b,
+                                                x=x,
+                                                gradient=gradient,
+                                                gradient_idx=np.arange(x.shape[0]) if gradient else None,
+                                                verbose=False)
+        finally:
+            self.gradient_idx = gradient_idx
 
+        # the backends squeeze singleton dimensions
+        if gradient:
+            return np.reshape(gpc_matrix, (x.shape[0], len(b), self.problem.dim))
         else:
-            self.init_gpc_matrix()
+            return np.reshape(gpc_matrix, (x.shape[0], len(b)))
 
     def save_gpc_matrix_hdf5(self, hdf5_path_gpc_matrix=None, hdf5_path_gpc_matrix_gradient=None):
         """
@@ -877,7 +1460,9 @@ class GPC(object):
 
     def solve(self, results, gradient_results=None, solver=None, settings=None, matrix=None, verbose=False):
         """
-        Determines gPC coefficients
+        Determines gPC coefficients. If self.lambda_eps_output is set (options["lambda_eps_output"]), the results are
+        compressed to their principal components (see determine_output_projection) and the gPC coefficients of the
+        principal components are determined (ReducedCoeffs object).
 
         Parameters
         ----------
@@ -890,12 +1475,20 @@ class GPC(object):
             - 'Moore-Penrose' ... Pseudoinverse of gPC matrix (SGPC.Reg, EGPC)
             - 'OMP' ... Orthogonal Matching Pursuit, sparse recovery approach (SGPC.Reg, EGPC)
             - 'LarsLasso' ... Least-Angle Regression using Lasso model (SGPC.Reg, EGPC)
+            - 'incremental-lstsq' ... Least squares solution with incrementally updated Cholesky factorization of
+              the normal equations (SGPC.Reg)
             - 'NumInt' ... Numerical integration, spectral projection (SGPC.Quad)
         settings : dict
             Solver settings
             - 'Moore-Penrose' ... None
             - 'OMP' ... {"n_coeffs_sparse": int} Number of gPC coefficients != 0 or "sparsity": float 0...1
+              {"joint": bool} Simultaneous OMP with common support of all output quantities (default: False),
+              {"n_out_block": int} Number of output quantities, whose correlations are determined at once (the
+              support is common to all output quantities, default: determined by options["memory_limit"])
             - 'LarsLasso' ... {"alpha": float 0...1} Regularization parameter
+            - 'incremental-lstsq' ... {"lambda": float >= 0} Tikhonov regularization parameter (default: 0),
+              {"cond_max": float} Maximal condition number of the normal equations before the factorization is
+              recomputed or the solver falls back to the pseudoinverse (default: 1e12)
             - 'NumInt' ... None
         matrix : ndarray of float, optional, default: self.gpc_matrix or [self.gpc_matrix, self.gpc_matrix_gradient]
             Matrix to invert. Depending on gradient_enhanced option, this matrix consist of the standard gPC matrix and
@@ -905,14 +1498,31 @@ class GPC(object):
 
         Returns
         -------
-        coeffs: ndarray of float [n_coeffs x n_out]
+        coeffs: ndarray of float [n_coeffs x n_out] or ReducedCoeffs object
             gPC coefficients
         """
 
+        # least squares solution of out-of-core gPC matrices and results in row blocks
+        if matrix is None and self.fn_out_of_core is not None and self.lambda_eps_output is None and \
+                (solver if solver is not None else self.solver) in ["Moore-Penrose", "incremental-lstsq"]:
+            return self.solve_out_of_core(results=results,
+                                          gradient_results=gradient_results,
+                                          solver=solver if solver is not None else self.solver,
+                                          settings=settings,
+                                          verbose=verbose)
+
         ge_str = ""
 
+        # IDs of the rows of the matrix (incremental solvers)
+        rows_id = None
+
+        # solutions of explicitly given matrices (e.g. folds of the cross validation, which are solved concurrently)
+        # must not change the state of the gPC object
+        matrix_given = matrix is not None
+
         if matrix is None:
             matrix = self.gpc_matrix
+            rows_id = self.gpc_matrix_coords_id
 
             if self.gradient is False:
                 matrix = self.gpc_matrix
@@ -921,6 +1531,9 @@ class GPC(object):
                 if not solver == 'NumInt':
                     if self.gpc_matrix_gradient is not None:
                         matrix = np.vstack((self.gpc_matrix, self.gpc_matrix_gradient))
+                        rows_id = list(self.gpc_matrix_coords_id) + \
+                            [(_id, i_dim) for _id in self.gpc_matrix_gradient_coords_id
+                             for i_dim in range(self.problem.dim)]
                     else:
                         matrix = self.gpc_matrix
                     ge_str = "(gradient enhanced)"
@@ -949,26 +1562,51 @@ class GPC(object):
         else:
             results_complete = results
 
+        # compress output quantities to their principal components and determine the gPC of the components
+        output_projection = None
+
+        if not solver == 'NumInt' and self.lambda_eps_output is not None and results.ndim == 2:
+            output_projection = determine_output_projection(results=results, lambda_eps=self.lambda_eps_output)
+            mean, components = output_projection
+
+            results_complete = np.matmul(results_complete, components.transpose())
+            results_complete[:results.shape[0], :] -= np.matmul(mean, components.transpose())
+
+            iprint("Compressed {} output quantities to {} principal components".format(results.shape[1],
+                                                                                     components.shape[0]),
+                   tab=0, verbose=verbose)
+
         #################
         # Moore-Penrose #
         #################
         if solver == 'Moore-Penrose':
             # determine pseudoinverse of gPC matrix
-            self.matrix_inv = np.linalg.pinv(matrix)
+            matrix_inv = np.linalg.pinv(matrix)
+
+            if not matrix_given:
+                self.matrix_inv = matrix_inv
 
             try:
-                coeffs = np.matmul(self.matrix_inv, results_complete)
+                coeffs = self.solve_output_blocks(solve_block=lambda res: np.matmul(matrix_inv, res),
+                                                  results=results_complete,
+                                                  n_values=np.sum(matrix.shape))
             except ValueError:
                 raise AttributeError("Please check format of parameter sim_results: [n_grid (* dim) x n_out] "
                                      "np.ndarray.")
 
+        ######################################
+        # Incremental least squares solution #
+        ######################################
+        elif solver == 'incremental-lstsq':
+            coeffs = self.solve_incremental_lstsq(matrix=matrix,
+                                                  results=results_complete,
+                                                  settings=settings,
+                                                  rows_id=rows_id)
+
         ###############################
         # Orthogonal Matching Pursuit #
         ###############################
         elif solver == 'OMP':
-            # transform gPC matrix to fastmat format
-            matrix_fm = fm.Matrix(matrix)
-
             if results_complete.ndim == 1:
                 results_complete = results_complete[:, np.newaxis]
 
@@ -980,7 +1618,18 @@ class GPC(object):
             else:
                 raise AttributeError("Please specify 'n_coeffs_sparse' or 'sparsity' in solver settings dictionary!")
 
-            coeffs = fm.algs.OMP(matrix_fm, results_complete, n_coeffs_sparse)
+            if "joint" in settings.keys() and settings["joint"]:
+                # simultaneous OMP with common support of all output quantities (correlations of the output
+                # quantities are determined in blocks)
+                if "n_out_block" in settings.keys() and settings["n_out_block"] is not None:
+                    n_out_block = int(settings["n_out_block"])
+                else:
+                    n_out_block = self.get_n_block(n_cols=np.sum(matrix.shape))
+
+                coeffs = somp(matrix=matrix, results=results_complete, n_coeffs_sparse=n_coeffs_sparse,
+                              n_out_block=n_out_block)
+            else:
+                coeffs = fm.algs.OMP(fm.Matrix(matrix), results_complete, n_coeffs_sparse)
 
         ################################
         # Least-Angle Regression Lasso #
@@ -1039,8 +1688,335 @@ class GPC(object):
         else:
             raise AttributeError("Unknown solver: '{}'!")
 
+        if output_projection is not None:
+            coeffs = ReducedCoeffs(coeffs=coeffs, components=output_projection[1], mean=output_projection[0])
+
         return coeffs
 
+    def solve_incremental_lstsq(self, matrix, results, settings=None, rows_id=None):
+        """
+        Determines the least squares solution of matrix @ coeffs = results by the Cholesky factorization of the
+        normal equations. If the rows and columns of the matrix are identified by rows_id and self.gpc_matrix_b_id,
+        the factorization is kept in self.lstsq_factorization and updated with the rows (grid points) and columns
+        (basis functions), which were added since the last call. The factorization is recomputed if it became
+        ill-conditioned. If the normal equations are still ill-conditioned, the solution is determined by the
+        pseudoinverse of the matrix. The factorization is shared by all output quantities, which are
+        back-substituted in blocks (see GPC.solve_output_blocks).
+
+        coeffs = GPC.solve_incremental_lstsq(matrix, results, settings=None, rows_id=None)
+
+        Parameters
+        ----------
+        matrix : ndarray of float [n_rows x n_basis]
+            gPC matrix (with or without gradient)
+        results : ndarray of float [n_rows x n_out]
+            Results (with or without gradient)
+        settings : dict, optional, default: None
+            Solver settings ({"lambda": float, "cond_max": float})
+        rows_id : list, optional, default: None
+            IDs of the rows of the matrix. If None, the factorization is not kept.
+
+        Returns
+        -------
+        coeffs : ndarray of float [n_basis x n_out]
+            gPC coefficients
+        """
+        if settings is None:
+            settings = dict()
+
+        regularization = settings["lambda"] if "lambda" in settings.keys() else 0.
+        cond_max = settings["cond_max"] if "cond_max" in settings.keys() else 1e12
+
+        if rows_id is not None and (len(rows_id) != matrix.shape[0] or len(self.gpc_matrix_b_id) != matrix.shape[1]):
+            rows_id = None
+
+        factorization = self.lstsq_factorization if rows_id is not None else None
+
+        # check if factorization can be updated (rows are not removed and columns are only appended)
+        if factorization is not None:
+            idx_map_rows = {_id: i for i, _id in enumerate(rows_id)}
+            idx_rows_old = np.array([idx_map_rows.get(_id, -1) for _id in factorization.rows_id], dtype=int)
+
+            if factorization.regularization != regularization or np.any(idx_rows_old < 0) or \
+                    list(self.gpc_matrix_b_id[:factorization.n_cols]) != list(factorization.cols_id):
+                factorization = None
+
+        # update factorization with new basis functions (columns) and new grid points (rows)
+        if factorization is not None:
+            mask_rows_old = np.zeros(matrix.shape[0], dtype=bool)
+            mask_rows_old[idx_rows_old] = True
+
+            try:
+                if matrix.shape[1] > factorization.n_cols:
+                    factorization.add_cols(cols=matrix[mask_rows_old, factorization.n_cols:],
+                                           matrix=matrix[mask_rows_old, :factorization.n_cols])
+
+                if np.any(~mask_rows_old):
+                    factorization.add_rows(rows=matrix[~mask_rows_old, :])
+
+                if factorization.get_cond() > cond_max:
+                    iprint("Updated factorization is ill-conditioned, recomputing factorization...",
+                           tab=0, verbose=self.verbose)
+                    factorization = None
+
+            except np.linalg.LinAlgError:
+                factorization = None
+
+        # compute new factorization
+        if factorization is None:
+            try:
+                factorization = IncrementalCholesky(matrix=matrix, regularization=regularization)
+            except np.linalg.LinAlgError:
+                factorization = None
+
+        if factorization is None or factorization.get_cond() > cond_max:
+            iprint("Normal equations are ill-conditioned, using pseudoinverse...", tab=0, verbose=self.verbose)
+
+            if rows_id is not None:
+                self.lstsq_factorization = None
+
+            matrix_inv = np.linalg.pinv(matrix)
+
+            return self.solve_output_blocks(solve_block=lambda res: np.matmul(matrix_inv, res),
+                                            results=results,
+                                            n_values=np.sum(matrix.shape))
+
+        if rows_id is not None:
+            factorization.rows_id = list(rows_id)
+            factorization.cols_id = list(self.gpc_matrix_b_id)
+            self.lstsq_factorization = factorization
+
+        return self.solve_output_blocks(solve_block=lambda res: factorization.solve(np.matmul(matrix.transpose(), res)),
+                                        results=results,
+                                        n_values=np.sum(matrix.shape))
+
+    def get_normal_equations(self, matrices, results, regularization=0.):
+        """
+        Determines the (regularized) normal equations of the least squares problem min ||matrix @ coeffs - results||
+        of vertically stacked matrices and results in row blocks fitting into self.memory_limit. Only the current
+        row block of out-of-core arrays (HDF5Array) is read into memory.
+
+        gram, rhs = GPC.get_normal_equations(matrices, results, regularization=0.)
+
+        Parameters
+        ----------
+        matrices : list of ndarray or HDF5Array [n_rows_i x n_basis]
+            Matrices (e.g. gPC matrix and gPC gradient matrix)
+        results : list of ndarray or HDF5Array [n_rows_i x n_out]
+            Results of the rows of the matrices
+        regularization : float, optional, default: 0.
+            Tikhonov regularization parameter lambda
+
+        Returns
+        -------
+        gram : ndarray of float [n_basis x n_basis]
+            Matrix of the normal equations (matrix.T @ matrix + lambda * I)
+        rhs : ndarray of float [n_basis x n_out]
+            Right hand side of the normal equations (matrix.T @ results)
+        """
+        n_basis = matrices[0].shape[1]
+        n_out = 1 if results[0].ndim == 1 else results[0].shape[1]
+
+        gram = np.zeros((n_basis, n_basis))
+        rhs = np.zeros((n_basis, n_out))
+
+        for matrix, res in zip(matrices, results):
+            n_block = self.get_n_block(n_cols=n_basis + n_out)
+
+            for idx, matrix_block in get_blocks(matrix, n_block):
+                res_block = np.reshape(np.asarray(res[idx]), (-1, n_out))
+                gram += np.matmul(matrix_block.transpose(), matrix_block)
+                rhs += np.matmul(matrix_block.transpose(), res_block)
+
+        gram[np.diag_indices_from(gram)] += regularization
+
+        return gram, rhs
+
+    def get_qr_factor(self, matrices, results, regularization=0.):
+        """
+        Determines the triangular factor R of the QR decomposition of vertically stacked matrices and the projected
+        results Q.T @ results by a tall-skinny QR decomposition (TSQR). The row blocks fitting into
+        self.memory_limit are appended to the triangular factor of the previous blocks one after another, such that
+        Q is never formed. Only the current row block of out-of-core arrays (HDF5Array) is read into memory.
+        In case of Tikhonov regularization, the rows sqrt(lambda) * I are appended to the matrices.
+
+        r, rhs = GPC.get_qr_factor(matrices, results, regularization=0.)
+
+        Parameters
+        ----------
+        matrices : list of ndarray or HDF5Array [n_rows_i x n_basis]
+            Matrices (e.g. gPC matrix and gPC gradient matrix)
+        results : list of ndarray or HDF5Array [n_rows_i x n_out]
+            Results of the rows of the matrices
+        regularization : float, optional, default: 0.
+            Tikhonov regularization parameter lambda
+
+        Returns
+        -------
+        r : ndarray of float [min(n_rows, n_basis) x n_basis]
+            Upper triangular factor R of the stacked matrices (matrix = Q @ R)
+        rhs : ndarray of float [min(n_rows, n_basis) x n_out]
+            Projected results (Q.T @ results)
+        """
+        n_basis = matrices[0].shape[1]
+        n_out = 1 if results[0].ndim == 1 else results[0].shape[1]
+
+        # triangular factor of the matrix augmented by the results [matrix, results] = Q @ [R, Q.T @ results]
+        r = np.zeros((0, n_basis + n_out))
+        blocks = []
+
+        for matrix, res in zip(matrices, results):
+            blocks.append((matrix, res, self.get_n_block(n_cols=n_basis + n_out)))
+
+        if regularization > 0:
+            blocks.append((np.sqrt(regularization) * np.eye(n_basis), np.zeros((n_basis, n_out)), n_basis))
+
+        for matrix, res, n_block in blocks:
+            for idx, matrix_block in get_blocks(matrix, n_block):
+                res_block = np.reshape(np.asarray(res[idx]), (-1, n_out))
+                r = np.linalg.qr(np.vstack((r, np.hstack((matrix_block, res_block)))), mode="r")
+
+                # rows below the basis functions only contain the residual of the results
+                r = r[:n_basis, :]
+
+        return r[:, :n_basis], r[:, n_basis:]
+
+    def solve_out_of_core(self, results, gradient_results=None, solver=None, settings=None, verbose=False):
+        """
+        Determines the least squares solution of the out-of-core gPC matrices and results (see GPC.set_out_of_core)
+        in row blocks. 'Moore-Penrose' uses the pseudoinverse of the triangular factor of the QR decomposition, which
+        is accumulated in row blocks (pinv(R) @ Q.T = pinv(A), see GPC.get_qr_factor). The 'incremental-lstsq'
+        solver uses the Cholesky factorization of the normal equations (see GPC.get_normal_equations), which is
+        cheaper but squares the condition number of the gPC matrix. If the normal equations are ill-conditioned,
+        the (regularized) solution is determined from the QR decomposition as well.
+
+        coeffs = GPC.solve_out_of_core(results, gradient_results=None, solver=None, settings=None, verbose=False)
+
+        Parameters
+        ----------
+        results : ndarray or HDF5Array of float [n_grid x n_out]
+            Results from simulations with n_out output quantities
+        gradient_results : ndarray of float [n_gradient x n_out x dim], optional, default: None
+            Gradient of results in original parameter space in specific grid points
+        solver : str, optional, default: None
+            Solver ('Moore-Penrose' or 'incremental-lstsq')
+        settings : dict, optional, default: None
+            Solver settings ({"lambda": float, "cond_max": float} in case of 'incremental-lstsq')
+        verbose : bool, optional, default: False
+            Print progress
+
+        Returns
+        -------
+        coeffs : ndarray of float [n_basis x n_out]
+            gPC coefficients
+        """
+        if settings is None:
+            settings = dict()
+
+        matrices = [self.gpc_matrix]
+        results_list = [results]
+        ge_str = ""
+
+        if self.gradient and gradient_results is not None and self.gpc_matrix_gradient is not None:
+            # transform gradient of results according to projection
+            if self.p_matrix is not None:
+                gradient_results = np.matmul(gradient_results,
+                                             self.p_matrix.transpose() * self.p_matrix_norm[np.newaxis, :])
+
+            matrices.append(self.gpc_matrix_gradient)
+            results_list.append(ten2mat(gradient_results))
+            ge_str = "(gradient enhanced)"
+
+        iprint("Determine gPC coefficients using '{}' solver (out-of-core) {}...".format(solver, ge_str),
+               tab=0, verbose=verbose)
+
+        regularization = 0.
+
+        if solver == "incremental-lstsq":
+            regularization = settings["lambda"] if "lambda" in settings.keys() else 0.
+            cond_max = settings["cond_max"] if "cond_max" in settings.keys() else 1e12
+
+            gram, rhs = self.get_normal_equations(matrices=matrices, results=results_list,
+                                                  regularization=regularization)
+
+            try:
+                factorization = scipy.linalg.cho_factor(gram, lower=True)
+                diag = np.abs(np.diag(factorization[0]))
+
+                if np.min(diag) > 0 and (np.max(diag) / np.min(diag)) ** 2 <= cond_max:
+                    coeffs = scipy.linalg.cho_solve(factorization, rhs)
+                    return coeffs if results.ndim == 2 else coeffs[:, 0]
+
+            except np.linalg.LinAlgError:
+                pass
+
+            iprint("Normal equations are ill-conditioned, using QR decomposition...", tab=0, verbose=self.verbose)
+
+        r, rhs = self.get_qr_factor(matrices=matrices, results=results_list, regularization=regularization)
+        coeffs = np.matmul(np.linalg.pinv(r), rhs)
+
+        return coeffs if results.ndim == 2 else coeffs[:, 0]
+
+    def get_loocv_lstsq_out_of_core(self, matrix, results, error_norm="relative", regularization=0.):
+        """
+        Determines the leave-one-out errors of the (regularized) least squares solution like GPC.get_loocv_lstsq
+        for out-of-core gPC matrices and results in row blocks. The leverages are determined from the Cholesky
+        factorization of the normal equations (h_i = ||L^-1 a_i||^2).
+
+        relative_error = GPC.get_loocv_lstsq_out_of_core(matrix, results, error_norm="relative", regularization=0.)
+
+        Parameters
+        ----------
+        matrix : ndarray or HDF5Array of float [n_grid x n_basis]
+            gPC matrix
+        results : ndarray or HDF5Array of float [n_grid x n_out]
+            Results
+        error_norm : str, optional, default: "relative"
+            Decide if error is determined "relative" or "absolute"
+        regularization : float, optional, default: 0.
+            Tikhonov regularization parameter lambda
+
+        Returns
+        -------
+        relative_error : ndarray of float [n_grid] or None
+            Leave-one-out errors of the grid points (None if the system is underdetermined or rank deficient)
+        """
+        n_grid, n_basis = matrix.shape
+
+        if regularization == 0 and n_grid <= n_basis:
+            return None
+
+        gram, rhs = self.get_normal_equations(matrices=[matrix], results=[results], regularization=regularization)
+
+        try:
+            l_gram = scipy.linalg.cholesky(gram, lower=True)
+        except np.linalg.LinAlgError:
+            return None
+
+        # rank deficient matrix (leave-one-out solutions are not unique)
+        diag = np.abs(np.diag(l_gram))
+        if np.min(diag) <= 1e-12 * np.max(diag):
+            return None
+
+        coeffs = scipy.linalg.cho_solve((l_gram, True), rhs)
+        relative_error = np.zeros(n_grid)
+
+        for idx, matrix_block in get_blocks(matrix, self.get_n_block(n_cols=n_basis + rhs.shape[1])):
+            res_block = np.reshape(np.asarray(results[idx]), (matrix_block.shape[0], -1))
+            h = np.sum(scipy.linalg.solve_triangular(l_gram, matrix_block.transpose(), lower=True) ** 2, axis=0)
+
+            # grid points, which determine coefficients alone (h_i = 1), can not be left out
+            if np.max(h) > 1 - 1e-10:
+                return None
+
+            residual = res_block - np.matmul(matrix_block, coeffs)
+            relative_error[idx] = np.linalg.norm(residual, axis=1) / (1 - h)
+
+            if error_norm == "relative":
+                relative_error[idx] /= np.linalg.norm(res_block, axis=1)
+
+        return relative_error
+
     def create_validation_set(self, n_samples, n_cpu=1):
         """
         Creates a ValidationSet instance (calls the model)
@@ -1068,6 +2044,7 @@ class GPC(object):
         # Evaluate original model at grid points
         com = Computation(n_cpu=n_cpu, matlab_model=self.matlab_model)
         results = com.run(model=problem.model, problem=problem, coords=grid.coords)
+        com.close()
 
         if results.ndim == 1:
             results = results[:, np.newaxis]
@@ -5,6 +5,7 @@ import scipy.stats
 from .io import iprint
 from .misc import get_multi_indices
 from .misc import get_cartesian_product
+from .GrowableArray import GrowableArray
 from.Quadrature import *
 
 
@@ -66,6 +67,8 @@ class Grid():
         self.dim = len(self.parameters_random)        # Number of random variables
         self._coords_gradient = coords_gradient       # Shifted coordinates for gradient calculation in the system space
         self._coords_gradient_norm = coords_gradient_norm  # Normalized coordinates for gradient calculation
+        self._coords_buffer = GrowableArray()         # Preallocated storage of coords (see append_coords)
+        self._coords_norm_buffer = GrowableArray()    # Preallocated storage of coords_norm (see append_coords)
 
         if coords is not None:
             self.n_grid = self.coords.shape[0]                    # Total number of grid points
@@ -141,6 +144,52 @@ class Grid():
     def weights(self, value):
         self._weights = value
 
+    def __getstate__(self):
+        """
+        Returns the state of the Grid without the preallocated storage of the coordinates.
+        """
+        state = self.__dict__.copy()
+
+        for key in ["_coords_buffer", "_coords_norm_buffer"]:
+            state.pop(key, None)
+
+        return state
+
+    def __setstate__(self, state):
+        """
+        Restores the Grid from its state (see __getstate__).
+        """
+        self.__dict__.update(state)
+        self._coords_buffer = GrowableArray()
+        self._coords_norm_buffer = GrowableArray()
+
+    def append_coords(self, coords, coords_norm):
+        """
+        Appends grid points to self.coords and self.coords_norm. The coordinates are stored in preallocated buffers,
+        whose capacity is doubled if exceeded, such that appending costs amortized O(n_grid_add).
+        The IDs of the grid points (self.coords_id) are not modified.
+
+        Grid.append_coords(coords, coords_norm)
+
+        Parameters
+        ----------
+        coords : ndarray of float [n_grid_add x dim]
+            Grid points to add (model space)
+        coords_norm : ndarray of float [n_grid_add x dim]
+            Grid points to add (normalized space)
+        """
+        if self._coords is None or self._coords_norm is None:
+            self.coords = np.array(coords)
+            self.coords_norm = np.array(coords_norm)
+            return
+
+        # take over the coordinates if they were replaced by another array
+        self._coords_buffer.adopt(self._coords)
+        self._coords_norm_buffer.adopt(self._coords_norm)
+
+        self.coords = self._coords_buffer.append_rows(coords)
+        self.coords_norm = self._coords_norm_buffer.append_rows(coords_norm)
+
     def get_denormalized_coordinates(self, coords_norm):
         """
         Denormalize grid from normalized to original parameter space for simulations.
@@ -904,15 +953,13 @@ class RandomGrid(Grid):
                                           options=self.options)
 
                         # append points to existing grid
-                        self.coords = np.vstack([self.coords, new_grid.coords])
-                        self.coords_norm = np.vstack([self.coords_norm, new_grid.coords_norm])
+                        self.append_coords(coords=new_grid.coords, coords_norm=new_grid.coords_norm)
 
                     elif isinstance(self, LHS):
                         # append points to existing grid
                         # lhs_extend(self.coords_reservoir, n_grid_add)
-                        self.coords = self.lhs_extend(self.coords, n_grid_add)
-                        self.coords_norm = np.vstack([self.coords_norm, self.get_normalized_coordinates(
-                            self.coords[self.coords.shape[0]-n_grid_add:, :])])
+                        coords = self.lhs_extend(self.coords, n_grid_add)[self.coords.shape[0]:, :]
+                        self.append_coords(coords=coords, coords_norm=self.get_normalized_coordinates(coords))
 
                 else:
                     coords = np.zeros((n_grid_add, len(self.parameters_random)))
@@ -954,8 +1001,7 @@ class RandomGrid(Grid):
                                     # self.lhs_reservoir = np.delete(self.lhs_reservoir, self.n_grid, 0)
 
                     # append points to existing grid
-                    self.coords = np.vstack([self.coords, coords])
-                    self.coords_norm = np.vstack([self.coords_norm, coords_norm])
+                    self.append_coords(coords=coords, coords_norm=coords_norm)
 
         elif coords is not None and coords_norm is not None:
             # Number of new grid points
@@ -967,8 +1013,7 @@ class RandomGrid(Grid):
                     raise AssertionError("Specified coordinates are not lying in right domain!")
 
             # append points to existing grid
-            self.coords = np.vstack([self.coords, coords])
-            self.coords_norm = np.vstack([self.coords_norm, coords_norm])
+            self.append_coords(coords=coords, coords_norm=coords_norm)
 
         else:
             raise ValueError("Specify either n_grid_new or coords and coords_norm")
@@ -0,0 +1,216 @@
+import numpy as np
+
+
+class GrowableArray(object):
+    """
+    Two-dimensional array with preallocated capacity in rows and columns. The used region is exposed as a view
+    on the buffer. If the capacity is exceeded, a new buffer with (at least) twice the capacity in the exceeded
+    dimension is allocated, such that appending rows or columns costs amortized O(n_values). Views of the used
+    region remain valid after an extension, because entries inside the used region are never moved or overwritten.
+
+    Parameters
+    ----------
+    data : ndarray [n_rows x n_cols], optional, default: None
+        Initial used region (the array is taken over without copying)
+    shape : tuple of int, optional, default: (0, 0)
+        Shape of the (uninitialized) used region if data is None
+    dtype : str or np.dtype, optional, default: "float64"
+        Data type of the buffer if data is None
+
+    Attributes
+    ----------
+    shape : tuple of int
+        Shape of the used region (n_rows, n_cols)
+    """
+
+    def __init__(self, data=None, shape=(0, 0), dtype="float64"):
+        """
+        Constructor; initializes the GrowableArray class
+        """
+        if data is None:
+            data = np.empty(shape, dtype=dtype)
+
+        self._buffer = None
+        self.shape = None
+        self.adopt(data)
+
+    def __len__(self):
+        return self.shape[0]
+
+    @property
+    def data(self):
+        return self._buffer[:self.shape[0], :self.shape[1]]
+
+    @property
+    def capacity(self):
+        return self._buffer.shape
+
+    def is_view(self, array):
+        """
+        Tests if array is the used region of the buffer.
+
+        is_view = GrowableArray.is_view(array)
+
+        Parameters
+        ----------
+        array : ndarray
+            Array to test
+
+        Returns
+        -------
+        is_view : bool
+            True if array is a view on the used region of the buffer
+        """
+        return isinstance(array, np.ndarray) and array.ndim == 2 and array.shape == self.shape and \
+            array.strides == self._buffer.strides and array.dtype == self._buffer.dtype and \
+            array.__array_interface__["data"][0] == self._buffer.__array_interface__["data"][0]
+
+    def adopt(self, array):
+        """
+        Makes array the used region of the buffer (without copying) if it is not already a view on it. Arrays,
+        which were replaced outside of the buffer (e.g. by assignment of a new array), are taken over this way
+        before appending to them.
+
+        GrowableArray.adopt(array)
+
+        Parameters
+        ----------
+        array : ndarray [n_rows x n_cols]
+            Array to take over
+        """
+        if self._buffer is not None and self.is_view(array):
+            return
+
+        array = np.asarray(array)
+
+        if array.ndim != 2:
+            raise ValueError("GrowableArray requires a two-dimensional array (given: {}-dimensional)".format(
+                array.ndim))
+
+        self._buffer = array
+        self.shape = array.shape
+
+    def reserve(self, n_rows, n_cols):
+        """
+        Ensures a capacity of at least n_rows x n_cols. If the capacity is exceeded, it is (at least) doubled in the
+        exceeded dimension and the used region is copied to the new buffer.
+
+        GrowableArray.reserve(n_rows, n_cols)
+
+        Parameters
+        ----------
+        n_rows : int
+            Number of rows
+        n_cols : int
+            Number of columns
+        """
+        n_rows_capacity, n_cols_capacity = self._buffer.shape
+
+        if n_rows > n_rows_capacity or n_cols > n_cols_capacity:
+            if n_rows > n_rows_capacity:
+                n_rows_capacity = max(n_rows, 2 * n_rows_capacity)
+
+            if n_cols > n_cols_capacity:
+                n_cols_capacity = max(n_cols, 2 * n_cols_capacity)
+
+            buffer = np.empty((n_rows_capacity, n_cols_capacity), dtype=self._buffer.dtype)
+            buffer[:self.shape[0], :self.shape[1]] = self.data
+            self._buffer = buffer
+
+    def promote(self, dtype):
+        """
+        Converts the buffer to a data type, which can hold values of the current data type and dtype
+        (e.g. int to float).
+
+        GrowableArray.promote(dtype)
+
+        Parameters
+        ----------
+        dtype : str or np.dtype
+            Data type of the values to store
+        """
+        dtype = np.result_type(self._buffer.dtype, dtype)
+
+        if dtype != self._buffer.dtype:
+            self._buffer = self.data.astype(dtype)
+
+    def resize(self, n_rows, n_cols):
+        """
+        Enlarges the used region to n_rows x n_cols. The added entries are not initialized.
+
+        data = GrowableArray.resize(n_rows, n_cols)
+
+        Parameters
+        ----------
+        n_rows : int
+            Number of rows (>= current number of rows)
+        n_cols : int
+            Number of columns (>= current number of columns)
+
+        Returns
+        -------
+        data : ndarray [n_rows x n_cols]
+            Used region of the buffer
+        """
+        if n_rows < self.shape[0] or n_cols < self.shape[1]:
+            raise ValueError("GrowableArray can not be shrunk from {} to {}".format(self.shape, (n_rows, n_cols)))
+
+        self.reserve(n_rows, n_cols)
+        self.shape = (n_rows, n_cols)
+
+        return self.data
+
+    def append_rows(self, values):
+        """
+        Appends rows to the used region.
+
+        data = GrowableArray.append_rows(values)
+
+        Parameters
+        ----------
+        values : ndarray [n_rows_add x n_cols]
+            Rows to append
+
+        Returns
+        -------
+        data : ndarray [n_rows + n_rows_add x n_cols]
+            Used region of the buffer
+        """
+        values = np.atleast_2d(values)
+        n_rows = self.shape[0]
+        self.promote(values.dtype)
+
+        # the number of columns of an empty array is determined by the first rows
+        if n_rows == 0:
+            self.reserve(0, values.shape[1])
+            self.shape = (0, values.shape[1])
+
+        self.resize(n_rows + values.shape[0], self.shape[1])
+        self._buffer[n_rows:self.shape[0], :self.shape[1]] = values
+
+        return self.data
+
+    def append_cols(self, values):
+        """
+        Appends columns to the used region.
+
+        data = GrowableArray.append_cols(values)
+
+        Parameters
+        ----------
+        values : ndarray [n_rows x n_cols_add]
+            Columns to append
+
+        Returns
+        -------
+        data : ndarray [n_rows x n_cols + n_cols_add]
+            Used region of the buffer
+        """
+        values = np.reshape(values, (self.shape[0], -1)) if np.ndim(values) != 2 else values
+        n_cols = self.shape[1]
+        self.promote(values.dtype)
+
+        self.resize(self.shape[0], n_cols + values.shape[1])
+        self._buffer[:self.shape[0], n_cols:self.shape[1]] = values
+
+        return self.data
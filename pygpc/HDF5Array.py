@@ -0,0 +1,395 @@
+import h5py
+import numpy as np
+
+
+class HDF5Array(object):
+    """
+    Two-dimensional array stored out-of-core in a chunked and resizable dataset of an .hdf5 file. The file is only
+    opened during an access, such that the file can be accessed by other objects in between (e.g. the models
+    writing their results). Rows and columns are appended by resizing the dataset without rewriting it.
+
+    The array provides the interface of GrowableArray (data, adopt, resize, append_rows, append_cols), such that it
+    can replace the in-memory buffers of the gPC matrices and results. Indexing reads the selected entries from
+    the file (index arrays select rows and columns like np.ix_). Writing is limited to contiguous columns. NumPy
+    functions, which are applied to the array as a whole, read the complete dataset (np.array(HDF5Array)).
+    Performance critical operations iterate over row blocks (see get_blocks).
+
+    Parameters
+    ----------
+    fn : str
+        Filename of the .hdf5 file (created if not existing)
+    name : str
+        Name of the dataset in the .hdf5 file (opened if existing)
+    shape : tuple of int, optional, default: (0, 0)
+        Shape of the dataset if it is not existing
+    dtype : str or np.dtype, optional, default: "float64"
+        Data type of the dataset if it is not existing
+
+    Attributes
+    ----------
+    fn : str
+        Filename of the .hdf5 file
+    name : str
+        Name of the dataset in the .hdf5 file
+    shape : tuple of int
+        Shape of the dataset (n_rows, n_cols)
+    dtype : np.dtype
+        Data type of the dataset
+    """
+
+    def __init__(self, fn, name, shape=(0, 0), dtype="float64"):
+        """
+        Constructor; initializes the HDF5Array class
+        """
+        self.fn = fn
+        self.name = name
+
+        with h5py.File(self.fn, "a") as f:
+            if self.name not in f:
+                f.create_dataset(self.name, shape=shape, maxshape=(None, None), dtype=dtype, chunks=True)
+
+            self.shape = f[self.name].shape
+            self.dtype = f[self.name].dtype
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __array__(self, dtype=None, copy=None):
+        with h5py.File(self.fn, "r") as f:
+            data = f[self.name][()]
+
+        return data if dtype is None else data.astype(dtype, copy=False)
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        inputs = [np.asarray(i) if isinstance(i, HDF5Array) else i for i in inputs]
+
+        return getattr(ufunc, method)(*inputs, **kwargs)
+
+    def __getitem__(self, key):
+        # new axes (np.newaxis) are added after reading
+        if isinstance(key, tuple) and any(k is None for k in key):
+            data = self[tuple(k for k in key if k is not None)]
+            key_post = tuple(None if k is None else slice(None) for k in key
+                             if not isinstance(k, (int, np.integer)) and k is not Ellipsis)
+
+            return data[key_post]
+
+        rows, cols = self.get_key(key)
+        rows_h5, rows_post = self.get_selection(rows, self.shape[0])
+        cols_h5, cols_post = self.get_selection(cols, self.shape[1])
+
+        # h5py supports only one index array per selection: columns are selected after reading
+        if cols_post is not None or not isinstance(cols_h5, (slice, int, np.integer)):
+            cols_post = cols_h5 if cols_post is None else cols_h5[cols_post]
+            cols_h5 = slice(None)
+
+        with h5py.File(self.fn, "r") as f:
+            data = f[self.name][rows_h5, cols_h5]
+
+        if rows_post is not None:
+            data = data[rows_post]
+
+        if cols_post is not None:
+            data = data[..., cols_post]
+
+        return data
+
+    def __setitem__(self, key, value):
+        rows, cols = self.get_key(key)
+        rows_h5, rows_post = self.get_selection(rows, self.shape[0])
+        cols_h5, cols_post = self.get_selection(cols, self.shape[1])
+
+        if not isinstance(cols_h5, (slice, int, np.integer)) or \
+                (rows_post is not None and np.asarray(rows_h5).size != np.asarray(rows_post).size):
+            raise IndexError("HDF5Array only supports writing to contiguous columns and unique rows")
+
+        value = np.asarray(value, dtype=self.dtype)
+
+        # rows have to be written in increasing order
+        if rows_post is not None:
+            value_sorted = np.empty((len(rows_h5), ) + value.shape[1:], dtype=self.dtype)
+            value_sorted[rows_post] = value
+            value = value_sorted
+
+        with h5py.File(self.fn, "a") as f:
+            f[self.name][rows_h5, cols_h5] = value
+
+    def set_rows(self, i_start, values):
+        """
+        Writes rows starting at row i_start and enlarges the dataset if necessary.
+
+        data = HDF5Array.set_rows(i_start, values)
+
+        Parameters
+        ----------
+        i_start : int
+            Index of first row to write
+        values : ndarray [n_rows_set x n_cols]
+            Rows to write
+
+        Returns
+        -------
+        data : HDF5Array
+            The HDF5Array itself
+        """
+        values = np.atleast_2d(values)
+        n_rows = max(self.shape[0], i_start + values.shape[0])
+
+        if n_rows > self.shape[0] or values.shape[1] != self.shape[1]:
+            self.resize(n_rows, values.shape[1], shrink=self.shape[0] == 0)
+
+        self[i_start:i_start + values.shape[0], :] = values
+
+        return self
+
+    @property
+    def ndim(self):
+        return 2
+
+    @property
+    def size(self):
+        return self.shape[0] * self.shape[1]
+
+    @property
+    def data(self):
+        return self
+
+    @property
+    def capacity(self):
+        return self.shape
+
+    @staticmethod
+    def get_key(key):
+        """
+        Splits an index into the row and column index.
+
+        rows, cols = HDF5Array.get_key(key)
+
+        Parameters
+        ----------
+        key : index or tuple of index
+            Index of the array
+
+        Returns
+        -------
+        rows : index
+            Row index
+        cols : index
+            Column index
+        """
+        if not isinstance(key, tuple):
+            key = (key, )
+
+        key = [k for k in key if k is not Ellipsis]
+
+        return key[0] if len(key) > 0 else slice(None), key[1] if len(key) > 1 else slice(None)
+
+    @staticmethod
+    def get_selection(idx, n):
+        """
+        Converts an index of one dimension to a selection supported by h5py (int, slice or increasing array of int)
+        and the index, which has to be applied after reading to restore the requested order and duplicates.
+        Contiguous index arrays are converted to slices.
+
+        idx_h5, idx_post = HDF5Array.get_selection(idx, n)
+
+        Parameters
+        ----------
+        idx : int, slice, ndarray of int or ndarray of bool
+            Index
+        n : int
+            Size of the dimension
+
+        Returns
+        -------
+        idx_h5 : int, slice or ndarray of int
+            Selection of h5py
+        idx_post : ndarray of int or None
+            Index, which is applied to the read data (None if not required)
+        """
+        if idx is None or isinstance(idx, (slice, int, np.integer)):
+            return slice(None) if idx is None else idx, None
+
+        idx = np.asarray(idx)
+
+        if idx.dtype == bool:
+            idx = np.flatnonzero(idx)
+
+        idx = idx.flatten().astype(int) % max(n, 1)
+
+        if idx.size == 0:
+            return slice(0, 0), None
+
+        if np.all(np.diff(idx) == 1):
+            return slice(int(idx[0]), int(idx[-1]) + 1), None
+
+        idx_h5, idx_post = np.unique(idx, return_inverse=True)
+
+        if idx_h5.size == idx.size and np.all(idx_post == np.arange(idx.size)):
+            idx_post = None
+
+        return idx_h5, idx_post
+
+    def is_view(self, array):
+        """
+        Tests if array is this HDF5Array.
+
+        is_view = HDF5Array.is_view(array)
+
+        Parameters
+        ----------
+        array : ndarray or HDF5Array
+            Array to test
+
+        Returns
+        -------
+        is_view : bool
+            True if array is this HDF5Array
+        """
+        return array is self
+
+    def adopt(self, array):
+        """
+        Writes array to the dataset if it is not this HDF5Array (in row blocks of 1 GB).
+
+        HDF5Array.adopt(array)
+
+        Parameters
+        ----------
+        array : ndarray [n_rows x n_cols]
+            Array to take over
+        """
+        if self.is_view(array):
+            return
+
+        array = np.atleast_2d(array)
+        self.shape = (0, 0)
+        self.resize(array.shape[0], array.shape[1], shrink=True)
+
+        n_block = max(1, int(1024 ** 3 / (self.dtype.itemsize * max(array.shape[1], 1))))
+
+        for idx, block in get_blocks(array, n_block):
+            self[idx, :] = block
+
+    def reserve(self, n_rows, n_cols):
+        """
+        Does nothing (the chunked dataset is extended on demand). Provided for compatibility with GrowableArray.
+
+        HDF5Array.reserve(n_rows, n_cols)
+        """
+        pass
+
+    def promote(self, dtype):
+        """
+        Does nothing (values are converted to the data type of the dataset). Provided for compatibility with
+        GrowableArray.
+
+        HDF5Array.promote(dtype)
+        """
+        pass
+
+    def resize(self, n_rows, n_cols, shrink=False):
+        """
+        Resizes the dataset to n_rows x n_cols. The added entries are not initialized.
+
+        data = HDF5Array.resize(n_rows, n_cols, shrink=False)
+
+        Parameters
+        ----------
+        n_rows : int
+            Number of rows
+        n_cols : int
+            Number of columns
+        shrink : bool, optional, default: False
+            Allow to shrink the dataset
+
+        Returns
+        -------
+        data : HDF5Array
+            The HDF5Array itself
+        """
+        if not shrink and (n_rows < self.shape[0] or n_cols < self.shape[1]):
+            raise ValueError("HDF5Array can not be shrunk from {} to {}".format(self.shape, (n_rows, n_cols)))
+
+        with h5py.File(self.fn, "a") as f:
+            f[self.name].resize((n_rows, n_cols))
+
+        self.shape = (n_rows, n_cols)
+
+        return self
+
+    def append_rows(self, values):
+        """
+        Appends rows to the dataset.
+
+        data = HDF5Array.append_rows(values)
+
+        Parameters
+        ----------
+        values : ndarray [n_rows_add x n_cols]
+            Rows to append
+
+        Returns
+        -------
+        data : HDF5Array
+            The HDF5Array itself
+        """
+        values = np.atleast_2d(values)
+        n_rows = self.shape[0]
+        n_cols = values.shape[1] if n_rows == 0 else self.shape[1]
+
+        self.resize(n_rows + values.shape[0], n_cols, shrink=n_rows == 0)
+        self[n_rows:self.shape[0], :] = values
+
+        return self
+
+    def append_cols(self, values):
+        """
+        Appends columns to the dataset.
+
+        data = HDF5Array.append_cols(values)
+
+        Parameters
+        ----------
+        values : ndarray [n_rows x n_cols_add]
+            Columns to append
+
+        Returns
+        -------
+        data : HDF5Array
+            The HDF5Array itself
+        """
+        values = np.reshape(values, (self.shape[0], -1)) if np.ndim(values) != 2 else values
+        n_cols = self.shape[1]
+
+        self.resize(self.shape[0], n_cols + values.shape[1])
+        self[:, n_cols:self.shape[1]] = values
+
+        return self
+
+
+def get_blocks(array, n_block):
+    """
+    Generator, which iterates over blocks of subsequent rows of an ndarray or HDF5Array. Only the current block of
+    an HDF5Array is read into memory.
+
+    for idx, block in get_blocks(array, n_block):
+
+    Parameters
+    ----------
+    array : ndarray or HDF5Array [n_rows x n_cols]
+        Array
+    n_block : int
+        Number of rows per block
+
+    Yields
+    ------
+    idx : slice
+        Rows of the block
+    block : ndarray [n_block x n_cols]
+        Block of the array
+    """
+    for i_start in range(0, array.shape[0], max(n_block, 1)):
+        idx = slice(i_start, min(i_start + max(n_block, 1), array.shape[0]))
+
+        yield idx, np.asarray(array[idx])
@@ -0,0 +1,156 @@
+import numpy as np
+import scipy.linalg
+
+
+class IncrementalCholesky(object):
+    """
+    Cholesky factorization L @ L.T = A.T @ A + lambda * I of the (regularized) normal equations of the linear least
+    squares problem min ||A @ x - b||. The factorization is updated when rows (samples) or columns (basis functions)
+    are added to A instead of being recomputed:
+
+    - adding n_add rows costs O(n_cols^2 * n_add) (rank-n_add update of L by Householder reflections)
+    - adding n_add columns costs O(n_rows * n_cols * n_add) (bordering of L)
+
+    The pseudo-inverse of A is never formed.
+
+    Parameters
+    ----------
+    matrix : ndarray of float [n_rows x n_cols]
+        Matrix A of the least squares problem
+    regularization : float, optional, default: 0.
+        Tikhonov regularization parameter lambda (>= 0)
+
+    Attributes
+    ----------
+    L : ndarray of float [n_cols x n_cols]
+        Lower triangular Cholesky factor of A.T @ A + lambda * I
+    n_rows : int
+        Number of rows of A included in the factorization
+    n_cols : int
+        Number of columns of A included in the factorization
+    rows_id : list, optional
+        IDs of the rows of A included in the factorization (managed by the caller)
+    cols_id : list, optional
+        IDs of the columns of A included in the factorization (managed by the caller)
+    """
+
+    def __init__(self, matrix, regularization=0.):
+        """
+        Constructor; initializes the IncrementalCholesky class
+        """
+        self.regularization = regularization
+        self.rows_id = None
+        self.cols_id = None
+        self.n_rows = matrix.shape[0]
+        self.n_cols = matrix.shape[1]
+
+        gram = np.matmul(matrix.transpose(), matrix)
+        gram[np.diag_indices_from(gram)] += self.regularization
+
+        self.L = scipy.linalg.cholesky(gram, lower=True)
+
+    def get_cond(self):
+        """
+        Estimates the condition number of A.T @ A + lambda * I from the diagonal of the Cholesky factor
+        (lower bound of the condition number).
+
+        cond = IncrementalCholesky.get_cond()
+
+        Returns
+        -------
+        cond : float
+            Estimated condition number of the normal equations
+        """
+        diag = np.abs(np.diag(self.L))
+
+        if diag.size == 0:
+            return 1.
+
+        if np.min(diag) == 0:
+            return np.inf
+
+        return (np.max(diag) / np.min(diag)) ** 2
+
+    def add_rows(self, rows):
+        """
+        Adds rows to A and updates the Cholesky factor (L_new @ L_new.T = L @ L.T + rows.T @ rows).
+
+        IncrementalCholesky.add_rows(rows)
+
+        Parameters
+        ----------
+        rows : ndarray of float [n_add x n_cols]
+            Rows to add
+        """
+        w = np.array(rows, dtype=self.L.dtype).transpose()
+
+        # orthogonal transformation of [L, w] to [L_new, 0] column by column: in every step, row k of w is
+        # eliminated against the diagonal element L[k, k] by a Householder reflection
+        for k in range(self.n_cols):
+            norm_w = np.dot(w[k, :], w[k, :])
+
+            if norm_w == 0:
+                continue
+
+            alpha = np.sqrt(self.L[k, k] ** 2 + norm_w)
+
+            # Householder vector u = [L[k, k] - alpha, w[k, :]] (first element computed without cancellation)
+            u_0 = -norm_w / (self.L[k, k] + alpha) if self.L[k, k] > 0 else self.L[k, k] - alpha
+            beta = 2. / (u_0 ** 2 + norm_w)
+
+            s = beta * (self.L[k:, k] * u_0 + np.matmul(w[k:, :], w[k, :]))
+            self.L[k:, k] -= s * u_0
+            w[k:, :] -= np.outer(s, w[k, :])
+
+        self.n_rows += w.shape[1]
+
+    def add_cols(self, cols, matrix):
+        """
+        Adds columns to A and borders the Cholesky factor:
+
+        L_new = [[L, 0], [L_21, L_22]] with L_21 = (L^-1 @ A.T @ cols).T and
+        L_22 @ L_22.T = cols.T @ cols + lambda * I - L_21 @ L_21.T
+
+        IncrementalCholesky.add_cols(cols, matrix)
+
+        Parameters
+        ----------
+        cols : ndarray of float [n_rows x n_add]
+            Columns to add (values in the rows included in the factorization)
+        matrix : ndarray of float [n_rows x n_cols]
+            Matrix A (rows included in the factorization)
+        """
+        n_add = cols.shape[1]
+
+        gram_12 = np.matmul(matrix.transpose(), cols)
+        gram_22 = np.matmul(cols.transpose(), cols)
+        gram_22[np.diag_indices_from(gram_22)] += self.regularization
+
+        l_21 = scipy.linalg.solve_triangular(self.L, gram_12, lower=True).transpose()
+        l_22 = scipy.linalg.cholesky(gram_22 - np.matmul(l_21, l_21.transpose()), lower=True)
+
+        L = np.zeros((self.n_cols + n_add, self.n_cols + n_add), dtype=self.L.dtype)
+        L[:self.n_cols, :self.n_cols] = self.L
+        L[self.n_cols:, :self.n_cols] = l_21
+        L[self.n_cols:, self.n_cols:] = l_22
+
+        self.L = L
+        self.n_cols += n_add
+
+    def solve(self, rhs):
+        """
+        Solves the normal equations (A.T @ A + lambda * I) @ x = rhs.
+
+        x = IncrementalCholesky.solve(rhs)
+
+        Parameters
+        ----------
+        rhs : ndarray of float [n_cols (x n_out)]
+            Right hand side A.T @ b
+
+        Returns
+        -------
+        x : ndarray of float [n_cols (x n_out)]
+            Solution
+        """
+        return scipy.linalg.cho_solve((self.L, True), rhs)
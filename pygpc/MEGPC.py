@@ -17,6 +17,8 @@ from .Gradient import get_gradient
 from .ValidationSet import *
 from .Computation import *
 from .Classifier import *
+from .FrozenGPC import FrozenMEGPC
+from .FrozenGPC import get_normalization_constants
 from .Grid import *
 from .SGPC import *
 
@@ -55,6 +57,7 @@ class MEGPC(object):
         - 'Moore-Penrose' ... Pseudoinverse of gPC matrix (SGPC.Reg, EGPC)
         - 'OMP' ... Orthogonal Matching Pursuit, sparse recovery approach (SGPC.Reg, EGPC)
         - 'LarsLasso' ... {"alpha": float 0...1} Regularization parameter
+        - 'incremental-lstsq' ... Least squares solution with incrementally updated Cholesky factorization (SGPC.Reg)
         - 'NumInt' ... Numerical integration, spectral projection (SGPC.Quad)
     verbose: bool
         boolean value to determine if to print out the progress into the standard output
@@ -224,8 +227,10 @@ class MEGPC(object):
     def loocv(self, results, error_norm="relative", domain=None):
         """
         Perform leave-one-out cross validation of gPC approximation and add error value to self.relative_error_loocv.
-        The loocv error is calculated analytically after eq. (35) in [1] but omitting the "1 - " term, i.e. it
-        corresponds to 1 - Q^2.
+        For least squares solvers ('Moore-Penrose', 'incremental-lstsq'), the leave-one-out errors of all grid points
+        are determined exactly from the hat matrices of the sub-gPCs (see GPC.get_loocv_lstsq). For sparse solvers,
+        the sub-gPCs are cross validated according to their options "cv_mode", "cv_n_folds", ...
+        (see GPC.cross_validate).
 
         relative_error_loocv = GPC.loocv(sim_results, coeffs)
 
@@ -258,61 +263,42 @@ class MEGPC(object):
            for stochastic finite element analysis. Probabilistic Engineering Mechanics, 25(2), 183-197.
         """
 
-        n_loocv = 25
+        # exact leave-one-out errors of all grid points in case of least squares solutions
+        if self.options["solver"] in ["Moore-Penrose", "incremental-lstsq"]:
+            start = time.time()
+            settings = self.options["settings"] if self.options["settings"] is not None else dict()
+            regularization = settings["lambda"] if "lambda" in settings.keys() else 0.
+            relative_error = []
 
-        if domain is not None:
-            results_domain = copy.deepcopy(results[self.domains == domain, :])
-            domain_idx = copy.deepcopy(domain)
-        else:
-            results_domain = copy.deepcopy(results)
-
-        # define number of performed cross validations (max 25)
-        n_loocv_points = np.min((results_domain.shape[0], n_loocv))
-
-        # make list of indices, which are randomly sampled (this index is w.r.t. to all points if domain is None)
-        loocv_point_idx = random.sample(list(range(results_domain.shape[0])), n_loocv_points)
-
-        start = time.time()
-        relative_error = np.zeros(n_loocv_points)
-
-        for i in range(n_loocv_points):
-
-            if domain is None:
-                # determine domain of loocv point
-                domain_idx = int(self.classifier.predict(self.grid.coords_norm[loocv_point_idx[i]][np.newaxis, :]))
-                results_domain = results[self.domains == domain_idx, ]
-
-            # determine row in sub-gPC matrix of loocv point
-            loocv_point_idx_domain = np.sum(np.array(self.domains == domain_idx)[0:loocv_point_idx[i]])
+            for d in ([domain] if domain is not None else np.unique(self.domains)):
+                relative_error_domain = self.gpc[d].get_loocv_lstsq(matrix=self.gpc[d].gpc_matrix,
+                                                                    results=results[self.domains == d, :],
+                                                                    error_norm=error_norm,
+                                                                    regularization=regularization)
+                if relative_error_domain is None:
+                    break
 
-            # get mask of eliminated row
-            mask = np.arange(results_domain.shape[0]) != loocv_point_idx_domain
+                relative_error.append(relative_error_domain)
 
-            # select right gpc matrix
-            matrix = self.gpc[domain_idx].gpc_matrix
-
-            # determine gpc coefficients (this takes a lot of time for large problems)
-            coeffs_loo = self.gpc[domain_idx].solve(results=results_domain[mask, :],
-                                                    solver=self.options["solver"],
-                                                    matrix=matrix[mask, :],
-                                                    settings=self.options["settings"],
-                                                    verbose=False)
+            else:
+                relative_error_loocv = np.mean(np.hstack(relative_error))
+                iprint("LOOCV computation time: {} sec".format(time.time() - start), tab=0, verbose=True)
 
-            sim_results_temp = results_domain[loocv_point_idx_domain, :]
+                return relative_error_loocv
 
-            if error_norm == "relative":
-                norm = scipy.linalg.norm(sim_results_temp)
-            else:
-                norm = 1.
+        # cross validation of the sub-gPCs (sparse solvers)
+        start = time.time()
+        relative_error = []
 
-            # determine error
-            relative_error[i] = scipy.linalg.norm(sim_results_temp - np.matmul(matrix[loocv_point_idx_domain, :],
-                                                                            coeffs_loo)) \
-                                / norm
-            display_fancy_bar("LOOCV", int(i + 1), int(n_loocv_points))
+        for d in ([domain] if domain is not None else np.unique(self.domains)):
+            relative_error.append(self.gpc[d].cross_validate(matrix=self.gpc[d].gpc_matrix,
+                                                             results=results[self.domains == d, :],
+                                                             error_norm=error_norm,
+                                                             solver=self.options["solver"],
+                                                             settings=self.options["settings"]))
 
         # store result in relative_error_loocv
-        relative_error_loocv = np.mean(relative_error)
+        relative_error_loocv = np.mean(np.hstack(relative_error))
         iprint("LOOCV computation time: {} sec".format(time.time() - start), tab=0, verbose=True)
 
         return relative_error_loocv
@@ -557,7 +543,7 @@ class MEGPC(object):
         to self.basis.b_id and self.grid.coords_id. New rows and columns are computed when differences are found.
         """
         for i, gpc in enumerate(self.gpc):
-            gpc.update_gpc_matrix(gradient=gradient)
+            gpc.update_gpc_matrix()
 
     def save_gpc_matrices_hdf5(self):
         """
@@ -584,12 +570,18 @@ class MEGPC(object):
             - 'Moore-Penrose' ... Pseudoinverse of gPC matrix (SGPC.Reg, EGPC)
             - 'OMP' ... Orthogonal Matching Pursuit, sparse recovery approach (SGPC.Reg, EGPC)
             - 'LarsLasso' ... Least-Angle Regression using Lasso model (SGPC.Reg, EGPC)
+            - 'incremental-lstsq' ... Least squares solution with incrementally updated Cholesky factorization
+              (SGPC.Reg)
             - 'NumInt' ... Numerical integration, spectral projection (SGPC.Quad)
         settings : dict
             Solver settings
             - 'Moore-Penrose' ... None
             - 'OMP' ... {"n_coeffs_sparse": int} Number of gPC coefficients != 0 or "sparsity": float 0...1
+              {"joint": bool} Simultaneous OMP with common support of all output quantities (default: False),
+              {"n_out_block": int} Number of output quantities, whose correlations are determined at once (the
+              support is common to all output quantities, default: determined by options["memory_limit"])
             - 'LarsLasso' ... {"alpha": float 0...1} Regularization parameter
+            - 'incremental-lstsq' ... {"lambda": float, "cond_max": float} (optional)
             - 'NumInt' ... None
         verbose : bool
             boolean value to determine if to print out the progress into the standard output
@@ -698,6 +690,8 @@ class MEGPC(object):
             gradient_results = None
             gradient_idx = None
 
+        com.close()
+
         self.validation = ValidationSet(grid=grid,
                                         results=results,
                                         gradient_results=gradient_results,
@@ -895,7 +889,7 @@ class MEGPC(object):
                 x_passed = x[domains == d, :]
 
             # construct gPC gradient matrix [n_samples x n_basis x dim(_red)]
-            gpc_matrix_gradient = self.gpc[d].create_gpc_matrix(b=self.gpc[d].basis.b,
+            gpc_matrix_gradient = self.gpc[d].create_gpc_matrix(b=self.gpc[d].basis.multi_indices,
                                                                 x=x_passed,
                                                                 gradient=True,
                                                                 gradient_idx=np.arange(x_passed.shape[0]))
@@ -911,3 +905,36 @@ class MEGPC(object):
 
         return local_sens
 
+
+    def freeze(self, coeffs):
+        """
+        Creates a frozen multi-element gPC expansion from the frozen sub-gPCs (see SGPC.freeze) and the weights
+        of the classifier. It evaluates the gPC approximation without the Problem, Basis, BasisFunction and
+        scikit-learn objects (e.g. for serving).
+
+        frozen_megpc = MEGPC.freeze(coeffs)
+
+        Parameters
+        ----------
+        coeffs: list of ndarray of float [n_gpc][n_basis x n_out]
+            GPC coefficients of each sub-domain
+
+        Returns
+        -------
+        frozen_megpc: FrozenMEGPC object instance
+            Frozen multi-element gPC expansion
+        """
+        clf = self.classifier.clf
+
+        if type(clf).__name__ != "MLPClassifier":
+            raise NotImplementedError("Freezing is only implemented for MLPClassifier")
+
+        offset, scale = get_normalization_constants(self.problem.parameters_random)
+
+        return FrozenMEGPC(gpc=[gpc.freeze(coeffs[d]) for d, gpc in enumerate(self.gpc)],
+                           clf_coefs=clf.coefs_,
+                           clf_intercepts=clf.intercepts_,
+                           clf_classes=clf.classes_,
+                           clf_activation=clf.activation,
+                           offset=offset,
+                           scale=scale)
@@ -0,0 +1,185 @@
+import numpy as np
+from .misc import append_to_buffer
+
+
+class MultiIndexSet(object):
+    """
+    Set of multi-indices with hash based lookup. Each multi-index is packed into a fixed length byte key
+    (int16 per dimension), which is mapped to its position (column in the gPC matrix) in a dictionary. This
+    provides O(1) membership tests and lookups from multi-index to position, independent of the number of
+    multi-indices in the set.
+
+    Parameters
+    ----------
+    dim : int
+        Number of dimensions (random variables)
+    multi_indices : ndarray of int [n_multi_indices x dim], optional, default: None
+        Initial multi-indices (duplicates are skipped)
+
+    Attributes
+    ----------
+    dim : int
+        Number of dimensions (random variables)
+    multi_indices : ndarray of int16 [n_multi_indices x dim]
+        Multi-indices in the order they were added to the set
+    """
+
+    def __init__(self, dim, multi_indices=None):
+        """
+        Constructor; initializes the MultiIndexSet class
+        """
+        self.dim = dim
+        self.multi_indices = np.zeros((0, dim), dtype=np.int16)
+        self._buffer = None
+        self._index = dict()
+
+        if multi_indices is not None:
+            self.add(multi_indices)
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, multi_index):
+        return self.get_keys(multi_index)[0] in self._index
+
+    def get_keys(self, multi_indices):
+        """
+        Packs multi-indices into hashable byte keys.
+
+        keys = MultiIndexSet.get_keys(multi_indices)
+
+        Parameters
+        ----------
+        multi_indices : ndarray of int [n_multi_indices x dim] or [dim]
+            Multi-indices
+
+        Returns
+        -------
+        keys : list of bytes [n_multi_indices]
+            Keys of the multi-indices
+        """
+        multi_indices = np.ascontiguousarray(np.reshape(multi_indices, (-1, self.dim)), dtype=np.int16)
+
+        return multi_indices.view("S{}".format(2 * self.dim)).ravel().tolist()
+
+    def get_index(self, multi_indices):
+        """
+        Determines the positions of the multi-indices in the set.
+
+        idx = MultiIndexSet.get_index(multi_indices)
+
+        Parameters
+        ----------
+        multi_indices : ndarray of int [n_multi_indices x dim] or [dim]
+            Multi-indices
+
+        Returns
+        -------
+        idx : ndarray of int [n_multi_indices]
+            Positions of the multi-indices in the set (-1 if not contained)
+        """
+        return np.array([self._index.get(key, -1) for key in self.get_keys(multi_indices)], dtype=int)
+
+    def is_member(self, multi_indices):
+        """
+        Tests if the multi-indices are contained in the set.
+
+        mask = MultiIndexSet.is_member(multi_indices)
+
+        Parameters
+        ----------
+        multi_indices : ndarray of int [n_multi_indices x dim] or [dim]
+            Multi-indices
+
+        Returns
+        -------
+        mask : ndarray of bool [n_multi_indices]
+            True if the multi-index is contained in the set
+        """
+        return np.array([key in self._index for key in self.get_keys(multi_indices)], dtype=bool)
+
+    def difference(self, multi_indices):
+        """
+        Determines the multi-indices, which are not yet contained in the set (set difference).
+        The order of the multi-indices is kept and duplicates are skipped.
+
+        multi_indices_new = MultiIndexSet.difference(multi_indices)
+
+        Parameters
+        ----------
+        multi_indices : ndarray of int [n_multi_indices x dim]
+            Multi-indices
+
+        Returns
+        -------
+        multi_indices_new : ndarray of int [n_multi_indices_new x dim]
+            Multi-indices, which are not contained in the set
+        """
+        multi_indices = np.reshape(multi_indices, (-1, self.dim))
+        keys_seen = set()
+        idx = []
+
+        for i, key in enumerate(self.get_keys(multi_indices)):
+            if key not in self._index and key not in keys_seen:
+                keys_seen.add(key)
+                idx.append(i)
+
+        return multi_indices[np.array(idx, dtype=int), :]
+
+    def add(self, multi_indices):
+        """
+        Adds multi-indices to the set. Multi-indices, which are already contained, are skipped.
+
+        idx_added = MultiIndexSet.add(multi_indices)
+
+        Parameters
+        ----------
+        multi_indices : ndarray of int [n_multi_indices x dim]
+            Multi-indices to add
+
+        Returns
+        -------
+        idx_added : ndarray of int [n_added]
+            Indices of the rows of multi_indices, which were added to the set
+        """
+        multi_indices = np.reshape(multi_indices, (-1, self.dim))
+        n = len(self._index)
+        idx_added = []
+
+        for i, key in enumerate(self.get_keys(multi_indices)):
+            if key not in self._index:
+                self._index[key] = n + len(idx_added)
+                idx_added.append(i)
+
+        idx_added = np.array(idx_added, dtype=int)
+
+        if len(idx_added) > 0:
+            self._buffer = append_to_buffer(self._buffer, n * self.dim,
+                                            multi_indices[idx_added, :].astype(np.int16).ravel())
+            self.multi_indices = self._buffer[:len(self._index) * self.dim].reshape(-1, self.dim)
+
+        return idx_added
+
+    def union(self, multi_indices):
+        """
+        Determines the union of the set with the given multi-indices (the set itself is not modified).
+
+        multi_index_set = MultiIndexSet.union(multi_indices)
+
+        Parameters
+        ----------
+        multi_indices : ndarray of int [n_multi_indices x dim] or MultiIndexSet object
+            Multi-indices
+
+        Returns
+        -------
+        multi_index_set : MultiIndexSet object
+            Union of both sets (multi-indices of this set first)
+        """
+        if isinstance(multi_indices, MultiIndexSet):
+            multi_indices = multi_indices.multi_indices
+
+        multi_index_set = MultiIndexSet(dim=self.dim, multi_indices=self.multi_indices)
+        multi_index_set.add(multi_indices)
+
+        return multi_index_set
@@ -146,7 +146,7 @@ class Beta(RandomParameter):
         order: int
             Order of basis function
         """
-        return Jacobi({"i": order, "p": self.pdf_shape[0], "q": self.pdf_shape[1]})
+        return get_basis_function(Jacobi, {"i": order, "p": self.pdf_shape[0], "q": self.pdf_shape[1]})
 
     def pdf(self, x=None, a=None, b=None):
         """
@@ -293,7 +293,7 @@ class Norm(RandomParameter):
         order: int
             Order of basis function
         """
-        return Hermite({"i": order})
+        return get_basis_function(Hermite, {"i": order})
 
     def pdf(self, x=None):
         """
@@ -425,7 +425,7 @@ class Gamma(RandomParameter):
         order: int
             Order of basis function
         """
-        return Laguerre({"i": order, "alpha": self.pdf_shape[0]-1, "beta": self.pdf_shape[1]})
+        return get_basis_function(Laguerre, {"i": order, "alpha": self.pdf_shape[0]-1, "beta": self.pdf_shape[1]})
 
     def pdf(self, x=None):
         """
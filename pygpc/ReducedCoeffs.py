@@ -0,0 +1,217 @@
+import numpy as np
+
+
+class ReducedCoeffs(object):
+    """
+    gPC coefficients of output quantities, which were compressed by their principal components (output projection).
+    Instead of the full coefficient matrix [n_basis x n_out], the coefficients of the n_components principal
+    components and the projection to the output space are stored:
+
+    .. math:: \\mathbf{C} = \\mathbf{C}_{red} \\mathbf{V} + \\mathbf{e}_0 \\boldsymbol{\\mu}^T
+
+    The full coefficients are only determined on request (GPC.get_approximation, SGPC.get_mean, SGPC.get_std and
+    SGPC.get_sobol_indices work on the reduced coefficients). The object can be used like an ndarray of shape
+    [n_basis x n_out] (indexing, np.matmul, np.array) and is expanded to the requested columns in these cases.
+
+    Parameters
+    ----------
+    coeffs : ndarray of float [n_basis x n_components]
+        gPC coefficients of the principal components
+    components : ndarray of float [n_components x n_out]
+        Principal components (orthonormal rows) of the output quantities
+    mean : ndarray of float [n_out]
+        Mean of the output quantities the principal components were determined with
+
+    Attributes
+    ----------
+    coeffs : ndarray of float [n_basis x n_components]
+        gPC coefficients of the principal components
+    components : ndarray of float [n_components x n_out]
+        Principal components (orthonormal rows) of the output quantities
+    mean : ndarray of float [n_out]
+        Mean of the output quantities the principal components were determined with
+    """
+
+    def __init__(self, coeffs, components, mean):
+        """
+        Constructor; initializes the ReducedCoeffs class
+        """
+        self.coeffs = coeffs
+        self.components = components
+        self.mean = mean
+
+    def __len__(self):
+        return self.coeffs.shape[0]
+
+    def __array__(self, dtype=None, copy=None):
+        coeffs = self.expand()
+
+        return coeffs if dtype is None else coeffs.astype(dtype, copy=False)
+
+    def __getitem__(self, key):
+        if not isinstance(key, tuple):
+            key = (key, )
+
+        if len(key) == 1:
+            key = (key[0], slice(None))
+
+        return self.expand(output_idx=key[1])[key[0]]
+
+    def __rmatmul__(self, other):
+        return self.matmul(other)
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        if ufunc is np.matmul and method == "__call__" and len(inputs) == 2 and inputs[1] is self and \
+                not isinstance(inputs[0], ReducedCoeffs) and len(kwargs) == 0:
+            return self.matmul(inputs[0])
+
+        inputs = [np.asarray(i) if isinstance(i, ReducedCoeffs) else i for i in inputs]
+
+        return getattr(ufunc, method)(*inputs, **kwargs)
+
+    @property
+    def shape(self):
+        return self.coeffs.shape[0], self.components.shape[1]
+
+    @property
+    def ndim(self):
+        return 2
+
+    @property
+    def dtype(self):
+        return self.coeffs.dtype
+
+    @property
+    def n_components(self):
+        return self.components.shape[0]
+
+    def get_output_idx(self, output_idx=None):
+        """
+        Converts indices of output quantities to an index of the columns of the components.
+
+        output_idx = ReducedCoeffs.get_output_idx(output_idx=None)
+
+        Parameters
+        ----------
+        output_idx : int, slice or ndarray of int, optional, default: None
+            Indices of output quantities (Default: all)
+
+        Returns
+        -------
+        output_idx : int, slice or ndarray of int
+            Index of the columns of the components
+        """
+        if output_idx is None:
+            return slice(None)
+
+        if isinstance(output_idx, (slice, int, np.integer)):
+            return output_idx
+
+        return np.asarray(output_idx).flatten().astype(int)
+
+    def expand(self, output_idx=None):
+        """
+        Determines the full gPC coefficients of the output quantities.
+
+        coeffs = ReducedCoeffs.expand(output_idx=None)
+
+        Parameters
+        ----------
+        output_idx : int, slice or ndarray of int, optional, default: None
+            Indices of output quantities (Default: all)
+
+        Returns
+        -------
+        coeffs : ndarray of float [n_basis x n_out]
+            gPC coefficients
+        """
+        output_idx = self.get_output_idx(output_idx)
+
+        coeffs = np.matmul(self.coeffs, self.components[:, output_idx])
+        coeffs[0] += self.mean[output_idx]
+
+        return coeffs
+
+    def expand_results(self, results, output_idx=None):
+        """
+        Maps results of the principal components (e.g. gPC approximation with the reduced coefficients) to the
+        output quantities.
+
+        results = ReducedCoeffs.expand_results(results, output_idx=None)
+
+        Parameters
+        ----------
+        results : ndarray of float [n_grid x n_components]
+            Results of the principal components
+        output_idx : int, slice or ndarray of int, optional, default: None
+            Indices of output quantities (Default: all)
+
+        Returns
+        -------
+        results : ndarray of float [n_grid x n_out]
+            Results of the output quantities
+        """
+        output_idx = self.get_output_idx(output_idx)
+
+        return np.matmul(results, self.components[:, output_idx]) + self.mean[output_idx]
+
+    def matmul(self, matrix):
+        """
+        Determines matrix @ coeffs without expanding the coefficients
+        (matrix @ coeffs_red @ components + matrix[..., 0] * mean).
+
+        result = ReducedCoeffs.matmul(matrix)
+
+        Parameters
+        ----------
+        matrix : ndarray of float [(n_stack x) n_rows x n_basis]
+            Matrix (e.g. gPC matrix)
+
+        Returns
+        -------
+        result : ndarray of float [(n_stack x) n_rows x n_out]
+            Product of matrix and full gPC coefficients
+        """
+        matrix = np.asarray(matrix)
+
+        if matrix.ndim == 1:
+            return self.matmul(matrix[np.newaxis, :])[0]
+
+        return np.matmul(np.matmul(matrix, self.coeffs), self.components) + \
+            matrix[..., 0:1] * self.mean[np.newaxis, :]
+
+    def get_mean(self):
+        """
+        Determines the first gPC coefficient (mean) of the output quantities.
+
+        mean = ReducedCoeffs.get_mean()
+
+        Returns
+        -------
+        mean : ndarray of float [n_out]
+            First gPC coefficient of the output quantities
+        """
+        return np.matmul(self.coeffs[0], self.components) + self.mean
+
+    def get_sum_squares(self, basis_idx):
+        """
+        Determines the sum of the squared gPC coefficients of the given basis functions of all output quantities
+        in the reduced space by the Gram matrix of the reduced coefficients (e.g. partial variances). The first
+        basis function (mean) must not be included.
+
+        sum_squares = ReducedCoeffs.get_sum_squares(basis_idx)
+
+        Parameters
+        ----------
+        basis_idx : ndarray of int or bool [n_basis]
+            Indices or mask of the basis functions
+
+        Returns
+        -------
+        sum_squares : ndarray of float [n_out]
+            Sum of the squared gPC coefficients of the basis functions
+        """
+        coeffs = self.coeffs[basis_idx]
+        gram = np.matmul(coeffs.transpose(), coeffs)
+
+        return np.sum(self.components * np.matmul(gram, self.components), axis=0)
@@ -9,7 +9,10 @@ from .io import iprint, wprint
 from .misc import display_fancy_bar
 from .misc import get_array_unique_rows
 from .GPC import *
+from .ReducedCoeffs import ReducedCoeffs
 from .Basis import *
+from .FrozenGPC import FrozenGPC
+from .FrozenGPC import get_normalization_constants
 
 
 class SGPC(GPC):
@@ -118,7 +121,7 @@ class SGPC(GPC):
 
         Parameters
         ----------
-        coeffs : ndarray of float [n_basis x n_out], optional, default: None
+        coeffs : ndarray of float [n_basis x n_out] or ReducedCoeffs object, optional, default: None
             GPC coefficients
         samples : ndarray of float [n_samples x n_out], optional, default: None
             Model evaluations from gPC approximation
@@ -128,7 +131,10 @@ class SGPC(GPC):
         mean: ndarray of float [1 x n_out]
             Expected value of output quantities
         """
-        if coeffs is not None:
+        if isinstance(coeffs, ReducedCoeffs):
+            mean = coeffs.get_mean()
+
+        elif coeffs is not None:
             mean = coeffs[0, ]
 
         elif samples is not None:
@@ -150,7 +156,7 @@ class SGPC(GPC):
 
         Parameters
         ----------
-        coeffs: ndarray of float [n_basis x n_out], optional, default: None
+        coeffs: ndarray of float [n_basis x n_out] or ReducedCoeffs object, optional, default: None
             GPC coefficients
         samples : ndarray of float [n_samples x n_out], optional, default: None
             Model evaluations from gPC approximation
@@ -160,7 +166,10 @@ class SGPC(GPC):
         std: ndarray of float [1 x n_out]
             Standard deviation of output quantities
         """
-        if coeffs is not None:
+        if isinstance(coeffs, ReducedCoeffs):
+            std = np.sqrt(coeffs.get_sum_squares(basis_idx=slice(1, None)))
+
+        elif coeffs is not None:
             std = np.sqrt(np.sum(np.square(coeffs[1:]), axis=0))
 
         elif samples is not None:
@@ -183,8 +192,9 @@ class SGPC(GPC):
 
         Parameters
         ----------
-        coeffs:  ndarray of float [n_basis x n_out]
-            GPC coefficients
+        coeffs:  ndarray of float [n_basis x n_out] or ReducedCoeffs object
+            GPC coefficients (in case of ReducedCoeffs, the partial variances are determined from the coefficients
+            of the principal components)
         algorithm : str, optional, default: "standard"
             Algorithm to determine the Sobol indices
             - "standard": Sobol indices are determined from the gPC coefficients
@@ -237,8 +247,7 @@ class SGPC(GPC):
 
             # Generate boolean matrix of all basis functions where order > 0 = True
             # size: [n_basis x dim]
-            multi_indices = np.array([list(map(lambda _b:_b.p["i"], b_row)) for b_row in self.basis.b])
-            sobol_mask = multi_indices != 0
+            sobol_mask = self.basis.multi_indices != 0
 
             # look for unique combinations (i.e. available sobol combinations)
             # size: [N_sobol x dim]
@@ -262,7 +271,10 @@ class SGPC(GPC):
             sobol = np.zeros([n_sobol_available, n_out])
 
             for i_sobol in range(n_sobol_available):
-                sobol[i_sobol] = np.sum(np.square(coeffs[sobol_poly_idx[:, i_sobol] == 1]), axis=0)
+                if isinstance(coeffs, ReducedCoeffs):
+                    sobol[i_sobol] = coeffs.get_sum_squares(basis_idx=sobol_poly_idx[:, i_sobol] == 1)
+                else:
+                    sobol[i_sobol] = np.sum(np.square(coeffs[sobol_poly_idx[:, i_sobol] == 1]), axis=0)
 
             # sort sobol coefficients in descending order (w.r.t. first output only ...)
             idx_sort_descend_1st = np.argsort(sobol[:, 0], axis=0)[::-1]
@@ -299,15 +311,25 @@ class SGPC(GPC):
             for i_key, key in enumerate(problem_original.parameters_random.keys()):
                 coords_norm[:, i_key] = problem_original.parameters_random[key].icdf(coords_norm_01[:, i_key])
 
-            # run model evaluations
-            res = self.get_approximation(coeffs=coeffs, x=coords_norm)
+            if coeffs.ndim == 1:
+                coeffs = coeffs[:, np.newaxis]
+
+            # run model evaluations and determine sobol indices for blocks of output quantities
+            # such that the model evaluations of one block fit into the memory limit
+            n_out_block = self.get_n_block(n_cols=coords_norm.shape[0])
+            sobol = []
+
+            for i_out in range(0, coeffs.shape[1], n_out_block):
+                res = self.get_approximation(coeffs=coeffs[:, i_out:(i_out + n_out_block)], x=coords_norm)
+
+                sobol_block, sobol_idx, sobol_idx_bool = get_sobol_indices_saltelli(y=res,
+                                                                                    dim=dim,
+                                                                                    calc_second_order=True,
+                                                                                    num_resamples=100,
+                                                                                    conf_level=0.95)
+                sobol.append(sobol_block)
 
-            # determine sobol indices
-            sobol, sobol_idx, sobol_idx_bool = get_sobol_indices_saltelli(y=res,
-                                                                          dim=dim,
-                                                                          calc_second_order=True,
-                                                                          num_resamples=100,
-                                                                          conf_level=0.95)
+            sobol = np.hstack(sobol)
 
             # sort
             idx = np.flip(np.argsort(sobol[:, 0], axis=0))
@@ -354,8 +376,13 @@ class SGPC(GPC):
             b_int_global = np.zeros([self.problem.dim, self.basis.n_basis])
 
             # construct matrix with integral expressions [n_basis x dim]
-            b_int = np.array([list(map(lambda _b: _b.fun_int, b_row)) for b_row in self.basis.b])
-            b_int_der = np.array([list(map(lambda _b: _b.fun_der_int, b_row)) for b_row in self.basis.b])
+            b_int = np.zeros([self.basis.n_basis, self.problem.dim])
+            b_int_der = np.zeros([self.basis.n_basis, self.problem.dim])
+
+            for i_dim in range(self.problem.dim):
+                bf = self.basis.get_univariate_basis_functions(i_dim, np.max(self.basis.multi_indices[:, i_dim]))
+                b_int[:, i_dim] = np.array([_bf.fun_int for _bf in bf])[self.basis.multi_indices[:, i_dim]]
+                b_int_der[:, i_dim] = np.array([_bf.fun_der_int for _bf in bf])[self.basis.multi_indices[:, i_dim]]
 
             for i_sens in range(self.problem.dim):
                 # replace column with integral expressions from derivative of parameter[i_dim]
@@ -432,7 +459,7 @@ class SGPC(GPC):
             x = np.matmul(x, self.p_matrix.transpose() / self.p_matrix_norm[np.newaxis, :])
 
         # construct gPC gradient matrix [n_samples x n_basis x dim(_red)]
-        gpc_matrix_gradient = self.create_gpc_matrix(b=self.basis.b,
+        gpc_matrix_gradient = self.create_gpc_matrix(b=self.basis.multi_indices,
                                                      x=x,
                                                      gradient=True,
                                                      gradient_idx=np.arange(x.shape[0]))
@@ -445,6 +472,62 @@ class SGPC(GPC):
 
         return local_sens
 
+    def freeze(self, coeffs):
+        """
+        Creates a frozen gPC expansion, which only contains the multi-indices, the recurrence coefficients of the
+        polynomials, the normalization constants, the projection matrix and the gPC coefficients. It evaluates the
+        gPC approximation without the Problem, Basis and BasisFunction objects (e.g. for serving).
+
+        frozen_gpc = SGPC.freeze(coeffs)
+
+        Parameters
+        ----------
+        coeffs: ndarray of float [n_basis x n_out]
+            GPC coefficients
+
+        Returns
+        -------
+        frozen_gpc: FrozenGPC object instance
+            Frozen gPC expansion
+        """
+        multi_indices = self.basis.multi_indices.astype(int)
+        order_max = np.max(multi_indices, axis=0)
+
+        psi_0 = np.zeros(self.problem.dim)
+        a = np.zeros((self.problem.dim, np.max(order_max)))
+        b = np.zeros((self.problem.dim, np.max(order_max)))
+        c = np.zeros((self.problem.dim, np.max(order_max)))
+
+        # the recurrence coefficients only depend on the polynomial family of the parameter
+        for i_dim in range(self.problem.dim):
+            psi_0[i_dim], a[i_dim, :order_max[i_dim]], b[i_dim, :order_max[i_dim]], c[i_dim, :order_max[i_dim]] = \
+                self.basis.get_univariate_basis_function(i_dim, 0).get_recurrence_coeffs(order_max[i_dim])
+
+        # gPC boundaries of the normalized coordinates
+        x_min = np.array([self.problem.parameters_random[key].pdf_limits_norm[0]
+                          for key in self.problem.parameters_random.keys()])
+        x_max = np.array([self.problem.parameters_random[key].pdf_limits_norm[1]
+                          for key in self.problem.parameters_random.keys()])
+
+        if self.p_matrix is not None:
+            offset, scale = get_normalization_constants(self.problem_original.parameters_random)
+            projection = self.p_matrix.transpose() / self.p_matrix_norm[np.newaxis, :]
+        else:
+            offset, scale = get_normalization_constants(self.problem.parameters_random)
+            projection = None
+
+        return FrozenGPC(multi_indices=multi_indices,
+                         psi_0=psi_0,
+                         a=a,
+                         b=b,
+                         c=c,
+                         coeffs=np.array(coeffs, dtype=float),
+                         offset=offset,
+                         scale=scale,
+                         x_min=x_min,
+                         x_max=x_max,
+                         projection=projection)
+
 
 class Reg(SGPC):
     """
@@ -504,11 +587,16 @@ class Reg(SGPC):
         Solver to determine the gPC coefficients
         - 'Moore-Penrose' ... Pseudoinverse of gPC matrix (SGPC.Reg, EGPC)
         - 'OMP' ... Orthogonal Matching Pursuit, sparse recovery approach (SGPC.Reg, EGPC)
+        - 'incremental-lstsq' ... Least squares solution with incrementally updated Cholesky factorization (SGPC.Reg)
         - 'NumInt' ... Numerical integration, spectral projection (SGPC.Quad)
     settings: dict
         Solver settings
         - 'Moore-Penrose' ... None
         - 'OMP' ... {"n_coeffs_sparse": int} Number of gPC coefficients != 0
+          {"joint": bool} Simultaneous OMP with common support of all output quantities (default: False),
+          {"n_out_block": int} Number of output quantities, whose correlations are determined at once (the
+          support is common to all output quantities, default: determined by options["memory_limit"])
+        - 'incremental-lstsq' ... {"lambda": float, "cond_max": float} (optional)
         - 'NumInt' ... None
     """
 
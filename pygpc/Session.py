@@ -114,9 +114,11 @@ class Session(object):
     def run(self):
         """
         Runs the gPC session by calling the algorithm and saves the Session object
-        in .hdf5 results file in the "session/" folder or as .pkl file
+        in .hdf5 results file in the "session/" folder or as .pkl file. The worker pools are shared by all phases
+        of the algorithm (see PoolRegistry).
         """
-        gpc, coeffs, results = self.algorithm.run()
+        with PoolRegistry():
+            gpc, coeffs, results = self.algorithm.run()
         self.set_gpc(gpc)
 
         if type(coeffs) is list and not self.qoi_specific:
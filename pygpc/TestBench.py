@@ -81,7 +81,6 @@ class TestBench(object):
         # Setting up parallelization (setup thread pool)
         n_cpu_available = multiprocessing.cpu_count()
         self.n_cpu = min(n_cpu, n_cpu_available)
-        self.pool = multiprocessing.Pool(n_cpu)
         self.run_test_partial = partial(run_test)
 
         if "seed" not in list(options.keys()):
@@ -134,9 +133,8 @@ class TestBench(object):
 
         # for session in session_list:
         #     run_test(session)
-        session_list = self.pool.map(self.run_test_partial, session_list)
-        self.pool.close()
-        self.pool.join()
+        with PoolRegistry():
+            session_list = PoolRegistry.get(self.n_cpu).map(self.run_test_partial, session_list)
 
         # transform session list back to dict
         for i, key in enumerate(self.session_keys):
@@ -186,8 +184,6 @@ class TestBench(object):
         for f in glob.glob(os.path.join(self.fn_results, "*.pdf")):
             os.remove(f)
 
-        del self.pool
-
         # save TestBench object
         print("Saving testbench.pkl object ...")
         write_session_pkl(self, os.path.join(self.fn_results, "testbench.pkl"))
@@ -1,24 +1,298 @@
 import time
+import pickle
 import numpy as np
+from collections import OrderedDict
 from .misc import list2dict
 
 
-def init(queue):
+def init(queue, task_counter=None, lock=None, registry=None, n_models_max=8):
     """
     This is a wrapper script to be called by the 'multiprocessing.map' function
     to calculate the model functions in parallel.
 
     This function will be called upon initialization of the process.
     It sets a global variable denoting the ID of this process that can
-    be read by any function of this process
+    be read by any function of this process. The objects shared by all processes of the pool
+    (global task counter, lock and registry of the installed models) are stored in global variables as well,
+    such that they are not transferred with every task.
 
     Parameters
     ----------
     queue : multiprocessing.Queue
              the queue object that manages the unique IDs of the process pool
+    task_counter : multiprocessing.Value, optional, default: None
+        Global counter used by all processes to keep track of the progress
+    lock : multiprocessing.RLock, optional, default: None
+        Lock to synchronize read/write access to serialized results
+    registry : dict, optional, default: None
+        Shared dictionary containing the pickled models and problem parameters (keys: installation keys)
+    n_models_max : int, optional, default: 8
+        Maximum number of models and problem parameters kept in the process
     """
-    global process_id
+    global process_id, global_task_counter, global_lock, model_registry, models, models_max
     process_id = queue.get()
+    global_task_counter = task_counter
+    global_lock = lock
+    model_registry = registry
+    models = OrderedDict()
+    models_max = n_models_max
+
+
+def get_installed(key):
+    """
+    Returns the model and the problem parameters installed with key. They are loaded from the registry at their
+    first use and kept in the process. If more than n_models_max models are kept, the least recently used one is
+    removed.
+
+    model, parameters, parameters_random_keys = get_installed(key)
+
+    Parameters
+    ----------
+    key : str
+        Installation key of the model and problem
+
+    Returns
+    -------
+    model : Model object
+        Model object instance (without instance state, see WorkerPool.install)
+    parameters : OrderedDict
+        Parameters of the problem (constant and random)
+    parameters_random_keys : list of str
+        Names of the random parameters
+    """
+    if key in models:
+        models.move_to_end(key)
+    else:
+        models[key] = pickle.loads(model_registry[key])
+
+        while len(models) > models_max:
+            models.popitem(last=False)
+
+    return models[key]
+
+
+def get_parameters(parameters, parameters_random_keys, coords):
+    """
+    Replaces the random parameters of a problem with the coordinates of a grid point.
+
+    p = get_parameters(parameters, parameters_random_keys, coords)
+
+    Parameters
+    ----------
+    parameters : OrderedDict
+        Parameters of the problem (constant and random)
+    parameters_random_keys : list of str
+        Names of the random parameters
+    coords : ndarray of float [n_dim]
+        Coordinates of the grid point (only the random parameters)
+
+    Returns
+    -------
+    p : OrderedDict
+        Parameters of the model with the random parameters replaced by the coordinates
+    """
+    p = OrderedDict()
+
+    for key in parameters:
+        p[key] = parameters[key]
+
+    for i in range(0, len(coords)):
+        p[parameters_random_keys[i]] = np.array([coords[i]])
+
+    return p
+
+
+def get_parameters_vectorized(parameters, parameters_random_keys, coords):
+    """
+    Replaces the random parameters of a problem with the coordinates of several grid points (vectorized model
+    evaluation). The constant parameters are copied for every grid point.
+
+    p = get_parameters_vectorized(parameters, parameters_random_keys, coords)
+
+    Parameters
+    ----------
+    parameters : OrderedDict
+        Parameters of the problem (constant and random)
+    parameters_random_keys : list of str
+        Names of the random parameters
+    coords : ndarray of float [n_grid x n_dim]
+        Coordinates of the grid points (only the random parameters)
+
+    Returns
+    -------
+    p : OrderedDict
+        Parameters of the model with the random parameters replaced by the coordinates
+    """
+    p = OrderedDict()
+    n_grid = coords.shape[0]
+
+    for key in parameters:
+
+        if key in parameters_random_keys:
+            # replace RandomParameters with grid points
+            p[key] = coords[:, parameters_random_keys.index(key)]
+
+        else:
+            # copy constant parameters n_grid times
+            if type(parameters[key]) == float or parameters[key].size == 1:
+                p[key] = parameters[key] * np.ones(n_grid)
+            else:
+                if str(type(parameters[key])) == "<class 'matlab.engine.matlabengine.MatlabEngine'>":
+                    p[key] = parameters[key]
+                else:
+                    p[key] = np.tile(parameters[key], (n_grid, 1))
+
+    return p
+
+
+def run_installed(task):
+    """
+    Worker function of a process of a WorkerPool. The model and the problem parameters are loaded from the registry
+    at their first use and kept in the process.
+
+    seq_number, res = run_installed(task)
+
+    Parameters
+    ----------
+    task : tuple of (str, dict)
+        Installation key of the model and problem and the context of the simulation
+        (see AbstractModel.set_parameters)
+
+    Returns
+    -------
+    seq_number : int
+        Sequence number of the task
+    res : ndarray of float [1 x n_out]
+        Results of the simulation
+    """
+    key, context = task
+    model, parameters, parameters_random_keys = get_installed(key)
+
+    context['global_task_counter'] = global_task_counter
+    context['lock'] = global_lock
+
+    p = get_parameters(parameters=parameters, parameters_random_keys=parameters_random_keys,
+                       coords=context['coords'][0])
+
+    return run(obj=model.__copy__().set_parameters(p=p, context=context))
+
+
+def run_installed_vectorized(task):
+    """
+    Worker function of a process of a WorkerPool, which evaluates a chunk of grid points by one call of the
+    (vectorized) model. The model and the problem parameters are loaded from the registry at their first use.
+
+    seq_number, res = run_installed_vectorized(task)
+
+    Parameters
+    ----------
+    task : tuple of (str, dict)
+        Installation key of the model and problem and the context of the simulations (see
+        AbstractModel.set_parameters, i_grid is the range [min_idx, max_idx] of the chunk)
+
+    Returns
+    -------
+    seq_number : int
+        Sequence number of the task
+    res : ndarray of float [n_chunk x n_out]
+        Results of the simulations
+    """
+    key, context = task
+    model, parameters, parameters_random_keys = get_installed(key)
+
+    context['global_task_counter'] = global_task_counter
+    context['lock'] = global_lock
+
+    p = get_parameters_vectorized(parameters=parameters, parameters_random_keys=parameters_random_keys,
+                                  coords=context['coords'])
+
+    return run(obj=model.__copy__().set_parameters(p=p, context=context))
+
+
+def attach_shared_array(descriptor):
+    """
+    Attaches an array in shared memory created by Computation.create_shared_array.
+
+    shm, array = attach_shared_array(descriptor)
+
+    Parameters
+    ----------
+    descriptor : tuple of (str, tuple of int, str)
+        Name of the block of shared memory, shape and data type of the array
+
+    Returns
+    -------
+    shm : multiprocessing.shared_memory.SharedMemory
+        Block of shared memory (has to be closed after use)
+    array : ndarray
+        Array in the block of shared memory
+    """
+    from multiprocessing import shared_memory
+
+    name, shape, dtype = descriptor
+    shm = shared_memory.SharedMemory(name=name)
+
+    return shm, np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+
+
+def run_shared_memory(task):
+    """
+    Worker function of a process of a WorkerPool, which evaluates a range of grid points stored in shared memory.
+    The results are written to the results array in shared memory. If no results array is given (number of output
+    quantities not known yet), the results are returned.
+
+    res = run_shared_memory(task)
+
+    Parameters
+    ----------
+    task : tuple of (str, dict, int, int, dict)
+        Installation key of the model and problem, descriptors of the shared arrays ("coords", "coords_norm" and
+        "results", see attach_shared_array), index of the first and last (exclusive) grid point and the context
+        common to all simulations
+
+    Returns
+    -------
+    res : ndarray of float [n_range x n_out] or None
+        Results of the simulations (None if they were written to shared memory)
+    """
+    key, buffers, i_start, i_stop, context = task
+    shm = dict()
+    arrays = dict()
+
+    for name in buffers:
+        if buffers[name] is not None:
+            shm[name], arrays[name] = attach_shared_array(buffers[name])
+
+    try:
+        res = []
+
+        for j in range(i_start, i_stop):
+            context_j = dict(context)
+            context_j['seq_number'] = j
+            context_j['i_grid'] = context['i_grid'] + j if context['increment_grid'] else context['i_grid']
+            context_j['coords'] = np.array(arrays['coords'][j, :])[np.newaxis, :]
+
+            if "coords_norm" in arrays:
+                context_j['coords_norm'] = np.array(arrays['coords_norm'][j, :])[np.newaxis, :]
+            else:
+                context_j['coords_norm'] = None
+
+            del context_j['increment_grid']
+
+            res_j = np.asarray(run_installed((key, context_j))[1]).reshape(1, -1)
+
+            if "results" in arrays:
+                arrays['results'][j, :] = res_j
+            else:
+                res.append(res_j)
+
+    finally:
+        # the arrays have to be released before the shared memory can be closed
+        arrays.clear()
+        for name in shm:
+            shm[name].close()
+
+    return np.vstack(res) if len(res) > 0 else None
 
 
 def run(obj, matlab_engine=None):
@@ -51,6 +325,21 @@ def run(obj, matlab_engine=None):
     end_time = 0
     skip_sim = True
 
+    # look up grid points, which were simulated before at another position or by another session (EvaluationCache)
+    cache = getattr(obj, "evaluation_cache", None)
+
+    if cache is not None and (res is None or not np.any(res)):
+        cache_keys = cache.get_keys(obj)
+        res_cached = cache.read(cache_keys)
+
+        if res_cached is not None:
+            res = res_cached
+
+            obj.write_results(data_dict={"grid/coords": obj.coords,
+                                         "grid/coords_norm": obj.coords_norm,
+                                         "model_evaluations/results": res})
+            skip_sim = False
+
     # skip if there was no data row for that i_grid or if it was prematurely inserted (= all zero)
     if res is None or not np.any(res):
         start_time = time.time()
@@ -107,6 +396,9 @@ def run(obj, matlab_engine=None):
 
         end_time = time.time()
 
+        if cache is not None:
+            cache.write(cache_keys, res)
+
         obj.write_results(data_dict=data_dict)
         skip_sim = False
 
@@ -7,6 +7,7 @@ import pygpc.BasisFunction
 import pygpc.Worker
 import pygpc.Grid
 import pygpc.sobol_saltelli
+import pygpc.serve
 from .io import *
 from .misc import *
 from .Test import *
@@ -20,3 +21,10 @@ from .RandomParameter import *
 from .test_utils import *
 from .Session import *
 from .Gradient import *
+from .FrozenGPC import *
+from .MultiIndexSet import *
+from .GrowableArray import *
+from .IncrementalCholesky import *
+from .ReducedCoeffs import *
+from .HDF5Array import *
+from .EvaluationCache import *
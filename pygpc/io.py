@@ -413,9 +413,23 @@ def read_basis_from_hdf5(fn_hdf5, folder, verbose=False):
     # initialize basis
     basis = b(**args_dict)
 
-    # write content in self
+    # the basis is stored by its multi-indices and polynomial families (all other attributes are derived from them)
+    if "b" not in basis_dict:
+        # empty shape parameters (e.g. Hermite) are read as None
+        for family in basis_dict["families"]:
+            if family["p"] is None:
+                family["p"] = dict()
+
+        basis.__setstate__({key: basis_dict[key] for key in basis_dict if key not in ["attrs", "b_id"]})
+        basis.b_id = [uuid.uuid4() for _ in range(basis.n_basis)]
+
+        return basis
+
+    # files written by earlier versions contain the BasisFunction objects
+    # write content in self (the coefficient arrays and the multi-index set are rebuilt from b by extend_basis)
     for key in basis_dict:
-        if key != "b":
+        if key not in ["b", "b_id", "b_array", "b_array_grad", "b_array_offset", "b_array_grad_offset",
+                       "multi_indices", "multi_index_set"] and not key.startswith("_"):
             setattr(basis, key,  basis_dict[key])
 
     b = [[0 for _ in range(basis_dict["dim"])] for _ in range(basis_dict["n_basis"])]
@@ -783,6 +797,30 @@ def read_array_from_hdf5(fn_hdf5, arr_name, verbose=False):
     return data
 
 
+def get_state(obj):
+    """
+    Returns the attributes of an object to write in an .hdf5 file. pygpc classes can reduce their state to the
+    essential attributes by defining __getstate__ (e.g. Basis), all other objects are written with their __dict__.
+
+    state = get_state(obj)
+
+    Parameters
+    ----------
+    obj : object
+        Object to write
+
+    Returns
+    -------
+    state : dict
+        Attributes of the object
+    """
+    if type(obj).__module__.split(".")[0] == "pygpc" and \
+            getattr(type(obj), "__getstate__", None) is not getattr(object, "__getstate__", None):
+        return obj.__getstate__()
+
+    return obj.__dict__
+
+
 def write_dict_to_hdf5(fn_hdf5, data, folder, verbose=False):
     """
     Takes dict and passes its keys to write_arr_to_hdf5()
@@ -823,13 +861,15 @@ def write_dict_to_hdf5(fn_hdf5, data, folder, verbose=False):
                 f[str(folder)].attrs.__setitem__("dtype", dt)
 
             # write content
-            for key in data.__dict__:
+            state = get_state(data)
+
+            for key in state:
                 if len(folder.split("/")) >= max_recursion_depth:
-                    data.__dict__[key] = "None"
+                    state[key] = "None"
 
                 write_arr_to_hdf5(fn_hdf5=fn_hdf5,
                                   arr_name=folder+"/"+key,
-                                  data=data.__dict__[key],
+                                  data=state[key],
                                   verbose=verbose)
 
     # mappingproxy (can not be saved)
@@ -954,7 +994,7 @@ def write_arr_to_hdf5(fn_hdf5, arr_name, data, overwrite_arr=True,verbose=False)
                 f[str(arr_name)].attrs.__setitem__("dtype", dt)
 
             write_dict_to_hdf5(fn_hdf5=fn_hdf5,
-                               data=data.__dict__,
+                               data=get_state(data),
                                folder=arr_name,
                                verbose=verbose)
             return
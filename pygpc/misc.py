@@ -1,4 +1,5 @@
 import numpy as np
+import scipy.linalg
 import scipy.special
 import scipy.stats
 import scipy.spatial
@@ -514,34 +515,11 @@ def get_num_coeffs_sparse(order_dim_max, order_glob_max, order_inter_max, dim, o
     if order_dim_max.size == 1:
         order_dim_max = order_dim_max * np.ones(dim)
 
-    # generate multi-index list up to maximum order
-    if dim == 1:
-        poly_idx = np.array([np.linspace(0, order_dim_max[0], int(order_dim_max[0] + 1))]).astype(int).transpose()
-    else:
-        poly_idx = get_multi_indices(order=order_dim_max,
-                                     order_max=order_glob_max,
-                                     interaction_order=order_inter_max,
-                                     order_max_norm=order_glob_max_norm,
-                                     interaction_order_current=order_inter_current)
-
-    for i_dim in range(dim):
-        # add multi-indexes to list when not yet included
-        if order_dim_max[i_dim] > order_glob_max:
-            poly_add_dim = np.linspace(order_glob_max + 1,
-                                       order_dim_max[i_dim],
-                                       order_dim_max[i_dim] - (order_glob_max + 1) + 1)
-            poly_add_all = np.zeros([poly_add_dim.shape[0], dim])
-            poly_add_all[:, i_dim] = poly_add_dim
-            poly_idx = np.vstack([poly_idx, poly_add_all.astype(int)])
-
-        # delete multi-indexes from list when they exceed individual max order of parameter
-        elif order_dim_max[i_dim] < order_glob_max:
-            poly_idx = poly_idx[poly_idx[:, i_dim] <= order_dim_max[i_dim], :]
-
-    # Consider interaction order (filter out multi-indices exceeding it)
-    poly_idx = poly_idx[np.sum(poly_idx > 0, axis=1) <= order_inter_max, :]
-
-    return poly_idx.shape[0]
+    return get_num_multi_indices(order=[int(o) for o in order_dim_max],
+                                 order_max=order_glob_max,
+                                 interaction_order=order_inter_max,
+                                 order_max_norm=order_glob_max_norm,
+                                 interaction_order_current=order_inter_current)
 
 
 def get_pdf_beta(x, p, q, a, b):
@@ -575,6 +553,202 @@ def get_pdf_beta(x, p, q, a, b):
             * (b - a) ** (p + q - 1)) ** (-1) * (x - a) ** (p - 1) * (b - x) ** (q - 1)
 
 
+def append_to_buffer(buffer, n_used, values):
+    """
+    Appends values to a preallocated 1D buffer. If the capacity of the buffer is exceeded, a new buffer with
+    (at least) twice the capacity is allocated, such that appending costs amortized O(len(values)).
+
+    buffer = append_to_buffer(buffer, n_used, values)
+
+    Parameters
+    ----------
+    buffer : ndarray [n_capacity] or None
+        Buffer to append values to (None initializes a new buffer)
+    n_used : int
+        Number of used entries in buffer
+    values : ndarray [n_values]
+        Values to append
+
+    Returns
+    -------
+    buffer : ndarray [n_capacity_new]
+        Buffer containing the values at [n_used:n_used+n_values] (may be a new object)
+    """
+    n_new = n_used + len(values)
+
+    if buffer is None or n_new > buffer.shape[0]:
+        n_capacity = 0 if buffer is None else buffer.shape[0]
+        buffer_new = np.empty(max(n_new, 2 * n_capacity), dtype=values.dtype)
+
+        if buffer is not None:
+            buffer_new[:n_used] = buffer[:n_used]
+
+        buffer = buffer_new
+
+    buffer[n_used:n_new] = values
+
+    return buffer
+
+
+def get_cv_folds(n_samples, mode="loo", n_folds=25, test_ratio=0.1, seed=None):
+    """
+    Determines the indices of the test samples of the folds of a cross validation.
+
+    folds = get_cv_folds(n_samples, mode="loo", n_folds=25, test_ratio=0.1, seed=None)
+
+    Parameters
+    ----------
+    n_samples : int
+        Number of samples
+    mode : str, optional, default: "loo"
+        Cross validation mode
+        - "loo" ... leave-one-out of n_folds randomly selected samples
+        - "kfold" ... n_folds disjoint folds of randomly permuted samples (every sample is tested once)
+        - "subsample" ... n_folds random subsets containing test_ratio * n_samples samples (repeated subsampling)
+    n_folds : int, optional, default: 25
+        Number of folds (limited to n_samples in case of "loo" and "kfold")
+    test_ratio : float, optional, default: 0.1
+        Ratio of test samples of every fold in case of "subsample"
+    seed : int, optional, default: None
+        Seed of the random number generator (deterministic folds)
+
+    Returns
+    -------
+    folds : list of ndarray of int [n_folds][n_test]
+        Indices of the test samples of the folds
+    """
+    rng = np.random.default_rng(seed)
+
+    if mode == "loo":
+        return [np.array([i]) for i in rng.choice(n_samples, min(n_folds, n_samples), replace=False)]
+
+    elif mode == "kfold":
+        return [np.sort(idx) for idx in np.array_split(rng.permutation(n_samples), min(n_folds, n_samples))]
+
+    elif mode == "subsample":
+        n_test = int(np.clip(np.ceil(test_ratio * n_samples), 1, max(n_samples - 1, 1)))
+        return [np.sort(rng.choice(n_samples, n_test, replace=False)) for _ in range(n_folds)]
+
+    else:
+        raise AttributeError("Unknown cross validation mode: '{}'!".format(mode))
+
+
+def somp(matrix, results, n_coeffs_sparse, n_out_block=None):
+    """
+    Simultaneous Orthogonal Matching Pursuit (SOMP). Determines a sparse solution of matrix @ coeffs = results for
+    all columns of results (output quantities) with a common support. In every iteration, the column of the matrix
+    with the largest l2-norm of the (normalized) correlations with the residuals of all outputs is added to the
+    support. The support is orthogonalized by Gram-Schmidt, such that the correlations are updated without forming
+    the residuals (O(n_basis * n_out) per iteration). If n_out_block is given, the correlations are not stored for
+    all outputs, but their norms are accumulated over blocks of n_out_block outputs in every iteration
+    (O(n_rows * n_basis * n_out) per iteration), such that the support is still common to all outputs.
+
+    coeffs = somp(matrix, results, n_coeffs_sparse, n_out_block=None)
+
+    Parameters
+    ----------
+    matrix : ndarray of float [n_rows x n_basis]
+        Matrix (e.g. gPC matrix)
+    results : ndarray of float [n_rows x n_out]
+        Right hand sides (e.g. results of the output quantities)
+    n_coeffs_sparse : int
+        Number of coefficients != 0 (size of the common support)
+    n_out_block : int, optional, default: None
+        Number of outputs, whose correlations are determined at once (None: all outputs)
+
+    Returns
+    -------
+    coeffs : ndarray of float [n_basis x n_out]
+        Sparse solution
+    """
+    if results.ndim == 1:
+        results = results[:, np.newaxis]
+
+    n_rows, n_basis = matrix.shape
+    n_out = results.shape[1]
+    n_coeffs_sparse = int(min(n_coeffs_sparse, n_rows, n_basis))
+
+    norms = np.linalg.norm(matrix, axis=0)
+    norms[norms == 0] = np.inf
+    available = np.ones(n_basis, dtype=bool)
+
+    q = np.zeros((n_rows, n_coeffs_sparse))
+    r = np.zeros((n_coeffs_sparse, n_coeffs_sparse))
+    support = []
+
+    # correlations of the columns of the matrix with the support (matrix.T @ q) and projections of the
+    # results on the support (q.T @ results)
+    matrix_q = np.zeros((n_basis, n_coeffs_sparse))
+    q_results = np.zeros((n_coeffs_sparse, n_out))
+
+    # correlations of the columns of the matrix with the residuals (stored for all outputs)
+    if n_out_block is None or n_out_block >= n_out:
+        correlation = np.matmul(matrix.transpose(), results)
+    else:
+        correlation = None
+
+    while len(support) < n_coeffs_sparse and np.any(available):
+        k = len(support)
+
+        if correlation is not None:
+            score = np.linalg.norm(correlation, axis=1) / norms
+        else:
+            # norms of the correlations accumulated over blocks of outputs
+            # (matrix.T @ residual = matrix.T @ results - matrix.T @ q @ q.T @ results)
+            score = np.zeros(n_basis)
+
+            for i_start in range(0, n_out, n_out_block):
+                idx = slice(i_start, min(i_start + n_out_block, n_out))
+                correlation_block = np.matmul(matrix.transpose(), results[:, idx]) - \
+                    np.matmul(matrix_q[:, :k], q_results[:k, idx])
+                score += np.sum(correlation_block ** 2, axis=1)
+
+            score = np.sqrt(score) / norms
+
+        score[~available] = -1.
+        i_max = int(np.argmax(score))
+
+        if score[i_max] <= 0:
+            break
+
+        available[i_max] = False
+
+        # orthogonalize column against support (Gram-Schmidt with reorthogonalization)
+        v = np.array(matrix[:, i_max], dtype=q.dtype)
+        r_k = np.zeros(k)
+
+        for _ in range(2):
+            r_k_add = np.matmul(q[:, :k].transpose(), v)
+            v -= np.matmul(q[:, :k], r_k_add)
+            r_k += r_k_add
+
+        norm_v = np.linalg.norm(v)
+
+        # skip columns, which are linearly dependent on the support
+        if norm_v <= 1e-10 * norms[i_max]:
+            continue
+
+        q[:, k] = v / norm_v
+        r[:k, k] = r_k
+        r[k, k] = norm_v
+        support.append(i_max)
+
+        matrix_q[:, k] = np.matmul(matrix.transpose(), q[:, k])
+        q_results[k, :] = np.matmul(q[:, k], results)
+
+        # q_k is orthogonal to the previous support, i.e. q_k.T @ residual = q_k.T @ results
+        if correlation is not None:
+            correlation -= np.outer(matrix_q[:, k], q_results[k, :])
+
+    coeffs = np.zeros((n_basis, n_out))
+
+    if len(support) > 0:
+        k = len(support)
+        coeffs[support, :] = scipy.linalg.solve_triangular(r[:k, :k], q_results[:k, :])
+
+    return coeffs
+
+
 def get_all_combinations(array, number_elements):
     """
     Compute all k-tuples (e_1, e_2, ..., e_k) of combinations of the set of elements of the input array where
@@ -599,6 +773,8 @@ def get_all_combinations(array, number_elements):
 def get_multi_indices(order, order_max, interaction_order, order_max_norm=1., interaction_order_current=None):
     """
     Computes all multi-indices with a maximum overall order of max_order considering a certain maximum order norm.
+    Only admissible multi-indices are generated, i.e. the individual orders, the interaction order and the order
+    norm are considered during the enumeration.
 
     multi_indices = get_multi_indices(length, max_order)
 
@@ -639,55 +815,141 @@ def get_multi_indices(order, order_max, interaction_order, order_max_norm=1., in
     else:
         interaction_order_current = interaction_order_current
 
-    multi_indices = []
-    for i_order_max in range(order_max + 1):
-        s = get_all_combinations(np.arange(dim + i_order_max - 1) + 1, dim - 1)
+    # Generate the multi-indices with total order <= order_max dimension by dimension, applying the individual
+    # orders, the interaction order and the order norm already during the generation. All constraints are monotone
+    # in the number of dimensions and a partial multi-index can always be completed with zeros, such that every
+    # partial multi-index appears in the result and the intermediate arrays never exceed the size of the output.
+    # The multi-indices are stored as parent pointers and values per dimension and assembled at the end.
+    order_sum = np.zeros(1, dtype=int)
+    n_interaction = np.zeros(1, dtype=int)
+    norm_sum = np.zeros(1)
+    norm_sum_max = (order_max + 1e-6) ** order_max_norm * (1 + 1e-9)
+    parents = []
+    values = []
+
+    for i_dim in range(dim):
+        idx_dim = []
+        values_dim = []
 
-        m = s.shape[0]
+        for value in range(min(order[i_dim], order_max) + 1):
+            mask = order_sum + value <= order_max
 
-        s1 = np.zeros([m, 1])
-        s2 = (dim + i_order_max) + s1
+            if value > 0:
+                mask = np.logical_and(mask, n_interaction < interaction_order)
 
-        v = np.diff(np.hstack([s1, s, s2]))
-        v = v - 1
+                if order_max_norm != 1:
+                    mask = np.logical_and(mask, norm_sum + value ** order_max_norm <= norm_sum_max)
 
-        if i_order_max == 0:
-            multi_indices = v
-        else:
-            multi_indices = np.vstack([multi_indices, v])
+            idx_dim.append(np.flatnonzero(mask))
+            values_dim.append(value * np.ones(len(idx_dim[-1]), dtype=int))
+
+        idx_dim = np.concatenate(idx_dim)
+        values_dim = np.concatenate(values_dim)
+
+        order_sum = order_sum[idx_dim] + values_dim
+        n_interaction = n_interaction[idx_dim] + (values_dim > 0)
+        if order_max_norm != 1:
+            norm_sum = norm_sum[idx_dim] + values_dim ** order_max_norm
+
+        parents.append(idx_dim)
+        values.append(values_dim)
+
+    multi_indices = np.zeros((len(order_sum), dim), dtype=int)
+    idx = np.arange(len(order_sum))
+
+    for i_dim in range(dim - 1, -1, -1):
+        multi_indices[:, i_dim] = values[i_dim][idx]
+        idx = parents[i_dim][idx]
+
+    # sort by total order and lexicographically within the same total order
+    idx_sort = np.lexsort(np.vstack((multi_indices[:, ::-1].T, order_sum)))
+    multi_indices = multi_indices[idx_sort, :]
+    order_sum = order_sum[idx_sort]
+    n_interaction = n_interaction[idx_sort]
 
     # remove polynomials exceeding order_max considering max_order_norm
     if order_max_norm != 1:
-        multi_indices = multi_indices[np.linalg.norm(multi_indices, ord=order_max_norm, axis=1) <=
-                                      (order_max + 1e-6), :]
-
-    # add or delete monomials specified in order
-    for i_dim in range(dim):
-        # add multi-indexes to list when not yet included
-        if order[i_dim] > order_max:
-            multi_indices_add_dim = np.linspace(order_max + 1,
-                                                order[i_dim],
-                                                order[i_dim] - (order_max + 1) + 1)
-            multi_indices_add_all = np.zeros([multi_indices_add_dim.shape[0], dim])
-            multi_indices_add_all[:, i_dim] = multi_indices_add_dim
-            multi_indices = np.vstack([multi_indices, multi_indices_add_all.astype(int)])
-
-        # delete multi-indexes from list when they exceed individual max order of parameter
-        elif order[i_dim] < order_max:
-            multi_indices = multi_indices[multi_indices[:, i_dim] <= order[i_dim], :]
-
-    # Consider interaction order (filter out multi-indices exceeding it)
-    if interaction_order < dim:
-        multi_indices = multi_indices[np.sum(multi_indices > 0, axis=1) <= interaction_order, :]
+        mask = np.linalg.norm(multi_indices, ord=order_max_norm, axis=1) <= (order_max + 1e-6)
+        multi_indices = multi_indices[mask, :]
+        order_sum = order_sum[mask]
+        n_interaction = n_interaction[mask]
 
     # if interaction_order_current is smaller than interaction_order, delete those basis functions of highest order
     if interaction_order_current < interaction_order:
-        mask_order_max = np.sum(multi_indices, axis=1) == order_max
-        mask_interaction_order = np.sum(multi_indices > 0, axis=1) > interaction_order_current
-        mask = np.logical_not(np.logical_and(mask_order_max, mask_interaction_order))
-        multi_indices = multi_indices[mask]
+        mask = np.logical_not(np.logical_and(order_sum == order_max, n_interaction > interaction_order_current))
+        multi_indices = multi_indices[mask, :]
 
-    return multi_indices.astype(int)
+    # add monomials specified in order exceeding order_max
+    if interaction_order > 0:
+        for i_dim in range(dim):
+            if order[i_dim] > order_max:
+                multi_indices_add_all = np.zeros([order[i_dim] - order_max, dim], dtype=int)
+                multi_indices_add_all[:, i_dim] = np.arange(order_max + 1, order[i_dim] + 1)
+                multi_indices = np.vstack([multi_indices, multi_indices_add_all])
+
+    return multi_indices
+
+
+def get_num_multi_indices(order, order_max, interaction_order, order_max_norm=1., interaction_order_current=None):
+    """
+    Computes the number of multi-indices returned by get_multi_indices without generating them. For
+    order_max_norm = 1, the multi-indices are counted by dynamic programming over the dimensions w.r.t. their
+    total order and interaction order.
+
+    n_multi_indices = get_num_multi_indices(order, order_max, interaction_order)
+
+    Parameters
+    ----------
+    order : list of int [dim]
+        Maximum individual expansion order
+    order_max : int
+        Maximum global expansion order
+    interaction_order : int
+        Number of random variables, which can interact with each other
+    order_max_norm : float, optional, default: 1
+        Norm for which the maximum global expansion order is defined [0, 1]
+    interaction_order_current : int, optional, default: interaction_order
+        Number of random variables currently interacting with respect to the highest order.
+
+    Returns
+    -------
+    n_multi_indices : int
+        Number of multi-indices
+    """
+    if order_max_norm != 1:
+        return get_multi_indices(order=order,
+                                 order_max=order_max,
+                                 interaction_order=interaction_order,
+                                 order_max_norm=order_max_norm,
+                                 interaction_order_current=interaction_order_current).shape[0]
+
+    dim = len(order)
+
+    order_max = int(order_max)
+    order = [int(o) for o in order]
+    interaction_order = int(min(interaction_order, dim))
+
+    if interaction_order_current is None or interaction_order_current > interaction_order:
+        interaction_order_current = interaction_order
+
+    # n[s, k]: number of partial multi-indices with total order s and k interacting parameters
+    n = np.zeros((order_max + 1, interaction_order + 1), dtype=np.int64)
+    n[0, 0] = 1
+
+    for i_dim in range(dim):
+        n_new = n.copy()
+
+        for value in range(1, min(order[i_dim], order_max) + 1):
+            n_new[value:, 1:] += n[:order_max + 1 - value, :-1]
+
+        n = n_new
+
+    n_multi_indices = np.sum(n) - np.sum(n[order_max, int(interaction_order_current) + 1:])
+
+    if interaction_order > 0:
+        n_multi_indices += sum([o - order_max for o in order if o > order_max])
+
+    return int(n_multi_indices)
 
 
 def sample_sphere(n_points, r):
@@ -875,6 +1137,60 @@ def determine_projection_matrix(gradient_results, lambda_eps=0.95):
     return p_matrix
 
 
+def determine_output_projection(results, lambda_eps=0.999):
+    """
+    Determines the principal components of the output quantities by a truncated SVD of the centered results.
+    All principal components are included until lambda_eps of the total energy (sum of the squared singular
+    values) is included. If there are more output quantities than samples, the SVD is determined from the
+    eigenvalue decomposition of the Gram matrix of the samples.
+
+    mean, components = determine_output_projection(results, lambda_eps=0.999)
+
+    Parameters
+    ----------
+    results : ndarray of float [n_grid x n_out]
+        Results of the output quantities
+    lambda_eps : float, optional, default: 0.999
+        Bound of the energy of the included principal components (0...1)
+
+    Returns
+    -------
+    mean : ndarray of float [n_out]
+        Mean of the output quantities
+    components : ndarray of float [n_components x n_out]
+        Principal components (orthonormal rows) of the output quantities
+    """
+    mean = np.mean(results, axis=0)
+    results_centered = results - mean
+
+    if results.shape[1] > results.shape[0]:
+        s2, u = np.linalg.eigh(np.matmul(results_centered, results_centered.transpose()))
+        s2 = np.clip(s2[::-1], 0, None)
+        u = u[:, ::-1]
+        v = None
+    else:
+        _, s, v = np.linalg.svd(results_centered, full_matrices=False)
+        s2 = s ** 2
+        u = None
+
+    # skip components, which are numerically zero
+    n_components = max(1, int(np.sum(s2 > 1e-12 * s2[0])))
+    energy = np.cumsum(s2[:n_components])
+
+    if energy[-1] > 0:
+        n_components = min(n_components, int(np.searchsorted(energy, lambda_eps * energy[-1])) + 1)
+
+    if s2[0] == 0:
+        components = np.zeros((1, results.shape[1]))
+    elif v is None:
+        components = np.matmul(u[:, :n_components].transpose(), results_centered) / \
+            np.sqrt(s2[:n_components])[:, np.newaxis]
+    else:
+        components = v[:n_components, :]
+
+    return mean, components
+
+
 def get_indices_of_k_smallest(arr, k):
     """
     Find indices of k smallest elements in ndarray
@@ -126,6 +126,13 @@ def get_sensitivities_hdf5(fn_gpc, output_idx=False, calc_sobol=True, calc_globa
 
         dim = f["grid/coords"][:].shape[1]
 
+    # remove previous results in sens/... (overwrite existing quantities)
+    with h5py.File(fn_gpc + ".hdf5", 'a') as f:
+        try:
+            del f["sens"]
+        except KeyError:
+            pass
+
     # generate samples in case of sampling approach
     if algorithm == "sampling":
         grid = Random(parameters_random=session.parameters_random,
@@ -146,14 +153,32 @@ def get_sensitivities_hdf5(fn_gpc, output_idx=False, calc_sobol=True, calc_globa
             std = session.gpc[0].get_std(coeffs=coeffs)
 
         elif algorithm == "sampling":
-            # run model evaluations
-            res = session.gpc[0].get_approximation(coeffs=coeffs, x=grid.coords_norm)
+            # run model evaluations block-wise, write them directly into the results file and
+            # determine mean and standard deviation by merging the block statistics (Chan et al. 1979)
+            n_res = 0
+            mean = np.zeros((1, coeffs.shape[1]))
+            m2 = np.zeros((1, coeffs.shape[1]))
 
-            # determine mean
-            mean = session.gpc[0].get_mean(samples=res)
+            with h5py.File(fn_gpc + ".hdf5", 'a') as f:
+                res_hdf5 = f.create_dataset(name="sens/res", shape=(grid.coords_norm.shape[0], coeffs.shape[1]),
+                                            dtype=float)
+
+                for idx, res_block in session.gpc[0].get_approximation_blocks(coeffs=coeffs, x=grid.coords_norm):
+                    res_hdf5[idx, :] = res_block
+
+                    n_block = res_block.shape[0]
+                    mean_block = np.mean(res_block, axis=0)[np.newaxis, :]
+                    delta = mean_block - mean
+
+                    mean += delta * n_block / (n_res + n_block)
+                    m2 += np.sum((res_block - mean_block) ** 2, axis=0)[np.newaxis, :] + \
+                        delta ** 2 * n_res * n_block / (n_res + n_block)
+                    n_res += n_block
+
+                f.create_dataset(data=grid.coords_norm, name="sens/coords_norm")
 
             # determine standard deviation
-            std = session.gpc[0].get_std(samples=res)
+            std = np.sqrt(m2 / n_res)
 
         else:
             raise AssertionError("Please provide valid algorithm argument (""standard"" or ""sampling"")")
@@ -337,20 +362,15 @@ def get_sensitivities_hdf5(fn_gpc, output_idx=False, calc_sobol=True, calc_globa
     var = std ** 2
 
     print("> Adding results to: {}".format(fn_gpc + ".hdf5"))
-    # save results in .hdf5 file (overwrite existing quantities in sens/...)
+    # save results in .hdf5 file (streamed quantities are already written to sens/...)
     with h5py.File(fn_gpc + ".hdf5", 'a') as f:
 
-        try:
-            del f["sens"]
-        except KeyError:
-            pass
-
         f.create_dataset(data=mean, name="sens/mean")
         f.create_dataset(data=std, name="sens/std")
         f.create_dataset(data=rstd, name="sens/rstd")
         f.create_dataset(data=var, name="sens/var")
 
-        if algorithm == "sampling":
+        if algorithm == "sampling" and res is not None:
             f.create_dataset(data=grid.coords_norm, name="sens/coords_norm")
             f.create_dataset(data=res, name="sens/res")
 
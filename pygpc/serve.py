@@ -0,0 +1,488 @@
+import os
+import json
+import time
+import asyncio
+import threading
+import numpy as np
+from .io import read_session
+from .io import iprint
+from .FrozenGPC import FrozenGPC
+from .FrozenGPC import FrozenMEGPC
+from .FrozenGPC import load_frozen_gpc
+
+
+def load_model(model):
+    """
+    Loads a surrogate model for serving and returns its frozen gPC.
+
+    frozen_gpc = load_model(model)
+
+    Parameters
+    ----------
+    model : FrozenGPC, FrozenMEGPC, str or tuple
+        - FrozenGPC or FrozenMEGPC object instance
+        - str: filename of a frozen gPC (.npz, see FrozenGPC.save)
+        - tuple (session, coeffs): Session object instance or filename of the session (.pkl or .hdf5)
+          and the corresponding gPC coefficients
+
+    Returns
+    -------
+    frozen_gpc : FrozenGPC or FrozenMEGPC object instance
+        Frozen gPC expansion
+    """
+    if isinstance(model, (FrozenGPC, FrozenMEGPC)):
+        return model
+
+    elif isinstance(model, str):
+        return load_frozen_gpc(model)
+
+    elif isinstance(model, tuple):
+        session, coeffs = model
+
+        if isinstance(session, str):
+            session = read_session(fname=session)
+
+        return session.gpc[0].freeze(coeffs)
+
+    else:
+        raise AttributeError("Please provide a frozen gPC, a .npz filename or a tuple (session, coeffs)")
+
+
+class Batcher(object):
+    """
+    Coalesces concurrent requests of one model into micro-batches, which are evaluated in one vectorized call.
+
+    Parameters
+    ----------
+    model : FrozenGPC or FrozenMEGPC object instance
+        Frozen gPC expansion
+    gradient : bool
+        Evaluate the gradient (predict_gradient) instead of the approximation (predict)
+    normalized : bool
+        Coordinates are given in the normalized parameter space
+    batch_window : float
+        Time in s a batch waits for further requests after the first request arrived
+    max_batch_size : int
+        Maximum number of coordinates per batch
+    metrics : dict
+        Metrics of the server (updated after every batch)
+    """
+
+    def __init__(self, model, gradient, normalized, batch_window, max_batch_size, metrics):
+        """
+        Constructor; initializes Batcher class
+        """
+        self.model = model
+        self.gradient = gradient
+        self.normalized = normalized
+        self.batch_window = batch_window
+        self.max_batch_size = max_batch_size
+        self.metrics = metrics
+        self.queue = asyncio.Queue()
+        self.task = asyncio.ensure_future(self.run())
+
+    async def submit(self, coords):
+        """
+        Adds coordinates to the next batch and waits for the result.
+
+        res = await Batcher.submit(coords)
+
+        Parameters
+        ----------
+        coords : ndarray of float [n_x x dim]
+            Coordinates of the request
+
+        Returns
+        -------
+        res : ndarray of float [n_x x n_out (x dim)]
+            GPC approximation (or gradient) at coords
+        """
+        future = asyncio.get_event_loop().create_future()
+        await self.queue.put((coords, future, time.time()))
+
+        return await future
+
+    async def run(self):
+        """
+        Batch loop: collects the requests arriving within the batch window and evaluates them together.
+        """
+        loop = asyncio.get_event_loop()
+
+        while True:
+            requests = [await self.queue.get()]
+            n_points = requests[0][0].shape[0]
+            t_stop = loop.time() + self.batch_window
+
+            while n_points < self.max_batch_size:
+                try:
+                    requests.append(await asyncio.wait_for(self.queue.get(), timeout=max(0, t_stop - loop.time())))
+                    n_points += requests[-1][0].shape[0]
+                except asyncio.TimeoutError:
+                    break
+
+            start = time.time()
+
+            try:
+                coords = np.vstack([r[0] for r in requests])
+
+                if self.gradient:
+                    res = await loop.run_in_executor(None, self.model.predict_gradient, coords, self.normalized)
+                else:
+                    res = await loop.run_in_executor(None, self.model.predict, coords, self.normalized)
+
+            except Exception as e:
+                for r in requests:
+                    if not r[1].done():
+                        r[1].set_exception(e)
+                continue
+
+            stop = time.time()
+
+            i_start = 0
+            for r in requests:
+                if not r[1].done():
+                    r[1].set_result(res[i_start:(i_start + r[0].shape[0])])
+                i_start += r[0].shape[0]
+
+            self.update_metrics(n_requests=len(requests),
+                                n_points=n_points,
+                                latency=stop - start,
+                                wait=np.mean([start - r[2] for r in requests]))
+
+    def update_metrics(self, n_requests, n_points, latency, wait):
+        """
+        Adds the statistics of a batch to the metrics of the server.
+
+        Parameters
+        ----------
+        n_requests : int
+            Number of requests in the batch
+        n_points : int
+            Number of coordinates in the batch
+        latency : float
+            Evaluation time of the batch in s
+        wait : float
+            Mean time the requests of the batch waited in the queue in s
+        """
+        m = self.metrics
+        m["n_batches"] += 1
+        m["n_requests"] += n_requests
+        m["n_points"] += n_points
+        m["time_eval"] += latency
+        m["batch_size_mean"] = m["n_points"] / m["n_batches"]
+        m["requests_per_batch_mean"] = m["n_requests"] / m["n_batches"]
+        m["latency_last"] = latency
+        m["latency_mean"] = m["time_eval"] / m["n_batches"]
+        m["wait_last"] = wait
+        m["throughput"] = m["n_points"] / max(time.time() - m["time_start"], 1e-12)
+        m["throughput_eval"] = m["n_points"] / max(m["time_eval"], 1e-12)
+
+
+class SurrogateServer(object):
+    """
+    Local HTTP server for trained gPC surrogates. Concurrent requests are coalesced into micro-batches within
+    a configurable latency window and evaluated in one vectorized call. The server listens on a TCP port
+    (localhost) or on a Unix socket.
+
+    Endpoints:
+    - POST /predict/<name>: {"coords": [[...], ...], "normalized": false} -> {"pce": [[...], ...]}
+    - POST /gradient/<name>: {"coords": [[...], ...], "normalized": false} -> {"gradient": [[[...], ...], ...]}
+    - GET /models: {<name>: {"n_out": ...}, ...}
+    - GET /metrics: per-batch latency and throughput metrics of all models
+
+    Parameters
+    ----------
+    models : dict of FrozenGPC, FrozenMEGPC, str or tuple
+        Surrogate models to serve by their name (see load_model())
+    host : str, optional, default: "127.0.0.1"
+        Host address of the TCP server
+    port : int, optional, default: 0
+        Port of the TCP server (0: a free port is chosen, see self.port after start)
+    path : str, optional, default: None
+        Path of a Unix socket. The server listens on the Unix socket instead of the TCP port if provided.
+    batch_window : float, optional, default: 0.002
+        Time in s a batch waits for further requests after the first request arrived
+    max_batch_size : int, optional, default: 4096
+        Maximum number of coordinates per batch
+    verbose : bool, optional, default: True
+        Print output of the server
+    """
+
+    def __init__(self, models, host="127.0.0.1", port=0, path=None, batch_window=0.002, max_batch_size=4096,
+                 verbose=True):
+        """
+        Constructor; initializes SurrogateServer class
+        """
+        self.models = {name: load_model(models[name]) for name in models}
+        self.host = host
+        self.port = port
+        self.path = path
+        self.batch_window = batch_window
+        self.max_batch_size = max_batch_size
+        self.verbose = verbose
+        self.server = None
+        self.batchers = dict()
+        self.connections = dict()
+        self.metrics = dict()
+        self.loop = None
+        self.thread = None
+
+    def get_batcher(self, name, gradient, normalized):
+        """
+        Returns the batcher of a model and request type (creates it on first use).
+
+        Parameters
+        ----------
+        name : str
+            Name of the model
+        gradient : bool
+            Evaluate the gradient instead of the approximation
+        normalized : bool
+            Coordinates are given in the normalized parameter space
+
+        Returns
+        -------
+        batcher : Batcher object instance
+            Batcher of the model and request type
+        """
+        key = (name, gradient, normalized)
+
+        if key not in self.batchers:
+            if name not in self.metrics:
+                self.metrics[name] = {"n_batches": 0, "n_requests": 0, "n_points": 0, "time_eval": 0.,
+                                      "batch_size_mean": 0., "requests_per_batch_mean": 0., "latency_last": 0.,
+                                      "latency_mean": 0., "wait_last": 0., "throughput": 0.,
+                                      "throughput_eval": 0., "time_start": time.time()}
+
+            self.batchers[key] = Batcher(model=self.models[name],
+                                         gradient=gradient,
+                                         normalized=normalized,
+                                         batch_window=self.batch_window,
+                                         max_batch_size=self.max_batch_size,
+                                         metrics=self.metrics[name])
+
+        return self.batchers[key]
+
+    async def handle_request(self, method, target, body):
+        """
+        Handles a single HTTP request.
+
+        Parameters
+        ----------
+        method : str
+            HTTP method ("GET" or "POST")
+        target : str
+            Request target (e.g. "/predict/<name>")
+        body : bytes
+            Request body (JSON)
+
+        Returns
+        -------
+        status : int
+            HTTP status code
+        data : dict
+            Response (JSON)
+        """
+        parts = target.strip("/").split("/")
+
+        if method == "GET" and parts == ["models"]:
+            return 200, {name: {"n_out": int(self.models[name].n_out),
+                                 "dim": int(self.models[name].dim_original)} for name in self.models}
+
+        if method == "GET" and parts == ["metrics"]:
+            return 200, self.metrics
+
+        if method == "POST" and len(parts) == 2 and parts[0] in ["predict", "gradient"]:
+            if parts[1] not in self.models:
+                return 404, {"error": "Unknown model: {}".format(parts[1])}
+
+            try:
+                request = json.loads(body.decode())
+                coords = np.array(request["coords"], dtype=float, ndmin=2)
+                normalized = bool(request.get("normalized", False))
+            except (ValueError, KeyError, TypeError) as e:
+                return 400, {"error": "Invalid request: {}".format(e)}
+
+            # requests are stacked by the batcher, i.e. a malformed request would fail the whole batch
+            dim = self.models[parts[1]].dim_original
+
+            if coords.ndim != 2 or coords.shape[1] != dim:
+                return 400, {"error": "Invalid request: coords must be of shape [n_points x {}]".format(dim)}
+
+            batcher = self.get_batcher(name=parts[1], gradient=parts[0] == "gradient", normalized=normalized)
+
+            try:
+                res = await batcher.submit(coords)
+            except Exception as e:
+                return 400, {"error": "Evaluation failed: {}".format(e)}
+
+            return 200, {"pce" if parts[0] == "predict" else "gradient": res.tolist()}
+
+        return 404, {"error": "Unknown endpoint: {} {}".format(method, target)}
+
+    async def handle_connection(self, reader, writer):
+        """
+        Reads HTTP/1.1 requests from a connection (keep-alive) and writes the JSON responses.
+
+        Parameters
+        ----------
+        reader : asyncio.StreamReader
+            Reader of the connection
+        writer : asyncio.StreamWriter
+            Writer of the connection
+        """
+        self.connections[asyncio.current_task()] = writer
+
+        try:
+            while True:
+                request_line = await reader.readline()
+
+                if not request_line:
+                    break
+
+                method, target, _ = request_line.decode("latin-1").split(" ", 2)
+
+                headers = dict()
+                while True:
+                    line = await reader.readline()
+                    if line in [b"\r\n", b"\n", b""]:
+                        break
+                    key, value = line.decode("latin-1").split(":", 1)
+                    headers[key.strip().lower()] = value.strip()
+
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+
+                status, data = await self.handle_request(method=method, target=target, body=body)
+
+                response = json.dumps(data).encode()
+                reason = {200: "OK", 400: "Bad Request", 404: "Not Found"}[status]
+                keep_alive = headers.get("connection", "keep-alive").lower() != "close"
+
+                writer.write("HTTP/1.1 {} {}\r\nContent-Type: application/json\r\nContent-Length: {}\r\n"
+                             "Connection: {}\r\n\r\n".format(status, reason, len(response),
+                                                             "keep-alive" if keep_alive else "close").encode())
+                writer.write(response)
+                await writer.drain()
+
+                if not keep_alive:
+                    break
+
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+
+        finally:
+            writer.close()
+            self.connections.pop(asyncio.current_task(), None)
+
+    async def start(self):
+        """
+        Starts listening on the TCP port or Unix socket (in the running event loop).
+        """
+        if self.path is not None:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+            self.server = await asyncio.start_unix_server(self.handle_connection, path=self.path)
+            iprint("Serving {} on {}".format(list(self.models.keys()), self.path), verbose=self.verbose, tab=0)
+
+        else:
+            self.server = await asyncio.start_server(self.handle_connection, host=self.host, port=self.port)
+            self.port = self.server.sockets[0].getsockname()[1]
+            iprint("Serving {} on http://{}:{}".format(list(self.models.keys()), self.host, self.port),
+                   verbose=self.verbose, tab=0)
+
+    async def close(self):
+        """
+        Stops the server, the open connections and the batch loops (in the running event loop).
+        """
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+
+        # closing the transports ends the open (keep-alive) connections
+        connections = list(self.connections.keys())
+        for writer in self.connections.values():
+            writer.close()
+
+        await asyncio.gather(*connections, return_exceptions=True)
+
+        for batcher in self.batchers.values():
+            batcher.task.cancel()
+
+        await asyncio.gather(*[batcher.task for batcher in self.batchers.values()], return_exceptions=True)
+
+        self.connections = dict()
+        self.batchers = dict()
+
+    def serve_forever(self):
+        """
+        Runs the server in the current thread until it is interrupted.
+        """
+        async def _serve():
+            await self.start()
+            await self.server.serve_forever()
+
+        try:
+            asyncio.run(_serve())
+        except KeyboardInterrupt:
+            pass
+
+    def start_thread(self):
+        """
+        Runs the server in a background thread (e.g. for testing or to serve from an interactive session).
+        Returns when the server is listening. Stop it with self.stop_thread().
+        """
+        self.loop = asyncio.new_event_loop()
+        started = threading.Event()
+
+        def _run():
+            asyncio.set_event_loop(self.loop)
+            self.loop.run_until_complete(self.start())
+            started.set()
+            self.loop.run_forever()
+
+        self.thread = threading.Thread(target=_run, daemon=True)
+        self.thread.start()
+        started.wait()
+
+    def stop_thread(self):
+        """
+        Stops the server running in the background thread.
+        """
+        asyncio.run_coroutine_threadsafe(self.close(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+
+def serve(models, host="127.0.0.1", port=8000, path=None, batch_window=0.002, max_batch_size=4096, verbose=True):
+    """
+    Serves trained gPC surrogates on a local HTTP endpoint (see SurrogateServer) until interrupted.
+
+    serve(models, host="127.0.0.1", port=8000, path=None, batch_window=0.002, max_batch_size=4096)
+
+    Parameters
+    ----------
+    models : dict of FrozenGPC, FrozenMEGPC, str or tuple
+        Surrogate models to serve by their name (see load_model())
+    host : str, optional, default: "127.0.0.1"
+        Host address of the TCP server
+    port : int, optional, default: 8000
+        Port of the TCP server
+    path : str, optional, default: None
+        Path of a Unix socket. The server listens on the Unix socket instead of the TCP port if provided.
+    batch_window : float, optional, default: 0.002
+        Time in s a batch waits for further requests after the first request arrived
+    max_batch_size : int, optional, default: 4096
+        Maximum number of coordinates per batch
+    verbose : bool, optional, default: True
+        Print output of the server
+    """
+    server = SurrogateServer(models=models,
+                             host=host,
+                             port=port,
+                             path=path,
+                             batch_window=batch_window,
+                             max_batch_size=max_batch_size,
+                             verbose=verbose)
+    server.serve_forever()
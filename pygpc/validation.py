@@ -86,6 +86,7 @@ def validate_gpc_mc(session, coeffs, coords=None, data_original=None, n_samples=
                          i_subiter=None,
                          fn_results=None,
                          print_func_time=False)
+        com.close()
 
         if output_idx is None:
             output_idx = np.arange(y_orig.shape[1])
@@ -299,6 +300,7 @@ def validate_gpc_plot(session, coeffs, random_vars, n_grid=None, coords=None, ou
                              i_subiter=None,
                              fn_results=None,
                              print_func_time=False)
+        com.close()
         y_orig = y_orig_all[:, output_idx]
 
     else:
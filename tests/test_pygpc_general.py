@@ -1394,6 +1394,14 @@ class TestPygpcMethods(unittest.TestCase):
 
                 print(b, "Time get_approximation: ", stop-start)
 
+                # perform polynomial chaos expansion in single precision
+                gpc.dtype = "float32"
+                pce_float32 = gpc.get_approximation(coeffs, gpc.grid.coords_norm)
+                gpc.dtype = "float64"
+
+                self.expect_isclose(pce_float32, pce, atol=1e-5 * np.max(np.abs(pce)), rtol=1e-5,
+                                    msg="float32 and float64 pce matrices of " + b + " backend are not equal")
+
                 gpc_matrix[b] = gpc.gpc_matrix
                 gpc_matrix_gradient[b] = gpc.gpc_matrix_gradient
                 pce_matrix[b] = pce
@@ -1614,6 +1622,887 @@ class TestPygpcMethods(unittest.TestCase):
 
         print("done!\n")
 
+    def test_018_frozen_gpc(self):
+        """
+        Test frozen gPC (predict, predict_gradient, save and load)
+        """
+
+        global folder
+        test_name = 'pygpc_test_018_frozen_gpc'
+        print(test_name)
+
+        # define model
+        model = pygpc.testfunctions.Peaks()
+
+        # define problem
+        parameters = OrderedDict()
+        parameters["x1"] = pygpc.Beta(pdf_shape=[1, 1], pdf_limits=[1.2, 2])
+        parameters["x2"] = 1.25
+        parameters["x3"] = pygpc.Beta(pdf_shape=[2, 3], pdf_limits=[0, 0.6])
+        problem = pygpc.Problem(model, parameters)
+
+        # setup gPC
+        gpc = pygpc.Reg(problem=problem,
+                        order=[6, 6],
+                        order_max=6,
+                        order_max_norm=1,
+                        interaction_order=2,
+                        interaction_order_current=2,
+                        options={"backend": "python"},
+                        validation=None)
+
+        coeffs = np.random.rand(gpc.basis.n_basis, 3)
+
+        # define test grid
+        grid = pygpc.Random(parameters_random=problem.parameters_random,
+                            n_grid=100,
+                            seed=1)
+
+        frozen_gpc = gpc.freeze(coeffs)
+        frozen_gpc.save(os.path.join(folder, test_name + ".npz"))
+        frozen_gpc_loaded = pygpc.load_frozen_gpc(os.path.join(folder, test_name + ".npz"))
+
+        for f in [frozen_gpc, frozen_gpc_loaded]:
+            self.expect_isclose(f.predict(grid.coords), gpc.get_approximation(coeffs, grid.coords_norm), atol=1e-10,
+                                msg="frozen gPC approximation differs from gPC approximation")
+
+            self.expect_isclose(f.predict_gradient(grid.coords_norm, normalized=True),
+                                gpc.get_local_sens(coeffs, grid.coords_norm), atol=1e-10,
+                                msg="frozen gPC gradient differs from gPC gradient")
+
+        # projected gPC (reduced parameter space)
+        p_matrix = np.array([[0.8, -0.6]])
+        parameters_reduced = OrderedDict()
+        parameters_reduced["n0"] = pygpc.Beta(pdf_shape=[1., 1.], pdf_limits=[-1., 1.])
+        problem_reduced = pygpc.Problem(model, parameters_reduced)
+
+        gpc_projected = pygpc.Reg(problem=problem_reduced,
+                                  order=[6],
+                                  order_max=6,
+                                  order_max_norm=1,
+                                  interaction_order=1,
+                                  interaction_order_current=1,
+                                  options={"backend": "python"},
+                                  validation=None)
+        gpc_projected.problem_original = problem
+        gpc_projected.p_matrix = p_matrix
+        gpc_projected.p_matrix_norm = np.sum(np.abs(p_matrix), axis=1)
+
+        coeffs_projected = np.random.rand(gpc_projected.basis.n_basis, 3)
+        frozen_gpc = gpc_projected.freeze(coeffs_projected)
+
+        self.expect_equal(frozen_gpc.dim_original, 2)
+        self.expect_isclose(frozen_gpc.predict(grid.coords),
+                            gpc_projected.get_approximation(coeffs_projected, grid.coords_norm), atol=1e-10,
+                            msg="frozen projected gPC approximation differs from gPC approximation")
+        self.expect_isclose(frozen_gpc.predict_gradient(grid.coords_norm, normalized=True),
+                            gpc_projected.get_local_sens(coeffs_projected, grid.coords_norm), atol=1e-10,
+                            msg="frozen projected gPC gradient differs from gPC gradient")
+
+        # multi-element gPC (sub-domains x1 < 1.6 and x1 >= 1.6)
+        from types import SimpleNamespace
+        from sklearn.neural_network import MLPClassifier
+
+        megpc = pygpc.MEGPC(problem=problem, options={"gradient_enhanced": False, "matlab_model": False})
+        megpc.n_gpc = 2
+
+        for d in range(2):
+            megpc.add_sub_gpc(problem=problem,
+                              order=[4, 4],
+                              order_max=4,
+                              order_max_norm=1,
+                              interaction_order=2,
+                              interaction_order_current=2,
+                              options={"backend": "python"},
+                              domain=d)
+
+        coeffs_me = [np.random.rand(megpc.gpc[d].basis.n_basis, 3) for d in range(2)]
+        grid_train = pygpc.Random(parameters_random=problem.parameters_random,
+                                  n_grid=200,
+                                  seed=2)
+
+        for activation in ["relu", "tanh"]:
+            clf = MLPClassifier(hidden_layer_sizes=(10, ), activation=activation, max_iter=2000, random_state=1)
+            clf.fit(grid_train.coords_norm, (grid_train.coords[:, 0] >= 1.6).astype(int))
+            megpc.classifier = SimpleNamespace(clf=clf, predict=clf.predict)
+
+            frozen_megpc = megpc.freeze(coeffs_me)
+
+            self.expect_equal(len(np.unique(clf.predict(grid.coords_norm))), 2)
+
+            self.expect_true(np.array_equal(frozen_megpc.predict_domains(grid.coords_norm),
+                                            clf.predict(grid.coords_norm)),
+                             "frozen classifier differs from MLPClassifier ({})".format(activation))
+            self.expect_isclose(frozen_megpc.predict(grid.coords), megpc.get_approximation(coeffs_me, grid.coords_norm),
+                                atol=1e-10, msg="frozen multi-element gPC approximation differs from multi-element "
+                                                "gPC approximation ({})".format(activation))
+
+        print("done!\n")
+
+    def test_019_serve(self):
+        """
+        Test local batching inference server
+        """
+        import json
+        import threading
+        import http.client
+
+        global folder
+        test_name = 'pygpc_test_019_serve'
+        print(test_name)
+
+        # define problem
+        parameters = OrderedDict()
+        parameters["x1"] = pygpc.Beta(pdf_shape=[1, 1], pdf_limits=[1.2, 2])
+        parameters["x2"] = pygpc.Beta(pdf_shape=[1, 1], pdf_limits=[0, 0.6])
+        problem = pygpc.Problem(pygpc.testfunctions.Peaks(), parameters)
+
+        # setup gPC
+        gpc = pygpc.Reg(problem=problem,
+                        order=[5, 5],
+                        order_max=5,
+                        order_max_norm=1,
+                        interaction_order=2,
+                        interaction_order_current=2,
+                        options={"backend": "python"},
+                        validation=None)
+
+        frozen_gpc = gpc.freeze(np.random.rand(gpc.basis.n_basis, 2))
+
+        grid = pygpc.Random(parameters_random=problem.parameters_random,
+                            n_grid=160,
+                            seed=1)
+
+        server = pygpc.serve.SurrogateServer(models={"peaks": frozen_gpc}, batch_window=0.01, verbose=False)
+        server.start_thread()
+
+        # send concurrent requests of 10 points each
+        pce = [None for _ in range(16)]
+
+        def request(i_request):
+            conn = http.client.HTTPConnection("127.0.0.1", server.port)
+            conn.request("POST", "/predict/peaks",
+                         json.dumps({"coords": grid.coords[i_request * 10:(i_request + 1) * 10, :].tolist()}))
+            pce[i_request] = np.array(json.loads(conn.getresponse().read())["pce"])
+            conn.close()
+
+        # malformed request (wrong number of parameters) sent concurrently must not fail the batch
+        status_malformed = [None]
+
+        def request_malformed():
+            conn = http.client.HTTPConnection("127.0.0.1", server.port)
+            conn.request("POST", "/predict/peaks", json.dumps({"coords": np.random.rand(10, 3).tolist()}))
+            status_malformed[0] = conn.getresponse().status
+            conn.close()
+
+        threads = [threading.Thread(target=request, args=(i,)) for i in range(16)]
+        threads.insert(8, threading.Thread(target=request_malformed))
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        conn = http.client.HTTPConnection("127.0.0.1", server.port)
+        conn.request("GET", "/metrics")
+        metrics = json.loads(conn.getresponse().read())["peaks"]
+        conn.close()
+
+        server.stop_thread()
+
+        self.expect_isclose(np.vstack(pce), frozen_gpc.predict(grid.coords), atol=1e-10,
+                            msg="served gPC approximation differs from frozen gPC approximation")
+        self.expect_equal(metrics["n_requests"], 16)
+        self.expect_equal(metrics["n_points"], 160)
+        self.expect_equal(status_malformed[0], 400)
+
+        print("done!\n")
+
+
+    def test_020_output_compression(self):
+        """
+        Test compression of output quantities by their principal components (options["lambda_eps_output"])
+        """
+        global folder
+        test_name = 'pygpc_test_020_output_compression'
+        print(test_name)
+
+        # define model
+        model = pygpc.testfunctions.Peaks()
+
+        # define problem
+        parameters = OrderedDict()
+        parameters["x1"] = pygpc.Beta(pdf_shape=[1, 1], pdf_limits=[1.2, 2])
+        parameters["x2"] = 1.25
+        parameters["x3"] = pygpc.Beta(pdf_shape=[2, 3], pdf_limits=[0, 0.6])
+        problem = pygpc.Problem(model, parameters)
+
+        # setup gPC
+        gpc = pygpc.Reg(problem=problem,
+                        order=[6, 6],
+                        order_max=6,
+                        order_max_norm=1,
+                        interaction_order=2,
+                        interaction_order_current=2,
+                        options={"backend": "python"},
+                        validation=None)
+
+        gpc.grid = pygpc.Random(parameters_random=problem.parameters_random,
+                                n_grid=100,
+                                seed=1)
+        gpc.init_gpc_matrix()
+
+        # field output of rank 3 (+ mean) at 2000 nodes
+        x = gpc.grid.coords_norm
+        modes = np.random.rand(3, 2000)
+        results = np.matmul(np.vstack((np.sin(2 * x[:, 0]) * x[:, 1], x[:, 1] ** 2, np.cos(x[:, 0]))).transpose(),
+                            modes) + np.random.rand(2000)
+
+        coeffs = gpc.solve(results=results, solver="Moore-Penrose", settings=None)
+
+        gpc.lambda_eps_output = 1 - 1e-10
+        coeffs_reduced = gpc.solve(results=results, solver="Moore-Penrose", settings=None)
+
+        self.expect_true(isinstance(coeffs_reduced, pygpc.ReducedCoeffs), "gPC coefficients are not compressed")
+        self.expect_equal(coeffs_reduced.n_components, 3)
+        self.expect_isclose(np.array(coeffs_reduced), coeffs, atol=1e-8,
+                            msg="expanded gPC coefficients differ from gPC coefficients")
+        self.expect_isclose(gpc.get_mean(coeffs_reduced), gpc.get_mean(coeffs), atol=1e-8,
+                            msg="mean of compressed gPC differs")
+        self.expect_isclose(gpc.get_std(coeffs_reduced), gpc.get_std(coeffs), atol=1e-8,
+                            msg="standard deviation of compressed gPC differs")
+        self.expect_isclose(gpc.get_sobol_indices(coeffs_reduced)[0], gpc.get_sobol_indices(coeffs)[0], atol=1e-8,
+                            msg="Sobol indices of compressed gPC differ")
+        self.expect_isclose(gpc.get_approximation(coeffs_reduced, x, output_idx=np.arange(10)),
+                            gpc.get_approximation(coeffs, x, output_idx=np.arange(10)), atol=1e-8,
+                            msg="approximation of compressed gPC differs")
+
+        print("done!\n")
+
+    def test_021_out_of_core(self):
+        """
+        Test out-of-core gPC matrix and results (HDF5Array)
+        """
+        global folder
+        test_name = 'pygpc_test_021_out_of_core'
+        print(test_name)
+
+        fn = os.path.join(folder, test_name + ".hdf5")
+
+        if os.path.exists(fn):
+            os.remove(fn)
+
+        # define model
+        model = pygpc.testfunctions.Peaks()
+
+        # define problem
+        parameters = OrderedDict()
+        parameters["x1"] = pygpc.Beta(pdf_shape=[1, 1], pdf_limits=[1.2, 2])
+        parameters["x2"] = 1.25
+        parameters["x3"] = pygpc.Beta(pdf_shape=[2, 3], pdf_limits=[0, 0.6])
+        problem = pygpc.Problem(model, parameters)
+
+        gpc = [None, None]
+        coeffs = [None, None]
+        loocv = [None, None]
+
+        for i, out_of_core in enumerate([False, True]):
+            gpc[i] = pygpc.Reg(problem=problem,
+                               order=[5, 5],
+                               order_max=5,
+                               order_max_norm=1,
+                               interaction_order=2,
+                               interaction_order_current=2,
+                               options={"backend": "python", "memory_limit": 1e-6, "solver": "Moore-Penrose",
+                                        "settings": None},
+                               validation=None)
+
+            gpc[i].grid = pygpc.Random(parameters_random=problem.parameters_random,
+                                       n_grid=60,
+                                       seed=1)
+
+            if out_of_core:
+                gpc[i].set_out_of_core(fn)
+
+            gpc[i].init_gpc_matrix()
+
+            # extend grid (rows are appended to the out-of-core gPC matrix)
+            gpc[i].grid.extend_random_grid(n_grid_new=80, seed=2)
+            gpc[i].update_gpc_matrix()
+
+            results = np.matmul(gpc[i].grid.coords_norm, np.random.RandomState(1).rand(2, 5))
+
+            if out_of_core:
+                results = pygpc.HDF5Array(fn=fn, name="model_evaluations/results").append_rows(results)
+
+            coeffs[i] = gpc[i].solve(results=results, solver="Moore-Penrose", settings=None)
+            loocv[i] = gpc[i].get_loocv(coeffs=coeffs[i], results=results)
+
+        self.expect_true(isinstance(gpc[1].gpc_matrix, pygpc.HDF5Array), "gPC matrix is not stored out-of-core")
+        self.expect_isclose(np.array(gpc[1].gpc_matrix), gpc[0].gpc_matrix, atol=1e-12,
+                            msg="out-of-core gPC matrix differs from gPC matrix")
+        self.expect_isclose(coeffs[1], coeffs[0], atol=1e-8,
+                            msg="out-of-core gPC coefficients differ from gPC coefficients")
+        self.expect_isclose(loocv[1], loocv[0], atol=1e-8,
+                            msg="out-of-core leave-one-out error differs")
+
+        # QR decomposition in row blocks of an ill-conditioned matrix (condition number 1e10)
+        rng = np.random.RandomState(1)
+        u, _, v = np.linalg.svd(rng.randn(100, 12), full_matrices=False)
+        matrix = np.matmul(u * np.logspace(0, -10, 12)[np.newaxis, :], v)
+        results = rng.randn(100, 3)
+
+        r, rhs = gpc[1].get_qr_factor(matrices=[matrix[:70, :], matrix[70:, :]],
+                                      results=[results[:70, :], results[70:, :]])
+
+        coeffs_ref = np.linalg.lstsq(matrix, results, rcond=None)[0]
+
+        self.expect_true(np.linalg.norm(np.matmul(np.linalg.pinv(r), rhs) - coeffs_ref) <
+                         1e-6 * np.linalg.norm(coeffs_ref),
+                         "least squares solution from QR decomposition in row blocks differs")
+
+        r, rhs = gpc[1].get_qr_factor(matrices=[matrix], results=[results], regularization=0.1)
+
+        self.expect_isclose(np.matmul(r.transpose(), r), np.matmul(matrix.transpose(), matrix) + 0.1 * np.eye(12),
+                            atol=1e-10, msg="regularized QR decomposition in row blocks differs")
+
+        print("done!\n")
+
+    def test_022_pool_registry(self):
+        """
+        Test reuse of worker pools borrowed from the PoolRegistry
+        """
+        global folder
+        test_name = 'pygpc_test_022_pool_registry'
+        print(test_name)
+
+        # define model
+        model = pygpc.testfunctions.Peaks()
+
+        # define problem
+        parameters = OrderedDict()
+        parameters["x1"] = pygpc.Beta(pdf_shape=[1, 1], pdf_limits=[1.2, 2])
+        parameters["x2"] = 1.25
+        parameters["x3"] = pygpc.Beta(pdf_shape=[1, 1], pdf_limits=[0, 0.6])
+        problem = pygpc.Problem(model, parameters)
+
+        coords = np.random.RandomState(1).rand(20, 2)
+
+        # reference (model evaluated for all grid points at once)
+        com = pygpc.Computation(n_cpu=0)
+        results_ref = com.run(model=model, problem=problem, coords=coords)
+        com.close()
+
+        with pygpc.PoolRegistry():
+            # the second shared memory run writes to the results array (number of outputs known from the first)
+            for dispatch in ["map", "shared_memory", "shared_memory", "vectorized"]:
+                com = pygpc.Computation(n_cpu=2, dispatch=dispatch)
+                results = com.run(model=model, problem=problem, coords=coords)
+                com.close()
+
+                self.expect_isclose(results, results_ref, atol=1e-12,
+                                    msg="results of worker pool ({}) differ from reference".format(dispatch))
+
+            # results are streamed in the order the simulations finish
+            com = pygpc.Computation(n_cpu=2)
+            results = np.zeros(results_ref.shape)
+
+            for i, res_i in com.submit(model=model, problem=problem, coords=coords):
+                results[i, :] = res_i
+            com.close()
+
+            self.expect_isclose(results, results_ref, atol=1e-12,
+                                msg="streamed results of worker pool differ from reference")
+
+            if com.n_cpu > 1:
+                self.expect_true(len(pygpc.PoolRegistry.pools) == 1, "worker pool was not reused")
+
+        self.expect_true(len(pygpc.PoolRegistry.pools) == 0, "worker pools were not closed")
+
+        # least recently installed models are removed from the worker pool
+        pool = pygpc.WorkerPool(n_cpu=2, n_models_max=2)
+        keys = []
+
+        for x2 in [1., 1.25, 1.5]:
+            parameters["x2"] = x2
+            keys.append(pool.install(model=model, problem=pygpc.Problem(model, parameters)))
+
+        self.expect_true(list(pool.model_keys) == keys[1:] and sorted(pool.model_registry.keys()) == sorted(keys[1:]),
+                         "least recently installed model was not removed")
+
+        installed = pool.map(pygpc.Worker.get_installed, keys[1:] * 2)
+        self.expect_true([p["x2"] for _, p, _ in installed] == [1.25, 1.5, 1.25, 1.5],
+                         "installed problems differ in the workers")
+        pool.close()
+
+        print("done!\n")
+
+    def test_023_evaluation_cache(self):
+        """
+        Test content-addressed model evaluation cache (EvaluationCache)
+        """
+        global folder
+        test_name = 'pygpc_test_023_evaluation_cache'
+        print(test_name)
+
+        fn = os.path.join(folder, test_name + ".sqlite")
+
+        if os.path.exists(fn):
+            os.remove(fn)
+
+        # define model
+        model = pygpc.testfunctions.Ishigami()
+
+        # define problem
+        parameters = OrderedDict()
+        parameters["x1"] = pygpc.Beta(pdf_shape=[1, 1], pdf_limits=[-np.pi, np.pi])
+        parameters["x2"] = pygpc.Beta(pdf_shape=[1, 1], pdf_limits=[-np.pi, np.pi])
+        parameters["x3"] = 0.
+        parameters["a"] = 7.
+        parameters["b"] = 0.1
+        problem = pygpc.Problem(model, parameters)
+
+        coords = np.random.RandomState(1).rand(20, 2)
+        idx = np.random.RandomState(2).permutation(20)
+
+        results_ref = pygpc.Computation(n_cpu=0).run(model=model, problem=problem, coords=coords)
+
+        with pygpc.EvaluationCache(fn=fn) as cache:
+            pygpc.Computation(n_cpu=1).run(model=model, problem=problem, coords=coords)
+            self.expect_true(len(cache) == 20, "model evaluations were not stored in cache")
+
+            # reordered grid points are read from the cache
+            results = pygpc.Computation(n_cpu=0).run(model=model, problem=problem, coords=coords[idx])
+            self.expect_isclose(results, results_ref[idx], atol=1e-12, msg="cached results differ from reference")
+            self.expect_true(len(cache) == 20, "reordered grid points were not found in cache")
+
+        # least recently used results are evicted
+        cache = pygpc.EvaluationCache(fn=fn, max_size=5 * 8)
+
+        with cache:
+            pygpc.Computation(n_cpu=1).run(model=model, problem=problem, coords=coords[:1] + 0.5)
+
+        self.expect_true(len(cache) == 5, "cache was not limited to max_size")
+
+        # models are identified by their instance state (excluding parameters and context) or their model_id
+        p = {"x1": coords[:, 0], "x2": coords[:, 1], "x3": 0., "a": 7., "b": 0.1}
+        context = {"coords": coords, "coords_norm": coords, "i_grid": 0, "evaluation_cache": cache}
+        keys_ref = cache.get_keys(pygpc.testfunctions.Ishigami().set_parameters(p=p, context=context))
+
+        context["i_grid"] = 5
+        model = pygpc.testfunctions.Ishigami().set_parameters(p=p, context=context)
+        self.expect_true(cache.get_keys(model) == keys_ref, "keys depend on the context of the simulations")
+
+        model.scale = 2.
+        keys_scale = cache.get_keys(model)
+        self.expect_true(len(set(keys_scale).intersection(keys_ref)) == 0,
+                         "keys do not depend on the instance state of the model")
+
+        model.model_id = "Ishigami_v2"
+        keys_id = cache.get_keys(model)
+        model.scale = 3.
+        self.expect_true(cache.get_keys(model) == keys_id, "keys do not depend on model_id only")
+        self.expect_true(len(set(keys_id).intersection(keys_scale)) == 0, "model_id is not part of the keys")
+
+        print("done!\n")
+
+    def test_024_cross_validation(self):
+        """
+        Test cross validation folds (misc.get_cv_folds) and concurrent cross validation (GPC.cross_validate)
+        """
+        global folder
+        test_name = 'pygpc_test_024_cross_validation'
+        print(test_name)
+
+        # folds
+        folds = pygpc.get_cv_folds(n_samples=50, mode="loo", n_folds=20, seed=1)
+        self.expect_equal(len(folds), 20)
+        self.expect_true(all([len(f) == 1 for f in folds]), "loo folds contain more than one sample")
+        self.expect_equal(len(np.unique(np.hstack(folds))), 20)
+
+        folds = pygpc.get_cv_folds(n_samples=50, mode="kfold", n_folds=7, seed=1)
+        self.expect_equal(len(folds), 7)
+        self.expect_true(np.array_equal(np.sort(np.hstack(folds)), np.arange(50)),
+                         "kfold folds are not a partition of the samples")
+        self.expect_true(all([np.array_equal(f, np.sort(f)) for f in folds]), "kfold folds are not sorted")
+
+        folds = pygpc.get_cv_folds(n_samples=50, mode="subsample", n_folds=5, test_ratio=0.1, seed=1)
+        self.expect_equal(len(folds), 5)
+        self.expect_true(all([len(np.unique(f)) == 5 and np.array_equal(f, np.sort(f)) for f in folds]),
+                         "subsample folds have wrong size or are not sorted")
+
+        self.expect_true(all([np.array_equal(f_1, f_2) for f_1, f_2 in
+                              zip(pygpc.get_cv_folds(n_samples=50, mode="kfold", n_folds=7, seed=2),
+                                  pygpc.get_cv_folds(n_samples=50, mode="kfold", n_folds=7, seed=2))]),
+                         "folds are not deterministic for a given seed")
+
+        self.assertRaises(AttributeError, pygpc.get_cv_folds, n_samples=50, mode="unknown")
+
+        # define model
+        model = pygpc.testfunctions.Peaks()
+
+        # define problem
+        parameters = OrderedDict()
+        parameters["x1"] = pygpc.Beta(pdf_shape=[1, 1], pdf_limits=[1.2, 2])
+        parameters["x2"] = 1.25
+        parameters["x3"] = pygpc.Beta(pdf_shape=[1, 1], pdf_limits=[0, 0.6])
+        problem = pygpc.Problem(model, parameters)
+
+        gpc = pygpc.Reg(problem=problem,
+                        order=[12, 12],
+                        order_max=12,
+                        order_max_norm=1,
+                        interaction_order=2,
+                        interaction_order_current=2,
+                        options={"backend": "python", "solver": "Moore-Penrose", "settings": None},
+                        validation=None)
+
+        # underdetermined system (the exact leave-one-out errors are not available)
+        n_basis = gpc.basis.n_basis
+        matrix = np.random.RandomState(1).rand(n_basis - 10, n_basis)
+        results = np.random.RandomState(2).rand(n_basis - 10, 3)
+
+        # concurrent folds have to give the same errors as sequential folds
+        for mode in ["loo", "kfold"]:
+            error_ref = gpc.cross_validate(matrix=matrix, results=results, solver="Moore-Penrose", mode=mode,
+                                           n_folds=20, n_threads=1, seed=1)
+
+            for _ in range(5):
+                error = gpc.cross_validate(matrix=matrix, results=results, solver="Moore-Penrose", mode=mode,
+                                           n_folds=20, n_threads=8, seed=1)
+
+                self.expect_isclose(error, error_ref, atol=1e-12, rtol=0,
+                                    msg="cross validation errors ({}) depend on the number of threads".format(mode))
+
+        print("done!\n")
+
+    def test_025_somp(self):
+        """
+        Test simultaneous orthogonal matching pursuit (misc.somp)
+        """
+        global folder
+        test_name = 'pygpc_test_025_somp'
+        print(test_name)
+
+        from sklearn.linear_model import OrthogonalMatchingPursuit
+
+        rng = np.random.RandomState(1)
+
+        # matrix with normalized columns
+        matrix = rng.randn(60, 100)
+        matrix /= np.linalg.norm(matrix, axis=0)[np.newaxis, :]
+
+        # known sparse solution with common support of all output quantities
+        support = np.array([3, 17, 42, 64, 91])
+        coeffs_ref = np.zeros((100, 4))
+        coeffs_ref[support, :] = rng.randn(5, 4) + 2. * np.sign(rng.randn(5, 4))
+        results = np.matmul(matrix, coeffs_ref)
+
+        coeffs = pygpc.somp(matrix=matrix, results=results, n_coeffs_sparse=5)
+
+        self.expect_isclose(coeffs, coeffs_ref, atol=1e-10, msg="SOMP did not recover the sparse solution")
+
+        # correlations determined in blocks of outputs (support is common to all outputs)
+        results = np.matmul(matrix, coeffs_ref) + 0.5 * rng.randn(60, 4)
+        coeffs = pygpc.somp(matrix=matrix, results=results, n_coeffs_sparse=10)
+
+        for n_out_block in [1, 3]:
+            self.expect_isclose(pygpc.somp(matrix=matrix, results=results, n_coeffs_sparse=10,
+                                           n_out_block=n_out_block), coeffs, atol=1e-10,
+                                msg="SOMP with blocks of {} outputs differs".format(n_out_block))
+
+        # SOMP of a single output quantity is OMP
+        results = rng.randn(60)
+
+        for n_coeffs_sparse in [1, 5, 20]:
+            coeffs = pygpc.somp(matrix=matrix, results=results, n_coeffs_sparse=n_coeffs_sparse)
+
+            omp = OrthogonalMatchingPursuit(n_nonzero_coefs=n_coeffs_sparse, fit_intercept=False).fit(matrix, results)
+
+            self.expect_isclose(coeffs[:, 0], omp.coef_, atol=1e-10,
+                                msg="SOMP of single output differs from OMP ({} coefficients)".format(n_coeffs_sparse))
+
+        print("done!\n")
+
+    def test_026_incremental_lstsq(self):
+        """
+        Test incrementally updated Cholesky factorization (IncrementalCholesky) and least squares solver
+        'incremental-lstsq' (GPC.solve_incremental_lstsq)
+        """
+        global folder
+        test_name = 'pygpc_test_026_incremental_lstsq'
+        print(test_name)
+
+        rng = np.random.RandomState(1)
+
+        # factorization of the regularized normal equations after adding columns and rows
+        regularization = 0.1
+        matrix = rng.randn(40, 12)
+        cholesky = pygpc.IncrementalCholesky(matrix=matrix[:30, :8], regularization=regularization)
+        cholesky.add_cols(cols=matrix[:30, 8:], matrix=matrix[:30, :8])
+        cholesky.add_rows(rows=matrix[30:, :])
+
+        gram = np.matmul(matrix.transpose(), matrix) + regularization * np.eye(12)
+
+        self.expect_isclose(np.matmul(cholesky.L, cholesky.L.transpose()), gram, atol=1e-10,
+                            msg="updated Cholesky factor differs from the normal equations")
+        self.expect_isclose(cholesky.solve(np.matmul(matrix.transpose(), np.ones(40))),
+                            np.linalg.solve(gram, np.matmul(matrix.transpose(), np.ones(40))), atol=1e-10,
+                            msg="solution of the normal equations differs from reference")
+
+        # define problem
+        parameters = OrderedDict()
+        parameters["x1"] = pygpc.Beta(pdf_shape=[1, 1], pdf_limits=[1.2, 2])
+        parameters["x2"] = pygpc.Beta(pdf_shape=[1, 1], pdf_limits=[0, 0.6])
+        problem = pygpc.Problem(pygpc.testfunctions.Peaks(), parameters)
+
+        # setup gPC
+        gpc = pygpc.Reg(problem=problem,
+                        order=[5, 5],
+                        order_max=5,
+                        order_max_norm=1,
+                        interaction_order=2,
+                        interaction_order_current=2,
+                        options={"backend": "python", "verbose": False},
+                        validation=None)
+
+        # sequence of gPC matrices with appended grid points (rows) and basis functions (columns)
+        matrix = rng.randn(60, 15)
+        results = rng.randn(60, 3)
+        factorization = None
+
+        for n_rows, n_cols in [(30, 8), (40, 8), (40, 12), (60, 15)]:
+            gpc.gpc_matrix_b_id = list(range(n_cols))
+
+            coeffs = gpc.solve_incremental_lstsq(matrix=matrix[:n_rows, :n_cols],
+                                                 results=results[:n_rows, :],
+                                                 rows_id=list(range(n_rows)))
+
+            self.expect_isclose(coeffs, np.linalg.lstsq(matrix[:n_rows, :n_cols], results[:n_rows, :], rcond=None)[0],
+                                atol=1e-10, msg="incremental least squares solution differs from np.linalg.lstsq "
+                                                "({} rows, {} columns)".format(n_rows, n_cols))
+
+            if factorization is not None:
+                self.expect_true(gpc.lstsq_factorization is factorization, "factorization was not updated")
+
+            factorization = gpc.lstsq_factorization
+
+        # factorization is recomputed if rows are removed
+        rows_id = list(range(0, 60, 2))
+        coeffs = gpc.solve_incremental_lstsq(matrix=matrix[rows_id, :], results=results[rows_id, :], rows_id=rows_id)
+
+        self.expect_true(gpc.lstsq_factorization is not factorization,
+                         "factorization was not recomputed after removing rows")
+        self.expect_isclose(coeffs, np.linalg.lstsq(matrix[rows_id, :], results[rows_id, :], rcond=None)[0],
+                            atol=1e-10, msg="least squares solution differs from np.linalg.lstsq after removing rows")
+
+        # factorization is recomputed if the basis functions are reordered
+        factorization = gpc.lstsq_factorization
+        idx_cols = rng.permutation(15)
+        gpc.gpc_matrix_b_id = list(idx_cols)
+        coeffs = gpc.solve_incremental_lstsq(matrix=matrix[rows_id, :][:, idx_cols], results=results[rows_id, :],
+                                             rows_id=rows_id)
+
+        self.expect_true(gpc.lstsq_factorization is not factorization,
+                         "factorization was not recomputed after reordering the basis functions")
+        self.expect_isclose(coeffs,
+                            np.linalg.lstsq(matrix[rows_id, :][:, idx_cols], results[rows_id, :], rcond=None)[0],
+                            atol=1e-10, msg="least squares solution differs from np.linalg.lstsq after reordering "
+                                            "the basis functions")
+
+        print("done!\n")
+
+    def test_027_loocv_lstsq(self):
+        """
+        Test leave-one-out errors of least squares solutions from the hat matrix (GPC.get_loocv_lstsq)
+        """
+        global folder
+        test_name = 'pygpc_test_027_loocv_lstsq'
+        print(test_name)
+
+        rng = np.random.RandomState(1)
+        matrix = rng.randn(30, 10)
+        results = rng.randn(30, 3)
+
+        for regularization in [0., 0.5]:
+            for error_norm in ["absolute", "relative"]:
+                relative_error = pygpc.GPC.get_loocv_lstsq(matrix=matrix, results=results, error_norm=error_norm,
+                                                           regularization=regularization)
+
+                # reference: refit without grid point i
+                relative_error_ref = np.zeros(30)
+
+                for i in range(30):
+                    mask = np.arange(30) != i
+                    coeffs = np.linalg.solve(np.matmul(matrix[mask, :].transpose(), matrix[mask, :]) +
+                                             regularization * np.eye(10),
+                                             np.matmul(matrix[mask, :].transpose(), results[mask, :]))
+                    relative_error_ref[i] = np.linalg.norm(results[i, :] - np.matmul(matrix[i, :], coeffs))
+
+                    if error_norm == "relative":
+                        relative_error_ref[i] /= np.linalg.norm(results[i, :])
+
+                self.expect_isclose(relative_error, relative_error_ref, atol=1e-10,
+                                    msg="leave-one-out errors differ from refits ({}, lambda={})".format(
+                                        error_norm, regularization))
+
+        # underdetermined system without regularization
+        self.expect_true(pygpc.GPC.get_loocv_lstsq(matrix=matrix[:10, :], results=results[:10, :]) is None,
+                         "leave-one-out errors of underdetermined system are not None")
+
+        # underdetermined system with regularization
+        self.expect_true(pygpc.GPC.get_loocv_lstsq(matrix=matrix[:8, :], results=results[:8, :],
+                                                   regularization=0.5) is not None,
+                         "leave-one-out errors of regularized underdetermined system are None")
+
+        # rank deficient system
+        matrix_rank_deficient = np.hstack((matrix[:, :9], matrix[:, :1] + matrix[:, 1:2]))
+        self.expect_true(pygpc.GPC.get_loocv_lstsq(matrix=matrix_rank_deficient, results=results) is None,
+                         "leave-one-out errors of rank deficient system are not None")
+
+        print("done!\n")
+
+    def test_028_growable_array(self):
+        """
+        Test preallocated storage of arrays with appended rows and columns (GrowableArray)
+        """
+        import pickle
+
+        global folder
+        test_name = 'pygpc_test_028_growable_array'
+        print(test_name)
+
+        rng = np.random.RandomState(1)
+
+        # adopt view on the used region (buffer is kept)
+        array = pygpc.GrowableArray(data=rng.rand(4, 3))
+        array.reserve(8, 3)
+        data = array.resize(5, 3)
+        capacity = array.capacity
+        array.adopt(data)
+
+        self.expect_true(array.is_view(data), "used region is not a view on the buffer")
+        self.expect_true(array.capacity == capacity, "buffer was replaced when adopting a view on it")
+
+        # adopt array, which is not a view (e.g. replaced by assignment of a new array)
+        data_new = rng.rand(5, 3)
+        array.adopt(data_new)
+
+        self.expect_true(np.shares_memory(array.data, data_new), "adopted array was copied")
+        self.expect_true(array.shape == (5, 3), "shape of adopted array differs")
+
+        # dtype promotion (int to float)
+        array = pygpc.GrowableArray(data=np.arange(6).reshape(2, 3))
+        data = array.append_rows(np.array([[0.5, 1.5, 2.5]]))
+
+        self.expect_true(data.dtype == np.float64, "buffer was not promoted to float")
+        self.expect_isclose(data, np.array([[0, 1, 2], [3, 4, 5], [0.5, 1.5, 2.5]]), atol=1e-12,
+                            msg="values differ after dtype promotion")
+
+        # column growth after row growth
+        values = rng.rand(40, 10)
+        array = pygpc.GrowableArray()
+        views = []
+
+        for i_row in range(0, 40, 8):
+            views.append(array.append_rows(values[i_row:i_row + 8, :4]))
+
+        data = array.append_cols(values[:, 4:7])
+        data = array.append_cols(values[:, 7:])
+
+        self.expect_isclose(data, values, atol=0, msg="values differ after appending rows and columns")
+        self.expect_true(array.capacity[0] >= 40 and array.capacity[1] >= 10, "capacity is smaller than data")
+
+        for i_view, view in enumerate(views):
+            self.expect_isclose(view, values[:8 * (i_view + 1), :4], atol=0,
+                                msg="views on the used region changed after extension")
+
+        # pickle round trip of a gPC (buffers are not stored and the gPC matrix is adopted at the next update)
+        parameters = OrderedDict()
+        parameters["x1"] = pygpc.Beta(pdf_shape=[1, 1], pdf_limits=[1.2, 2])
+        parameters["x2"] = pygpc.Beta(pdf_shape=[1, 1], pdf_limits=[0, 0.6])
+        problem = pygpc.Problem(pygpc.testfunctions.Peaks(), parameters)
+
+        gpc = pygpc.Reg(problem=problem,
+                        order=[5, 5],
+                        order_max=5,
+                        order_max_norm=1,
+                        interaction_order=2,
+                        interaction_order_current=2,
+                        options={"backend": "python"},
+                        validation=None)
+
+        gpc.grid = pygpc.Random(parameters_random=problem.parameters_random,
+                                n_grid=30,
+                                seed=1)
+        gpc.init_gpc_matrix()
+        gpc.grid.extend_random_grid(n_grid_new=40, seed=2)
+        gpc.update_gpc_matrix()
+
+        self.expect_true("_gpc_matrix_buffer" not in gpc.__getstate__(), "buffer of gPC matrix is pickled")
+
+        gpc_loaded = pickle.loads(pickle.dumps(gpc))
+        self.expect_isclose(gpc_loaded.gpc_matrix, gpc.gpc_matrix, atol=0,
+                            msg="gPC matrix differs after pickle round trip")
+
+        for g in [gpc, gpc_loaded]:
+            g.grid.extend_random_grid(n_grid_new=60, seed=3)
+            g.update_gpc_matrix()
+
+        self.expect_true(gpc_loaded._gpc_matrix_buffer.is_view(gpc_loaded.gpc_matrix),
+                         "gPC matrix was not adopted by the buffer after pickle round trip")
+        self.expect_isclose(gpc_loaded.gpc_matrix, gpc.gpc_matrix, atol=0,
+                            msg="extended gPC matrix differs after pickle round trip")
+
+        print("done!\n")
+
+    def test_029_multi_index_set(self):
+        """
+        Test hash based set of multi-indices (MultiIndexSet)
+        """
+        global folder
+        test_name = 'pygpc_test_029_multi_index_set'
+        print(test_name)
+
+        multi_indices = np.array([[0, 0, 0], [1, 0, 0], [0, 1, 0], [0, 0, 1], [1, 1, 0]])
+
+        # duplicates are skipped and the order of insertion is kept
+        mis = pygpc.MultiIndexSet(dim=3, multi_indices=multi_indices[:3])
+        idx_added = mis.add(np.array([[0, 1, 0], [0, 0, 1], [1, 1, 0], [0, 0, 1]]))
+
+        self.expect_equal(len(mis), 5)
+        self.expect_true(np.array_equal(idx_added, [1, 2]), "indices of added multi-indices differ")
+        self.expect_true(np.array_equal(mis.multi_indices, multi_indices), "multi-indices are not in insertion order")
+
+        # positions and membership
+        self.expect_true(np.array_equal(mis.get_index(np.array([[1, 1, 0], [2, 0, 0], [0, 0, 0]])), [4, -1, 0]),
+                         "positions of multi-indices differ")
+        self.expect_true(np.array_equal(mis.get_index(np.array([0, 1, 0])), [2]),
+                         "position of single multi-index differs")
+        self.expect_true(np.array_equal(mis.is_member(np.array([[2, 0, 0], [0, 0, 1]])), [False, True]),
+                         "membership of multi-indices differs")
+        self.expect_true([0, 0, 1] in mis and [0, 2, 0] not in mis, "membership of single multi-index differs")
+
+        # difference keeps the order of the given multi-indices and skips duplicates
+        multi_indices_new = np.array([[0, 2, 0], [1, 0, 0], [2, 0, 0], [0, 2, 0], [0, 0, 2]])
+
+        self.expect_true(np.array_equal(mis.difference(multi_indices_new), [[0, 2, 0], [2, 0, 0], [0, 0, 2]]),
+                         "difference of multi-indices differs")
+        self.expect_equal(mis.difference(multi_indices).shape, (0, 3))
+
+        # union lists the multi-indices of the set first and does not modify the set
+        mis_union = mis.union(multi_indices_new)
+
+        self.expect_equal(len(mis), 5)
+        self.expect_true(np.array_equal(mis_union.multi_indices,
+                                        np.vstack((multi_indices, [[0, 2, 0], [2, 0, 0], [0, 0, 2]]))),
+                         "union of multi-indices differs")
+        self.expect_true(np.array_equal(mis.union(pygpc.MultiIndexSet(dim=3, multi_indices=multi_indices_new))
+                                        .multi_indices, mis_union.multi_indices),
+                         "union with MultiIndexSet differs")
+        self.expect_true(np.array_equal(mis_union.get_index(multi_indices_new), [5, 1, 6, 5, 7]),
+                         "positions of multi-indices in union differ")
+
+        print("done!\n")
 
 if __name__ == '__main__':
     unittest.main()